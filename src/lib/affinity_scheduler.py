@@ -0,0 +1,61 @@
+import logging
+import threading
+from collections import deque
+
+LOGGER = logging.getLogger(__name__)
+
+
+class AffinityScheduler:
+    """
+    Hands out tasks grouped by an affinity key, e.g. the origin bug of stage05 mutant mutants.
+
+    Groups are dealt to the workers up front, longest expected first, to the worker
+    that would finish them earliest (cost is the expected cost of a task, 1 by default,
+    and speeds the relative speed of each worker, 1 by default). A worker runs its
+    current group to the end before starting its next one, so consecutive tasks of a
+    core share their origin mutant. A worker out of groups steals a whole group that
+    has not been started from the worker with the most pending work.
+    """
+    def __init__(self, tasks: list, workers: list, key, cost=None, speeds: dict = None):
+        self.lock = threading.Lock()
+        self.steal_cnt = 0
+        self.cost = cost if cost is not None else (lambda task: 1)
+        self.speeds = {worker: (speeds or {}).get(worker, 1.0) for worker in workers}
+
+        groups = {}
+        for task in tasks:
+            groups.setdefault(key(task), []).append(task)
+
+        # worker -> (cost, tasks) of the groups not started yet, and the remaining tasks of its current group
+        self.pending = {worker: deque() for worker in workers}
+        self.current = {worker: deque() for worker in workers}
+        loads = {worker: 0.0 for worker in workers}
+        group_costs = [(sum(self.cost(task) for task in group), group) for group in groups.values()]
+        for group_cost, group in sorted(group_costs, key=lambda entry: entry[0], reverse=True):
+            worker = min(workers, key=lambda w: (loads[w] + group_cost) / self.speeds[w])
+            self.pending[worker].append((group_cost, group))
+            loads[worker] += group_cost
+        LOGGER.debug(f"Dealt {len(groups)} task groups to {len(workers)} workers")
+
+    def _pending_time(self, worker) -> float:
+        return sum(group_cost for group_cost, _ in self.pending[worker]) / self.speeds[worker]
+
+    def get(self, worker):
+        """Next task of the worker, None once every group has been handed out"""
+        with self.lock:
+            if not self.current[worker]:
+                if not self.pending[worker]:
+                    victim = max(self.pending, key=self._pending_time)
+                    if not self.pending[victim]:
+                        return None
+                    # the victim's last group would have started the latest
+                    self.pending[worker].append(self.pending[victim].pop())
+                    self.steal_cnt += 1
+                    LOGGER.debug(f"Worker {worker} stole a group of {len(self.pending[worker][0][1])} tasks from {victim}")
+                self.current[worker] = deque(self.pending[worker].popleft()[1])
+            return self.current[worker].popleft()
+
+    def remaining(self) -> int:
+        with self.lock:
+            return sum(len(tasks) for tasks in self.current.values()) + \
+                sum(len(group) for groups in self.pending.values() for _, group in groups)
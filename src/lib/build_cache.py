@@ -0,0 +1,207 @@
+import os
+import time
+import shutil
+import hashlib
+import logging
+
+from utils.command_utils import *
+
+LOGGER = logging.getLogger(__name__)
+
+# bytes read at once when hashing files
+HASH_CHUNK_SIZE = 1 << 20
+# size of the cache of a machine when BUILD_CACHE_MAX_MB is not set
+DEFAULT_MAX_MB = 10240
+
+
+class BuildCache:
+    """
+    Content-addressed cache of build outputs shared by the cores of a machine.
+
+    An entry is keyed by the sha256 of the (patched) target files and of the
+    build configuration (configurations.json, the configure script in use and
+    the build script). It holds the artifacts listed in the subject's
+    `build_cache_artifacts` (files or directories relative to the core directory),
+    so an identical source state is restored instead of rebuilt.
+    The cache is disabled when no artifacts are configured.
+
+    Once the entries exceed max_bytes (0 for no limit), the least recently
+    stored or restored ones are evicted. With store_entries False, builds are
+    only looked up, for source states that never repeat (stage05 mutant mutants).
+    """
+    def __init__(self, SUBJECT, core_dir: str, cache_dir: str, max_bytes: int = 0, store_entries: bool = True):
+        self.SUBJECT = SUBJECT
+        self.core_dir = core_dir
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.store_entries = store_entries
+        self.artifacts = list(SUBJECT.subject_configs.get("build_cache_artifacts", []))
+        self._config_digests = {}
+
+    @property
+    def enabled(self) -> bool:
+        return len(self.artifacts) > 0
+
+    # KEY
+    def _hash_file(self, digest, file_path: str):
+        with open(file_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+                digest.update(chunk)
+
+    def _config_digest(self, configure_script: str) -> bytes:
+        """Digest of the build configuration, the scripts don't change during a worker's life"""
+        if configure_script not in self._config_digests:
+            digest = hashlib.sha256()
+            for file_path in [self.SUBJECT.configurations_json, configure_script, self.SUBJECT.build_script]:
+                digest.update(os.path.basename(file_path).encode())
+                if os.path.exists(file_path):
+                    self._hash_file(digest, file_path)
+            self._config_digests[configure_script] = digest.digest()
+        return self._config_digests[configure_script]
+
+    def make_key(self, source_files: list, configure_script: str) -> str:
+        digest = hashlib.sha256(self._config_digest(configure_script))
+        for file_path in sorted(set(source_files)):
+            digest.update(os.path.relpath(file_path, self.core_dir).encode())
+            self._hash_file(digest, file_path)
+        return digest.hexdigest()
+
+    # ENTRIES
+    def entry_dir(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], key)
+
+    def contains(self, key: str) -> bool:
+        return os.path.isdir(self.entry_dir(key))
+
+    def restore(self, key: str) -> bool:
+        """Copy the cached artifacts of key into the core directory"""
+        entry_dir = self.entry_dir(key)
+        if not os.path.isdir(entry_dir):
+            return False
+
+        now = time.time()
+        try:
+            for artifact in self.artifacts:
+                src = os.path.join(entry_dir, artifact)
+                dst = os.path.join(self.core_dir, artifact)
+                if os.path.isdir(src):
+                    shutil.copytree(src, dst, dirs_exist_ok=True)
+                    restored = [os.path.join(root, name) for root, _, names in os.walk(dst) for name in names]
+                elif os.path.exists(src):
+                    os.makedirs(os.path.dirname(dst), exist_ok=True)
+                    shutil.copy2(src, dst)
+                    restored = [dst]
+                else:
+                    continue
+                # restored outputs must look up to date to the build system
+                for file_path in restored:
+                    os.utime(file_path, (now, now))
+            # the entry's mtime orders the eviction
+            os.utime(entry_dir, (now, now))
+        except OSError as e:
+            LOGGER.warning(f"Failed to restore build cache entry {key}: {e}")
+            return False
+        LOGGER.debug(f"Restored build cache entry {key}")
+        return True
+
+    def store(self, key: str) -> bool:
+        """Copy the artifacts of the core directory into the entry of key, other cores may store it concurrently"""
+        entry_dir = self.entry_dir(key)
+        if os.path.isdir(entry_dir):
+            return True
+
+        tmp_dir = f"{entry_dir}.tmp{os.getpid()}"
+        try:
+            if os.path.exists(tmp_dir):
+                shutil.rmtree(tmp_dir)
+            os.makedirs(tmp_dir, exist_ok=True)
+            for artifact in self.artifacts:
+                src = os.path.join(self.core_dir, artifact)
+                dst = os.path.join(tmp_dir, artifact)
+                if os.path.isdir(src):
+                    shutil.copytree(src, dst)
+                elif os.path.exists(src):
+                    os.makedirs(os.path.dirname(dst), exist_ok=True)
+                    shutil.copy2(src, dst)
+                else:
+                    LOGGER.warning(f"Build cache artifact {artifact} does not exist in {self.core_dir}")
+            os.rename(tmp_dir, entry_dir)
+        except OSError as e:
+            # another core stored the same entry first
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            if os.path.isdir(entry_dir):
+                return True
+            LOGGER.warning(f"Failed to store build cache entry {key}: {e}")
+            return False
+        LOGGER.debug(f"Stored build cache entry {key}")
+        self.evict(keep=key)
+        return True
+
+    def _entry_size(self, entry_dir: str) -> int:
+        size = 0
+        for root, _, names in os.walk(entry_dir):
+            for name in names:
+                try:
+                    size += os.lstat(os.path.join(root, name)).st_size
+                except OSError:
+                    pass
+        return size
+
+    def evict(self, keep: str = None) -> list:
+        """Remove the least recently used entries until the cache fits in max_bytes, returns their keys"""
+        if self.max_bytes <= 0 or not os.path.isdir(self.cache_dir):
+            return []
+
+        entries = []
+        for prefix in os.listdir(self.cache_dir):
+            prefix_dir = os.path.join(self.cache_dir, prefix)
+            if not os.path.isdir(prefix_dir):
+                continue
+            for key in os.listdir(prefix_dir):
+                entry_dir = os.path.join(prefix_dir, key)
+                # entries being stored by another core are skipped
+                if ".tmp" in key or not os.path.isdir(entry_dir):
+                    continue
+                try:
+                    entries.append((os.stat(entry_dir).st_mtime, key, entry_dir, self._entry_size(entry_dir)))
+                except OSError:
+                    continue
+
+        total = sum(size for _, _, _, size in entries)
+        evicted = []
+        for _, key, entry_dir, size in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            total -= size
+            evicted.append(key)
+        if evicted:
+            LOGGER.debug(f"Evicted {len(evicted)} build cache entries")
+        return evicted
+
+    # BUILD
+    def build(self, source_files: list, configure_script: str, clean: bool = False, builder=None) -> int:
+        """
+        Build the subject for the current state of source_files, restoring the
+        artifacts from the cache when possible. On a miss, builder(source_files)
+        is tried first (returning None when it cannot build), then the build scripts.
+        Returns the build's return code.
+        """
+        key = None
+        if self.enabled:
+            key = self.make_key(source_files, configure_script)
+            if self.restore(key):
+                LOGGER.info(f"Build restored from cache ({key[:12]})")
+                return 0
+
+        res = builder(source_files) if builder is not None else None
+        if res is None:
+            if clean:
+                execute_bash_script(self.SUBJECT.clean_script, self.SUBJECT.build_script_working_directory)
+            res = execute_bash_script(self.SUBJECT.build_script, self.SUBJECT.build_script_working_directory)
+
+        if res == 0 and key is not None and self.store_entries:
+            self.store(key)
+        return res
@@ -0,0 +1,125 @@
+import heapq
+import logging
+from collections import deque
+
+from lib.database import CRUD
+from lib.tc_prioritizer import DEFAULT_EXECUTION_TIME_MS
+
+LOGGER = logging.getLogger(__name__)
+
+# build time assumed when no build of the bug or of any loaded bug was recorded (ms)
+DEFAULT_BUILD_TIME_MS = 60000.0
+# fixed cost of running one test script besides its execution time (ms)
+TEST_OVERHEAD_MS = 10.0
+
+
+class CostModel:
+    """
+    Estimates the cost (ms) of stage05 tasks from recorded runs.
+
+    A mutant mutant of a bug is expected to cost the mean build_time_duration
+    recorded for the mutant mutants of the bug (cpp_mutation_info), falling back
+    to the mean over all loaded bugs, plus the execution_time_ms sum of the bug's
+    relevant tests (cpp_tc_info) and a fixed overhead per relevant test.
+    """
+    def __init__(self, DB: CRUD):
+        self.DB = DB
+        # bug_idx -> mean recorded build time
+        self.bugIdx2buildTime = {}
+        # bug_idx -> (execution time sum, count) of the relevant tests
+        self.bugIdx2tests = {}
+
+    def load(self, bug_idxs: list):
+        for bug_idx in dict.fromkeys(bug_idxs):
+            builds = self.DB.read(
+                "cpp_mutation_info",
+                columns="build_time_duration",
+                conditions={"bug_idx": bug_idx},
+                special="AND build_result IS TRUE AND build_time_duration IS NOT NULL"
+            )
+            if builds:
+                self.bugIdx2buildTime[bug_idx] = sum(float(duration) for (duration,) in builds) / len(builds)
+
+            tc_info = self.DB.read(
+                "cpp_tc_info",
+                columns="execution_time_ms, relevant_tcs",
+                conditions={"bug_idx": bug_idx},
+                special="AND tc_idx != -1"
+            )
+            # relevant_tcs is NULL until stage03, such tests are run as well
+            execution_times = [
+                float(execution_time_ms) if execution_time_ms is not None else DEFAULT_EXECUTION_TIME_MS
+                for execution_time_ms, relevant_status in tc_info
+                if relevant_status != False
+            ]
+            self.bugIdx2tests[bug_idx] = (sum(execution_times), len(execution_times))
+        LOGGER.info(f"Cost model loaded for {len(self.bugIdx2tests)} bugs ({len(self.bugIdx2buildTime)} with recorded builds)")
+
+    def get_build_time(self, bug_idx: int) -> float:
+        if bug_idx in self.bugIdx2buildTime:
+            return self.bugIdx2buildTime[bug_idx]
+        if self.bugIdx2buildTime:
+            return sum(self.bugIdx2buildTime.values()) / len(self.bugIdx2buildTime)
+        return DEFAULT_BUILD_TIME_MS
+
+    def get_test_time(self, bug_idx: int) -> float:
+        execution_time_ms, tc_cnt = self.bugIdx2tests.get(bug_idx, (0.0, 0))
+        return execution_time_ms + TEST_OVERHEAD_MS * tc_cnt
+
+    def estimate(self, bug_idx: int) -> float:
+        """Expected cost (ms) of one mutant mutant of the bug"""
+        return self.get_build_time(bug_idx) + self.get_test_time(bug_idx)
+
+    def estimate_task(self, task: tuple) -> float:
+        """Expected cost (ms) of a stage05 task tuple, origin_bug_idx is its 5th element"""
+        return self.estimate(task[4])
+
+    def load_recorded_tasks(self, bug_idxs: list) -> list:
+        """
+        (bug_idx, mutant_idx, cost) of the mutant mutants of the bugs already tested in stage05,
+        the cost being the recorded build time plus the test time of the bug when the build succeeded
+        """
+        recorded_tasks = []
+        for bug_idx in dict.fromkeys(bug_idxs):
+            mutation_info = self.DB.read(
+                "cpp_mutation_info",
+                columns="mutant_idx, build_time_duration, build_result",
+                conditions={"bug_idx": bug_idx},
+                special="AND build_result IS NOT NULL"
+            )
+            for mutant_idx, build_time_duration, build_result in mutation_info:
+                build_time = float(build_time_duration) if build_time_duration is not None else self.get_build_time(bug_idx)
+                test_time = self.get_test_time(bug_idx) if build_result else 0.0
+                recorded_tasks.append((bug_idx, mutant_idx, build_time + test_time))
+        LOGGER.info(f"Loaded {len(recorded_tasks)} recorded stage05 tasks")
+        return recorded_tasks
+
+
+def simulate_makespan(get_task, workers: list, cost, speeds: dict = None) -> float:
+    """
+    Replay a schedule: every worker asks get_task(worker) for its next task as soon as
+    it is idle and spends cost(task) / speed on it, until get_task returns None.
+    Returns the time at which the last worker finishes.
+    """
+    speeds = speeds or {}
+    # (time the worker becomes idle, tie breaker, worker)
+    idle_workers = [(0.0, idx, worker) for idx, worker in enumerate(workers)]
+    heapq.heapify(idle_workers)
+    makespan = 0.0
+    while idle_workers:
+        clock, idx, worker = heapq.heappop(idle_workers)
+        task = get_task(worker)
+        if task is None:
+            makespan = max(makespan, clock)
+            continue
+        heapq.heappush(idle_workers, (clock + cost(task) / speeds.get(worker, 1.0), idx, worker))
+    return makespan
+
+
+def simulate_fifo_makespan(tasks: list, workers: list, cost, speeds: dict = None) -> float:
+    """Makespan of the tasks pulled in list order from one shared queue"""
+    task_queue = deque(tasks)
+    return simulate_makespan(
+        lambda worker: task_queue.popleft() if task_queue else None,
+        workers, cost, speeds
+    )
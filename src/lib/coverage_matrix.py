@@ -0,0 +1,187 @@
+import numpy as np
+
+# number of set bits for every possible byte value
+POPCOUNT_TABLE = np.array([bin(byte).count("1") for byte in range(256)], dtype=np.uint8)
+
+# rows unpacked at once when a dense view is needed, bounds temporary memory
+UNPACK_CHUNK_ROWS = 512
+
+
+class CoverageMatrix:
+    """
+    Test-by-line coverage matrix stored as packed bits (8 lines per byte).
+
+    Row i holds the coverage of one test case and column j one line, with the
+    bit order of the '0'/'1' coverage strings (column 0 is the most significant
+    bit of the first byte). Each row can be stored as BYTEA with row_to_bytes()
+    (to_bytes_list() for all rows).
+    """
+    def __init__(self, packed: np.ndarray, num_cols: int):
+        packed = np.asarray(packed, dtype=np.uint8)
+        if packed.ndim == 1:
+            packed = packed.reshape(1, -1)
+        expected_bytes = (num_cols + 7) // 8
+        if packed.shape[1] != expected_bytes:
+            raise ValueError(f"Packed rows must have {expected_bytes} bytes for {num_cols} columns, got {packed.shape[1]}")
+        self.packed = packed
+        self.num_cols = num_cols
+
+    # CONSTRUCTORS
+    @classmethod
+    def zeros(cls, num_rows: int, num_cols: int) -> "CoverageMatrix":
+        return cls(np.zeros((num_rows, (num_cols + 7) // 8), dtype=np.uint8), num_cols)
+
+    @classmethod
+    def from_bool(cls, dense: np.ndarray) -> "CoverageMatrix":
+        """Build from a dense (num_rows, num_cols) boolean or 0/1 array"""
+        dense = np.asarray(dense, dtype=bool)
+        if dense.ndim == 1:
+            dense = dense.reshape(1, -1)
+        return cls(np.packbits(dense, axis=1), dense.shape[1])
+
+    @classmethod
+    def from_bit_strings(cls, bit_strings: list, num_cols: int = None) -> "CoverageMatrix":
+        """Build from '0'/'1' coverage strings of equal length"""
+        if num_cols is None:
+            num_cols = len(bit_strings[0]) if bit_strings else 0
+        matrix = cls.zeros(len(bit_strings), num_cols)
+        for row_idx, bit_string in enumerate(bit_strings):
+            if len(bit_string) != num_cols:
+                raise ValueError(f"Row {row_idx} has {len(bit_string)} bits, expected {num_cols}")
+            bits = np.frombuffer(bit_string.encode("ascii"), dtype=np.uint8) == ord("1")
+            matrix.packed[row_idx] = np.packbits(bits)
+        return matrix
+
+    @classmethod
+    def from_bytes_list(cls, rows: list, num_cols: int) -> "CoverageMatrix":
+        """Build from rows encoded with row_to_bytes() (e.g., BYTEA values read from the DB)"""
+        matrix = cls.zeros(len(rows), num_cols)
+        for row_idx, row in enumerate(rows):
+            matrix.packed[row_idx] = np.frombuffer(bytes(row), dtype=np.uint8)
+        return matrix
+
+    @classmethod
+    def from_rows(cls, rows: list, num_cols: int) -> "CoverageMatrix":
+        """
+        Build from rows given either as packed bytes (row_to_bytes()) or as '0'/'1' strings,
+        as read from cpp_tc_info before and after the packed coverage. None rows stay empty
+        and strings are cut or padded to num_cols.
+        """
+        matrix = cls.zeros(len(rows), num_cols)
+        for row_idx, row in enumerate(rows):
+            if row is None:
+                continue
+            if isinstance(row, str):
+                bits = np.zeros(num_cols, dtype=bool)
+                symbols = np.frombuffer(row[:num_cols].encode("ascii"), dtype=np.uint8)
+                bits[:len(symbols)] = symbols == ord("1")
+                matrix.packed[row_idx] = np.packbits(bits)
+            else:
+                matrix.packed[row_idx] = np.frombuffer(bytes(row), dtype=np.uint8)
+        return matrix
+
+    # SHAPE
+    @property
+    def num_rows(self) -> int:
+        return self.packed.shape[0]
+
+    @property
+    def shape(self) -> tuple:
+        return (self.num_rows, self.num_cols)
+
+    def __len__(self) -> int:
+        return self.num_rows
+
+    # ROW ACCESS
+    def set_row(self, row_idx: int, col_indices) -> None:
+        """Mark the given columns as covered in a row"""
+        bits = np.zeros(self.num_cols, dtype=bool)
+        bits[np.asarray(col_indices, dtype=np.int64)] = True
+        self.packed[row_idx] = np.packbits(bits)
+
+    def row_to_bool(self, row_idx: int) -> np.ndarray:
+        return np.unpackbits(self.packed[row_idx], count=self.num_cols).astype(bool)
+
+    def row_to_bit_string(self, row_idx: int) -> str:
+        bits = np.unpackbits(self.packed[row_idx], count=self.num_cols)
+        return (bits + ord("0")).tobytes().decode("ascii")
+
+    def row_to_bytes(self, row_idx: int) -> bytes:
+        return self.packed[row_idx].tobytes()
+
+    def to_bit_strings(self) -> list:
+        return [self.row_to_bit_string(row_idx) for row_idx in range(self.num_rows)]
+
+    def to_bytes_list(self) -> list:
+        return [self.row_to_bytes(row_idx) for row_idx in range(self.num_rows)]
+
+    def to_bool(self) -> np.ndarray:
+        return np.unpackbits(self.packed, axis=1, count=self.num_cols).astype(bool)
+
+    def column_to_bool(self, col_idx: int) -> np.ndarray:
+        """Boolean vector telling for each row whether it covers the column"""
+        return (self.packed[:, col_idx >> 3] & (0x80 >> (col_idx & 7))) != 0
+
+    # VECTORIZED OPERATIONS
+    def select_rows(self, row_indices) -> "CoverageMatrix":
+        return CoverageMatrix(self.packed[np.asarray(row_indices, dtype=np.int64)], self.num_cols)
+
+    def select_columns(self, col_indices) -> "CoverageMatrix":
+        """Keep only the given columns, in the given order"""
+        col_indices = np.asarray(col_indices, dtype=np.int64)
+        packed = np.zeros((self.num_rows, (len(col_indices) + 7) // 8), dtype=np.uint8)
+        for start in range(0, self.num_rows, UNPACK_CHUNK_ROWS):
+            chunk = np.unpackbits(self.packed[start:start + UNPACK_CHUNK_ROWS], axis=1, count=self.num_cols)
+            packed[start:start + UNPACK_CHUNK_ROWS] = np.packbits(chunk[:, col_indices], axis=1)
+        return CoverageMatrix(packed, len(col_indices))
+
+    def transpose(self) -> "CoverageMatrix":
+        """Line-by-test matrix of the same coverage, unpacked UNPACK_CHUNK_ROWS rows at a time"""
+        packed = np.zeros((self.num_cols, (self.num_rows + 7) // 8), dtype=np.uint8)
+        for start in range(0, self.num_rows, UNPACK_CHUNK_ROWS):
+            chunk = np.unpackbits(self.packed[start:start + UNPACK_CHUNK_ROWS], axis=1, count=self.num_cols)
+            packed[:, start // 8:(start + len(chunk) + 7) // 8] = np.packbits(chunk.T, axis=1)
+        return CoverageMatrix(packed, self.num_rows)
+
+    def union(self) -> np.ndarray:
+        """Packed bit vector of the columns covered by at least one row"""
+        if self.num_rows == 0:
+            return np.zeros(self.packed.shape[1], dtype=np.uint8)
+        return np.bitwise_or.reduce(self.packed, axis=0)
+
+    def intersection(self) -> np.ndarray:
+        """Packed bit vector of the columns covered by every row"""
+        if self.num_rows == 0:
+            return np.zeros(self.packed.shape[1], dtype=np.uint8)
+        return np.bitwise_and.reduce(self.packed, axis=0)
+
+    def intersects(self, packed_mask: np.ndarray) -> np.ndarray:
+        """Boolean vector telling for each row whether it covers any column of packed_mask"""
+        return np.any(self.packed & np.asarray(packed_mask, dtype=np.uint8), axis=1)
+
+    def popcount(self) -> np.ndarray:
+        """Number of covered columns of each row"""
+        return POPCOUNT_TABLE[self.packed].sum(axis=1, dtype=np.int64)
+
+    def column_counts(self, row_weights: np.ndarray = None) -> np.ndarray:
+        """
+        Weighted number of rows covering each column (row_weights @ dense matrix).
+        All rows count once when row_weights is not given.
+        """
+        if row_weights is None:
+            row_weights = np.ones(self.num_rows, dtype=np.int64)
+        row_weights = np.asarray(row_weights)
+        counts = np.zeros(self.num_cols, dtype=np.result_type(row_weights.dtype, np.int64))
+        for start in range(0, self.num_rows, UNPACK_CHUNK_ROWS):
+            chunk = np.unpackbits(self.packed[start:start + UNPACK_CHUNK_ROWS], axis=1, count=self.num_cols)
+            counts += row_weights[start:start + UNPACK_CHUNK_ROWS] @ chunk
+        return counts
+
+
+def unpack_mask(packed_mask: np.ndarray, num_cols: int) -> np.ndarray:
+    """Boolean vector of a packed bit vector returned by union() or intersection()"""
+    return np.unpackbits(np.asarray(packed_mask, dtype=np.uint8), count=num_cols).astype(bool)
+
+
+def mask_popcount(packed_mask: np.ndarray) -> int:
+    return int(POPCOUNT_TABLE[np.asarray(packed_mask, dtype=np.uint8)].sum())
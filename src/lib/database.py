@@ -1,59 +1,132 @@
 import psycopg2
+import psycopg2.extras
+import psycopg2.pool
+import threading
 import time
 import logging
+from contextlib import contextmanager
 
 LOGGER = logging.getLogger(__name__)
 
+class TransactionLostError(psycopg2.OperationalError):
+    """The connection was lost with uncommitted writes, the caller has to replay its whole transaction"""
+
+
 class Database:
     """
     Database class to handle database connections and operations
     """
     def __init__(self, 
                  host: str, port: int, user: str, 
-                 password: str, database: str
+                 password: str, database: str,
+                 pool: psycopg2.pool.AbstractConnectionPool = None
         ):
         self.host = host
         self.port = port
         self.user = user
         self.password = password
         self.database = database
+        self.pool = pool
+        self.db = None
+        self.cursor = None
+        # writes executed since the last commit or rollback, lost with the connection
+        self.pending_writes = False
 
         self.connect()
     
     def connect(self):
-        self.db = psycopg2.connect(
-            host=self.host,
-            port=self.port,
-            user=self.user,
-            password=self.password,
-            dbname=self.database
-        )
+        if self.pool is not None:
+            self.db = self.pool.getconn()
+        else:
+            self.db = psycopg2.connect(
+                host=self.host,
+                port=self.port,
+                user=self.user,
+                password=self.password,
+                dbname=self.database
+            )
         self.cursor = self.db.cursor()
     
     def reconnect(self):
         try:
-            self.db.close()
+            if self.pool is not None:
+                self.pool.putconn(self.db, close=True)
+            else:
+                self.db.close()
         except Exception as e:
             LOGGER.error(f"Error closing database connection: {e}")
         self.connect()
 
-    def __del__(self):
+    def _recover_connection(self, error: Exception):
+        """
+        Reconnect after a connection error. A statement may only be retried on the
+        new connection when no write of the current transaction was lost with the
+        old one, otherwise TransactionLostError is raised.
+        """
+        lost_writes = self.pending_writes
+        self.pending_writes = False
+        self.reconnect()
+        if lost_writes:
+            raise TransactionLostError(f"Connection lost with uncommitted writes: {error}") from error
+
+    def _track_writes(self, query: str):
+        if not query.lstrip().upper().startswith("SELECT"):
+            self.pending_writes = True
+
+    def run_transaction(self, unit, retries: int = 5, delay: float = 10.0):
+        """
+        Run unit() and commit it as one transaction, replaying the whole unit when
+        the connection is lost before the commit. Inside a transaction that already
+        has uncommitted writes, unit() is only run and committed once.
+        """
+        if self.pending_writes:
+            result = unit()
+            self.commit()
+            return result
+
+        attempt = 0
+        while True:
+            try:
+                result = unit()
+                self.commit()
+                return result
+            except TransactionLostError as e:
+                attempt += 1
+                if attempt >= retries:
+                    raise
+                LOGGER.error(f"{e} -- replaying the transaction {attempt}/{retries} in {delay} secs.")
+                time.sleep(delay)
+
+    def close(self):
+        """Close the connection, or hand it back to the pool it was taken from"""
+        if self.db is None:
+            return
         try:
             self.cursor.close()
-            self.db.close()
+            if self.pool is not None:
+                self.pool.putconn(self.db)
+            else:
+                self.db.close()
         except Exception as e:
             LOGGER.error(f"Error closing database connection: {e}")
+        finally:
+            self.db = None
+            self.cursor = None
+
+    def __del__(self):
+        self.close()
 
     def execute(self, query: str, args: dict = {}, retries: int = 5, delay: float = 10.0) -> list:
         attempt = 0
         while attempt < retries:
             try:
                 self.cursor.execute(query, args)
+                self._track_writes(query)
                 return self.cursor.fetchall()
             except psycopg2.OperationalError as e:
+                self._recover_connection(e)
                 attempt += 1
                 LOGGER.error(f"DB connection error: {e} -- retrying {attempt}/{retries} in {delay} secs.")
-                self.reconnect()
                 time.sleep(delay)
             except Exception as e:
                 LOGGER.error(f"Unexpected error: {e}")
@@ -67,11 +140,12 @@ class Database:
         while attempt < retries:
             try:
                 self.cursor.execute(query, args)
+                self._track_writes(query)
                 return  # success
             except psycopg2.OperationalError as e:
+                self._recover_connection(e)
                 attempt += 1
                 LOGGER.error(f"OperationalError: {e} -- retrying {attempt}/{retries}.")
-                self.reconnect()
                 time.sleep(delay)
             except Exception as e:
                 LOGGER.error(f"Unexpected error: {e}")
@@ -80,19 +154,55 @@ class Database:
             f"safe_execute failed after {retries} retries: {query} with args {args}"
         )
 
-    
+    def safe_execute_values(self, query: str, rows: list, page_size: int = 1000, retries: int = 5, delay: float = 10.0) -> list:
+        """
+        Execute a query with a single VALUES %s placeholder for many rows at once
+        returns the fetched rows when the query has a RETURNING clause
+        """
+        attempt = 0
+        while attempt < retries:
+            try:
+                result = psycopg2.extras.execute_values(
+                    self.cursor, query, rows,
+                    page_size=page_size,
+                    fetch="RETURNING" in query.upper()
+                )
+                self._track_writes(query)
+                return result
+            except psycopg2.OperationalError as e:
+                self._recover_connection(e)
+                attempt += 1
+                LOGGER.error(f"OperationalError: {e} -- retrying {attempt}/{retries}.")
+                time.sleep(delay)
+            except Exception as e:
+                LOGGER.error(f"Unexpected error: {e}")
+                raise
+        raise psycopg2.OperationalError(
+            f"safe_execute_values failed after {retries} retries: {query} with {len(rows)} rows"
+        )
+
     def commit(self):
         try:
             self.db.commit()
+        except psycopg2.OperationalError as e:
+            # committing on a new connection would silently drop the lost writes
+            LOGGER.error(f"OperationalError: {e} -- attempting reconnect.")
+            self._recover_connection(e)
+        self.pending_writes = False
+
+    def rollback(self):
+        self.pending_writes = False
+        try:
+            self.db.rollback()
         except psycopg2.OperationalError as e:
             LOGGER.error(f"OperationalError: {e} -- attempting reconnect.")
             self.reconnect()
-            self.db.commit()
 
 
 class CRUD(Database):
-    def __init__(self, host: str, port: int, user: str, password: str, database: str):
-        super().__init__(host, port, user, password, database)
+    def __init__(self, host: str, port: int, user: str, password: str, database: str,
+                 pool: psycopg2.pool.AbstractConnectionPool = None):
+        super().__init__(host, port, user, password, database, pool=pool)
 
     # CRUD FUNCTIONS
     def create_table(self, table_name: str, columns: str) -> None:
@@ -130,11 +240,37 @@ class CRUD(Database):
         self.safe_execute(query)
         self.commit()
 
-    def insert(self, table_name: str, columns: str, values: list) -> None:
+    def insert(self, table_name: str, columns: str, values: list, returning: str = None, commit: bool = True):
+        """
+        Insert a single row.
+
+        :param returning: str, column to return from the inserted row (e.g., a serial id)
+        :param commit: bool, set to False to keep the row in the current transaction
+        """
         placeholders = ", ".join(["%s"] * len(values))
         query = f"INSERT INTO {table_name} ({columns}) VALUES ({placeholders})"
-        self.safe_execute(query, values)
-        self.commit()
+        if returning:
+            query += f" RETURNING {returning}"
+
+        def _insert():
+            self.safe_execute(query, values)
+            return self.cursor.fetchone()[0] if returning else None
+        return self.run_transaction(_insert) if commit else _insert()
+
+    def bulk_insert(self, table_name: str, columns: str, rows: list, page_size: int = 1000, commit: bool = True) -> None:
+        """
+        Insert many rows with multi-row INSERT statements instead of one round trip per row.
+
+        :param rows: list, sequences of values ordered as in columns
+        :param commit: bool, set to False to keep the rows in the current transaction
+        """
+        if not rows:
+            return
+        query = f"INSERT INTO {table_name} ({columns}) VALUES %s"
+        if commit:
+            self.run_transaction(lambda: self.safe_execute_values(query, rows, page_size=page_size))
+        else:
+            self.safe_execute_values(query, rows, page_size=page_size)
 
     def read(self, table_name: str, columns: str = "*", conditions: dict = {}, special: str = "") -> list:
         query = f"SELECT {columns} FROM {table_name}"
@@ -169,15 +305,33 @@ class CRUD(Database):
         if special != "":
             query += f" {special}"
         
-        self.safe_execute(query, values)
-        self.commit()
+        self.run_transaction(lambda: self.safe_execute(query, values))
+
+    def bulk_update(self, table_name: str, set_columns: list, key_columns: list, rows: list, page_size: int = 1000, commit: bool = True) -> None:
+        """
+        Update many rows with UPDATE ... FROM (VALUES ...) instead of one statement per row.
+
+        :param set_columns: list, columns to update
+        :param key_columns: list, columns identifying the row to update
+        :param rows: list, sequences of values ordered as key_columns followed by set_columns
+        :param commit: bool, set to False to keep the updates in the current transaction
+        """
+        if not rows:
+            return
+        columns = key_columns + set_columns
+        set_clause = ", ".join([f"{col} = v.{col}" for col in set_columns])
+        condition_clause = " AND ".join([f"{table_name}.{col} = v.{col}" for col in key_columns])
+        query = f"UPDATE {table_name} SET {set_clause} FROM (VALUES %s) AS v ({', '.join(columns)}) WHERE {condition_clause}"
+        if commit:
+            self.run_transaction(lambda: self.safe_execute_values(query, rows, page_size=page_size))
+        else:
+            self.safe_execute_values(query, rows, page_size=page_size)
 
     def delete(self, table_name: str, conditions: dict = {}) -> None:
         condition_clause = " AND ".join([f"{col} = %s" for col in conditions.keys()])
         query = f"DELETE FROM {table_name} WHERE {condition_clause}"
         values = list(conditions.values())
-        self.safe_execute(query, values)
-        self.commit()
+        self.run_transaction(lambda: self.safe_execute(query, values))
 
 
     def add_column(self, table_name: str, column_definition: str) -> None:
@@ -231,4 +385,56 @@ class CRUD(Database):
         query = f"SELECT EXISTS (SELECT 1 FROM {table_name} WHERE {condition_clause})"
         values = list(conditions.values())
         result = self.execute(query, values)
-        return 1 if result[0][0] else 0
\ No newline at end of file
+        return 1 if result[0][0] else 0
+
+class CRUDPool:
+    """
+    Thread-safe pool of database connections.
+    psycopg2 connections and cursors must not be shared between threads,
+    so each thread checks out its own CRUD bound to a pooled connection.
+    """
+    def __init__(self, host: str, port: int, user: str, password: str, database: str,
+                 minconn: int = 1, maxconn: int = 4):
+        self.host = host
+        self.port = port
+        self.user = user
+        self.password = password
+        self.database = database
+        self.maxconn = maxconn
+
+        self.pool = psycopg2.pool.ThreadedConnectionPool(
+            minconn, maxconn,
+            host=host,
+            port=port,
+            user=user,
+            password=password,
+            dbname=database
+        )
+        # ThreadedConnectionPool raises instead of waiting when exhausted
+        self.slots = threading.BoundedSemaphore(maxconn)
+
+    @contextmanager
+    def checkout(self):
+        """
+        Borrow a connection for the duration of the with-block.
+        Uncommitted work is rolled back if the block raises.
+        """
+        with self.slots:
+            crud = CRUD(
+                self.host, self.port, self.user,
+                self.password, self.database,
+                pool=self.pool
+            )
+            try:
+                yield crud
+            except Exception:
+                crud.rollback()
+                raise
+            finally:
+                crud.close()
+
+    def close(self):
+        try:
+            self.pool.closeall()
+        except Exception as e:
+            LOGGER.error(f"Error closing database connection pool: {e}")
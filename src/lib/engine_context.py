@@ -20,3 +20,6 @@ class EngineContext:
     # Executables
     musicup_exec: str
     extractor_exec: str
+
+    # Expected cost of a task, set by engines with a cost model (None: every task costs the same)
+    TASK_COST: Any = None
@@ -7,6 +7,7 @@ import pickle
 
 from lib.engines.engine import Engine
 from lib.experiment_configs import ExperimentConfigs
+from lib.feature_store import FeatureStore
 
 from utils.consructor_utils import *
 
@@ -82,6 +83,9 @@ class DatasetConstructor(Engine):
             task_queue.put(task)
             LOGGER.debug(f"Added task: repeat {task[0]}, mutant {task[1][1]}")
 
+        if self.DB_POOL is None:
+            self.DB_POOL = self._create_db_pool(maxconn=core_cnt)
+
         with concurrent.futures.ThreadPoolExecutor(max_workers=core_cnt) as executor:
             futures = [
                 executor.submit(self._worker, task_queue)
@@ -99,16 +103,18 @@ class DatasetConstructor(Engine):
             os.makedirs(rid_dir, exist_ok=True)
 
         target_code_file, mutant, target_file_mutant_dir_path, bug_idx = mutant
-        THREAD_DB = self._create_db()
 
-        try:
-            output_file = os.path.join(rid_dir, f"bug{bug_idx}--{mutant.name}--lineIdx2lineData.pkl")
+        with self.DB_POOL.checkout() as THREAD_DB:
+            output_path = os.path.join(rid_dir, f"bug{bug_idx}--{mutant.name}--lineIdx2lineData")
+            legacy_pkl_file = output_path + ".pkl"
 
-            if not os.path.exists(output_file):
-                lineIdx2lineData = get_lineIdx2lineData(THREAD_DB, bug_idx)
-            else:
-                with open(output_file, 'rb') as f:
+            if FeatureStore.exists(output_path):
+                lineIdx2lineData = FeatureStore.load(output_path, mmap=False).to_lineIdx2lineData()
+            elif os.path.exists(legacy_pkl_file):
+                with open(legacy_pkl_file, 'rb') as f:
                     lineIdx2lineData = pickle.load(f)
+            else:
+                lineIdx2lineData = get_lineIdx2lineData(THREAD_DB, bug_idx)
             
             measure_scores(
                 self.CONTEXT,
@@ -117,18 +123,10 @@ class DatasetConstructor(Engine):
                 THREAD_DB, rid
             )
 
-            with open(output_file, 'wb') as f:
-                pickle.dump(lineIdx2lineData, f)
-            LOGGER.debug(f"Saved lineIdx2lineData to {output_file}")
-        finally:
-            try:
-                if hasattr(THREAD_DB, "cursor") and THREAD_DB.cursor:
-                    THREAD_DB.cursor.close()
-                if hasattr(THREAD_DB, "db") and THREAD_DB.db:
-                    THREAD_DB.db.close()
-                LOGGER.debug("Database connection closed")
-            except Exception as e:
-                LOGGER.error(f"Error closing database connection: {e}")
+            FeatureStore.from_lineIdx2lineData(lineIdx2lineData).save(output_path)
+            if os.path.exists(legacy_pkl_file):
+                os.remove(legacy_pkl_file)
+            LOGGER.debug(f"Saved lineIdx2lineData feature store to {output_path}")
 
     def cleanup(self):
         """Clean up resources used by the mutant dataset constructor"""
@@ -99,14 +99,14 @@ class DatasetPostprocessor(Engine):
                     raise FileNotFoundError(f"Directory {rid_dir} does not exist.")
                 
                 # For each fault (bid) in the subject
-                for bid_pkl_file_name in os.listdir(rid_dir):
-                    # e.g., bug95--adler32_avx2.MUT18.c--lineIdx2lineData.pkl
-                    bid = int(bid_pkl_file_name.split("--")[0].replace("bug", ""))
+                for bid_file_name in get_bid_data_files(rid_dir):
+                    # e.g., bug95--adler32_avx2.MUT18.c--lineIdx2lineData.json (or legacy .pkl)
+                    bid = int(bid_file_name.split("--")[0].replace("bug", ""))
                     # if bid != 1: continue
                     full_fault_id = f"{subject_name}_{bid}"
-                    bid_pkl_file = os.path.join(rid_dir, bid_pkl_file_name)
+                    bid_file = os.path.join(rid_dir, bid_file_name)
 
-                    bid_data = normalize_data(bid_pkl_file, self.CONFIG.ENV)
+                    bid_data = normalize_data(bid_file, self.CONFIG.ENV)
 
                     #  Set the test dataset
                     set_statement_info = False
@@ -9,7 +9,8 @@ from lib.subject import Subject
 from lib.factories.file_manager_factory import FileManagerFactory
 from lib.factories.executor_factory import ExecutorFactory
 from lib.engine_context import EngineContext
-from lib.database import CRUD
+from lib.database import CRUD, CRUDPool
+from lib.task_ledger import TaskLedger, is_ledger_enabled
 
 LOGGER = logging.getLogger(__name__)
 
@@ -23,7 +24,9 @@ class Engine(ABC):
         self.EXECUTOR = ExecutorFactory.create_executor(
             self.CONFIG.ARGS.is_remote
         )
+        # self.DB belongs to the main thread, thread pools check out connections from self.DB_POOL
         self.DB = self._create_db()
+        self.DB_POOL = None
 
         # Initialize all paths
         self._initialize_paths()
@@ -39,7 +42,8 @@ class Engine(ABC):
             # Create context for executors with updated paths
             self.CONTEXT = self._create_context()
 
-            if self.CONFIG.ARGS.engine_type not in ["dataset_constructor", "editor"]:
+            # a simulated schedule only reads the recorded runs from the DB
+            if self.CONFIG.ARGS.engine_type not in ["dataset_constructor", "editor"] and not self.CONFIG.ARGS.simulate_schedule:
                 # Initialize directories for machines
                 self._initialize_basic_directory_for_machines()
         else:
@@ -68,6 +72,19 @@ class Engine(ABC):
             database=self.CONFIG.ENV["DB"]
         )
     
+    def _create_db_pool(self, maxconn: int = None) -> CRUDPool:
+        """Create a pool of DB connections for thread pools, one connection per core by default"""
+        if maxconn is None:
+            maxconn = len(self.CONFIG.MACHINE_CORE_LIST)
+        return CRUDPool(
+            host=self.CONFIG.ENV["DB_HOST"],
+            port=self.CONFIG.ENV["DB_PORT"],
+            user=self.CONFIG.ENV["DB_USER"],
+            password=self.CONFIG.ENV["DB_PASSWORD"],
+            database=self.CONFIG.ENV["DB"],
+            maxconn=max(1, maxconn)
+        )
+    
     def _create_context(self) -> EngineContext:
         """Create an EngineContext object with all necessary data"""
         return EngineContext(
@@ -146,7 +163,7 @@ class Engine(ABC):
         LOGGER.debug("Tool executables copied to tools directory")
 
         # Setup subject repository
-        self.FILE_MANAGER.copy_directory(self.src_repo, self.dest_repo)
+        self.FILE_MANAGER.provision_directory(self.src_repo, self.dest_repo)
         if self.SUBJECT.name is not None:
             self.SUBJECT.set_files(self.dest_repo)
             self.SUBJECT.set_subject_configurations()
@@ -168,6 +185,16 @@ class Engine(ABC):
         self.EXECUTOR.prepare_for_execution(self.CONTEXT)
         LOGGER.debug("Basic directory structure initialized for execution")
 
+        if is_ledger_enabled(self.CONFIG.ENV):
+            # tasks left running by an interrupted run are queued again, done tasks are skipped by the workers
+            LEDGER = TaskLedger(
+                self.DB, self.CONFIG.STAGE,
+                self.CONFIG.ARGS.subject, self.CONFIG.ARGS.experiment_label,
+                self.CONFIG.ENV
+            )
+            LEDGER.initialize()
+            LEDGER.requeue_interrupted()
+
     @abstractmethod
     def run(self):
         """Execute the engine's main functionality"""
@@ -175,7 +202,9 @@ class Engine(ABC):
     
     def cleanup(self):
         """Optional cleanup method that subclasses can override"""
-        pass
+        if self.DB_POOL is not None:
+            self.DB_POOL.close()
+            self.DB_POOL = None
 
     def get_target_mutants(self, special: str = None, distinct_by_buggy_location: bool = False) -> list:
         """Get the list of target mutants to process
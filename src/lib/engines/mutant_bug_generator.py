@@ -173,7 +173,7 @@ class MutantBugGenerator(Engine):
         return mutant_list
 
     def _start_testing_for_mutant_bugs(self, mutant_list: list):
-        self.EXECUTOR.test_for_mutant_bugs(self.CONTEXT, mutant_list)
+        return self.EXECUTOR.test_for_mutant_bugs(self.CONTEXT, mutant_list)
 
     # Initialize required tables in the database
     def _initialize_required_tables(self):
@@ -242,9 +242,11 @@ class MutantBugGenerator(Engine):
                     "execution_time_ms DOUBLE PRECISION",
 
                     "bit_sequence_length INT",
-                    "line_coverage_bit_sequence TEXT",
+                    "line_coverage_bit_sequence TEXT", # -- '0'/'1' coverage of rows written before line_coverage_bits
                     "full_bit_sequence_length INT",
-                    "full_line_coverage_bit_sequence TEXT",
+                    "full_line_coverage_bit_sequence TEXT", # -- '0'/'1' coverage of rows written before full_line_coverage_bits
+                    "line_coverage_bits BYTEA", # -- packed coverage of the bit_sequence_length candidate lines
+                    "full_line_coverage_bits BYTEA", # -- packed coverage of the full_bit_sequence_length lines
 
                     "exception_type TEXT DEFAULT NULL",
                     "exception_msg TEXT DEFAULT NULL",
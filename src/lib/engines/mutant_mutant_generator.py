@@ -85,7 +85,7 @@ class MutantMutantGenerator(Engine):
         LOGGER.debug(f"MutantMutant directory created at: {self.mutant_mutants_dir}")
     
     def _start_generating_mutants(self, mutant_list: list):
-        self.EXECUTOR.generate_mutants_from_mutants(self.CONTEXT, mutant_list)
+        return self.EXECUTOR.generate_mutants_from_mutants(self.CONTEXT, mutant_list)
 
     
     def cleanup(self):
@@ -3,6 +3,8 @@ from pathlib import Path
 
 from lib.engines.engine import Engine
 from lib.experiment_configs import ExperimentConfigs
+from lib.cost_model import CostModel, simulate_makespan, simulate_fifo_makespan
+from lib.affinity_scheduler import AffinityScheduler
 
 from utils.command_utils import *
 
@@ -45,10 +47,24 @@ class MutationTestingResultExtractor(Engine):
             )
         LOGGER.debug(f"Total mutants to process: {len(mutant_list)}")
 
+        # expected task costs from the recorded runs, the longest expected origin bugs are scheduled first
+        COST_MODEL = CostModel(self.DB)
+        COST_MODEL.load([bug_idx for _, _, _, bug_idx in mutant_list])
+        self.CONTEXT.TASK_COST = COST_MODEL.estimate_task
+
+        if self.CONFIG.ARGS.simulate_schedule:
+            self._simulate_schedule(COST_MODEL, mutant_list)
+            return
+
         mutant_mutants_list = self._get_mutant_mutants_from_db(mutant_list)
         LOGGER.debug(f"Testing on {len(mutant_mutants_list)} mutants")
 
-        self._start_extracting_mutation_testing_results(mutant_mutants_list)
+        results = self._start_extracting_mutation_testing_results(mutant_mutants_list)
+        run_cnt = sum(1 for result in results if result["status"] != "abandoned")
+        if run_cnt < len(mutant_mutants_list):
+            # an interrupted run is resumed from the mutant mutants left on disk
+            LOGGER.warning(f"Only {run_cnt}/{len(mutant_mutants_list)} mutant mutants were tested, {self.mutant_mutants_dir} is kept unzipped")
+            return
 
         # zip subject_mutant_mutants_dir
         self.FILE_MANAGER.zip_directory(self.mutant_mutants_dir, self.mutant_mutants_dir)
@@ -94,9 +110,41 @@ class MutationTestingResultExtractor(Engine):
         return mutant_mutants_list
             
     
+    def _simulate_schedule(self, COST_MODEL: CostModel, mutant_list: list) -> dict:
+        """
+        Replay the recorded stage05 tasks of the target bugs on the cores of .machine_settings,
+        pulled in order from one queue and scheduled with the cost model, and report both makespans
+        """
+        recorded_tasks = COST_MODEL.load_recorded_tasks([bug_idx for _, _, _, bug_idx in mutant_list])
+        workers = self.CONFIG.MACHINE_CORE_LIST
+        speeds = {worker: self.CONFIG.MACHINE_SPEED.get(worker[0], 1.0) for worker in workers}
+        recorded_cost = lambda task: task[2]
+
+        fifo_makespan = simulate_fifo_makespan(recorded_tasks, workers, recorded_cost, speeds)
+        scheduler = AffinityScheduler(
+            recorded_tasks, workers,
+            key=lambda task: task[0],
+            cost=lambda task: COST_MODEL.estimate(task[0]),
+            speeds=speeds
+        )
+        scheduled_makespan = simulate_makespan(scheduler.get, workers, recorded_cost, speeds)
+
+        total_cost = sum(recorded_cost(task) for task in recorded_tasks)
+        lower_bound = total_cost / max(sum(speeds.values()), 1e-9)
+        LOGGER.info(f"Simulated {len(recorded_tasks)} recorded tasks on {len(workers)} cores")
+        LOGGER.info(f"Predicted makespan (shared FIFO queue): {fifo_makespan / 1000:.1f}s")
+        LOGGER.info(f"Predicted makespan (cost model, longest first): {scheduled_makespan / 1000:.1f}s ({scheduler.steal_cnt} steals)")
+        LOGGER.info(f"Lower bound (perfect balance): {lower_bound / 1000:.1f}s")
+        return {
+            "task_cnt": len(recorded_tasks),
+            "fifo_makespan_ms": fifo_makespan,
+            "scheduled_makespan_ms": scheduled_makespan,
+            "lower_bound_ms": lower_bound,
+        }
+
     def _start_extracting_mutation_testing_results(self, mutant_mutants_list: list):
         """Start the extraction of mutation testing results using the executor"""
-        self.EXECUTOR.test_for_mutation_testing_results(self.CONTEXT, mutant_mutants_list)
+        return self.EXECUTOR.test_for_mutation_testing_results(self.CONTEXT, mutant_mutants_list)
 
 
     def cleanup(self):
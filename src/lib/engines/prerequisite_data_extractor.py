@@ -53,10 +53,17 @@ class PrerequisiteDataExtractor(Engine):
                     "bug_idx"
                 )
         
+        def _add_packed_coverage_columns():
+            # cpp_tc_info tables created before packed coverage was introduced
+            for column in ["line_coverage_bits", "full_line_coverage_bits"]:
+                if not self.DB.column_exists("cpp_tc_info", column):
+                    self.DB.add_column("cpp_tc_info", f"{column} BYTEA DEFAULT NULL")
+        
         _init_cpp_line_info_table()
+        _add_packed_coverage_columns()
     
     def _start_testing_for_prerequisite_data(self, mutant_list: list):
-        self.EXECUTOR.test_for_prerequisite_data(self.CONTEXT, mutant_list)
+        return self.EXECUTOR.test_for_prerequisite_data(self.CONTEXT, mutant_list)
 
     
     def cleanup(self):
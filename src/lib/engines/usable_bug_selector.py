@@ -83,7 +83,7 @@ class UsableBugSelector(Engine):
         LOGGER.debug(f"UPDATED {len(bug_idx_list)} bug_idx to initial:TRUE")
 
     def _start_testing_for_usable_bugs(self, mutant_list: list):
-        self.EXECUTOR.test_for_usable_bugs(self.CONTEXT, mutant_list)
+        return self.EXECUTOR.test_for_usable_bugs(self.CONTEXT, mutant_list)
     
     def cleanup(self):
         """Clean up resources used by the mutant bug generator"""
@@ -1,7 +1,10 @@
 from abc import ABC, abstractmethod
 import logging
+import time
 
 from lib.engine_context import EngineContext
+from lib.executor.worker_daemon_client import WorkerDaemonClient
+from lib.task_ledger import is_ledger_enabled, get_max_attempts, get_retry_backoff, get_retry_delay
 
 LOGGER = logging.getLogger(__name__)
 
@@ -11,6 +14,84 @@ class Executor(ABC):
     def __init__(self):
         LOGGER.info(f"{self.__class__.__name__} initialized")
 
+    def _create_worker_daemon(self, CONTEXT: EngineContext, machine_name: str, core_idx: int, worker_type: str) -> WorkerDaemonClient:
+        """Create the client of the long-lived worker daemon of a core, started lazily at its first task"""
+        cmd = [
+            "python3", "main.py",
+            "--experiment-label", CONTEXT.CONFIG.ARGS.experiment_label,
+            "--subject", CONTEXT.CONFIG.ARGS.subject,
+            "--worker-type", worker_type,
+            "--machine", machine_name,
+            "--core-idx", str(core_idx),
+            "--worker-daemon",
+        ]
+        if CONTEXT.CONFIG.ARGS.debug:
+            cmd.append("--debug")
+        if CONTEXT.CONFIG.ARGS.verbose:
+            cmd.append("--verbose")
+
+        max_attempts, retry_backoff_sec = 1, 0.0
+        if is_ledger_enabled(CONTEXT.CONFIG.ENV):
+            max_attempts = get_max_attempts(CONTEXT.CONFIG.ENV)
+            retry_backoff_sec = get_retry_backoff(CONTEXT.CONFIG.ENV)
+
+        return WorkerDaemonClient(
+            self._wrap_worker_command(CONTEXT, machine_name, cmd),
+            working_dir=CONTEXT.CONFIG.ENV["CWD"],
+            name=f"{machine_name}::core{core_idx}",
+            max_attempts=max_attempts,
+            retry_backoff_sec=retry_backoff_sec
+        )
+
+    def _wrap_worker_command(self, CONTEXT: EngineContext, machine_name: str, cmd: list) -> list:
+        """Wrap the worker command so that it runs on the given machine"""
+        return cmd
+
+    def _run_worker_task(self, daemon: WorkerDaemonClient, task_args: dict) -> bool:
+        """Execute a task on the worker daemon and report whether it succeeded"""
+        LOGGER.debug(f"Dispatching task to {daemon.name}: {task_args}")
+        for attempt in range(1, daemon.max_attempts + 1):
+            result = daemon.submit(task_args)
+            status = result.get("status")
+            if status == "done":
+                LOGGER.debug(f"Task {result.get('task_id')} done on {daemon.name} in {result.get('elapsed_ms'):.0f} ms")
+                return True
+            if status == "skipped":
+                LOGGER.debug(f"Task {result.get('task_id')} skipped on {daemon.name}, already recorded in the task ledger")
+                return True
+
+            if status == "failed":
+                LOGGER.error(f"Task {result.get('task_id')} failed on {daemon.name}: {result.get('error')}")
+            if attempt < daemon.max_attempts:
+                delay = get_retry_delay(daemon.retry_backoff_sec, attempt)
+                LOGGER.warning(f"Retrying task on {daemon.name} in {delay:.0f} secs ({attempt}/{daemon.max_attempts})")
+                time.sleep(delay)
+        return False
+
+    def _build_mutant_task_args(self, task: tuple, needs_configuration: bool) -> dict:
+        """Task arguments of a (target_file, mutant_path) task of stage01 to stage04"""
+        target_file, mutant = task
+        return {
+            "target_file": target_file,
+            "mutant": mutant.name,
+            "needs_configuration": needs_configuration,
+        }
+
+    def _build_mutation_testing_task_args(self, task: tuple, needs_configuration: bool) -> dict:
+        """Task arguments of a stage05 task"""
+        origin_target_code_file, new_target_file, \
+            origin_mutant_path, new_mutant_path, \
+            origin_bug_idx, new_mutant_idx = task
+        return {
+            "target_file": new_target_file,
+            "mutant": new_mutant_path.name,
+            "origin_mutant_target_file": origin_target_code_file,
+            "origin_mutant": origin_mutant_path.name,
+            "bug_id": origin_bug_idx,
+            "mutant_id": new_mutant_idx,
+            "needs_configuration": needs_configuration,
+        }
+
     @abstractmethod
     def prepare_for_execution(self, CONTEXT: EngineContext):
         """Prepare the execution environment"""
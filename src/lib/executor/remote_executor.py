@@ -1,17 +1,28 @@
 import logging
 import os
-import concurrent.futures
-import queue
 
 from lib.executor.executor import Executor
 from lib.engine_context import EngineContext
+from lib.executor.task_dispatcher import TaskDispatcher, make_task_source
+from lib.affinity_scheduler import AffinityScheduler
+from lib.transport.transport import Transport
+from lib.factories.transport_factory import TransportFactory
 from utils.command_utils import *
 
 LOGGER = logging.getLogger(__name__)
 
 class RemoteExecutor(Executor):
-    def __init__(self):
+    def __init__(self, TRANSPORT: Transport = None):
         super().__init__()
+        # worker daemons, clean steps and transfers share one multiplexed connection per machine
+        self.TRANSPORT = TRANSPORT if TRANSPORT is not None else TransportFactory.create_transport("ssh")
+
+    def _wrap_worker_command(self, CONTEXT: EngineContext, machine_name: str, cmd: list) -> list:
+        src_dir = os.path.join(CONTEXT.CONFIG.ENV["SERVER_HOME"], "cpp_dlfl_feature_extractor/src/")
+        return self.TRANSPORT.command(machine_name, [
+            "cd", src_dir,
+            "&&",
+        ] + cmd)
 
     def prepare_for_execution(self, CONTEXT: EngineContext):
         """Set up environment on all remote machines"""
@@ -32,6 +43,10 @@ class RemoteExecutor(Executor):
             # Set up subject working env dir
             CONTEXT.FILE_MANAGER.make_specific_directory(CONTEXT.working_env_dir, machine=machine)
             LOGGER.debug(f"Subject working environment directory created at: {CONTEXT.working_env_dir}")
+
+            # Copy subject repository once to the machine, the cores are provisioned from it
+            CONTEXT.FILE_MANAGER.copy_specific_directory(CONTEXT.src_repo, CONTEXT.working_dir, machine=machine)
+            LOGGER.debug(f"Subject repository copied to: {CONTEXT.dest_repo} on {machine}")
         
         # Set up subject working env for each machine core
         for machine_name, machine_idx, machine_home_directory in CONTEXT.CONFIG.MACHINE_CORE_LIST:
@@ -45,559 +60,204 @@ class RemoteExecutor(Executor):
 
             # Copy subject repository to each machine core working env
             dest_repo_in_core = os.path.join(machine_core_dir, CONTEXT.CONFIG.ARGS.subject)
-            CONTEXT.FILE_MANAGER.copy_specific_directory(CONTEXT.src_repo, machine_core_dir, machine=machine_name)
-            LOGGER.debug(f"Subject repository copied to: {dest_repo_in_core}")
+            CONTEXT.FILE_MANAGER.provision_specific_directory(
+                CONTEXT.dest_repo, dest_repo_in_core,
+                read_only_paths=CONTEXT.SUBJECT.subject_configs.get("read_only_paths", []),
+                machine=machine_name
+            )
+            LOGGER.debug(f"Subject repository provisioned to: {dest_repo_in_core}")
 
             # make coverage directory for each core
             coverage_dir = os.path.join(machine_core_dir, "coverage")
             CONTEXT.FILE_MANAGER.make_specific_directory(coverage_dir, machine=machine_name)
             LOGGER.debug(f"Coverage directory created at: {coverage_dir}")
 
-    # Stage01: Mutant Bug Tester
-    def test_for_mutant_bugs(self, CONTEXT: EngineContext, mutant_list: list):
-        """Test for mutant bugs on remote machines"""
-        def _worker(task_queue, machine_info):
-            machine_name, core_idx, home_directory = machine_info
-            machine_core_dir = os.path.join(CONTEXT.working_env_dir, f"{machine_name}/core{core_idx}")
-            assigned_works_dir = os.path.join(machine_core_dir, f"{CONTEXT.CONFIG.STAGE}-assigned_works")
-
-            needs_configuration = True
-            while True:
-                try:
-                    task = task_queue.get(timeout=1)
-                    if task is None:
-                        break
-                    
-                    target_file, mutant = task
-                    LOGGER.info(f"Worker {machine_name}::core{core_idx} processing mutant {mutant} for file {target_file}")
-
-                    # Copy mutant file to assigned works directory
-                    # lets make it to try once more at failure
-                    try:
-                        CONTEXT.FILE_MANAGER.copy_specific_file(mutant, assigned_works_dir, machine_name)
-                    except Exception as e:
-                        LOGGER.warning(f"Retrying copy of mutant {mutant} to {assigned_works_dir} on {machine_name} due to error: {e}")
-                        CONTEXT.FILE_MANAGER.copy_specific_file(mutant, assigned_works_dir, machine_name)
-
-                    src_dir = os.path.join(CONTEXT.CONFIG.ENV["SERVER_HOME"], "cpp_dlfl_feature_extractor/src/")
-                    cmd = [
-                        "ssh", machine_name,
-                        "cd", src_dir,
-                        "&&",
-                        "python3", "main.py",
-                        "--experiment-label", CONTEXT.CONFIG.ARGS.experiment_label,
-                        "--subject", CONTEXT.CONFIG.ARGS.subject,
-                        "--worker-type", "mutant_bug_tester",
-                        "--machine", machine_name,
-                        "--core-idx", str(core_idx),
-                        "--target-file", target_file,
-                        "--mutant", mutant.name,
-                    ]
-                    if CONTEXT.CONFIG.ARGS.debug:
-                        cmd.append("--debug")
-                    if CONTEXT.CONFIG.ARGS.verbose:
-                        cmd.append("--verbose")
-                    if needs_configuration:
-                        cmd.append("--needs-configuration")
-                        needs_configuration = False
-                    
-
-                    # Execute the command
-                    try:
-                        LOGGER.debug(f"Executing command on {machine_name}::core{core_idx}: {' '.join(cmd)}")
-                        execute_command_as_list(cmd, working_dir=CONTEXT.CONFIG.ENV["CWD"])
-                        LOGGER.debug(f"{machine_name}::core{core_idx} executed command: {' '.join(cmd)} in {home_directory}")
-                    except Exception as e:
-                        LOGGER.error(f"Worker {machine_name}::core{core_idx} encountered an error: {e}")
-                    finally:
-                        task_queue.task_done()
-                except queue.Empty:
-                    break
-                except Exception as e:
-                    LOGGER.error(f"Worker {machine_name}::core{core_idx} encountered an unexpected error: {e}")
-            
-        core_cnt = len(CONTEXT.CONFIG.MACHINE_CORE_LIST)
-        task_queue = queue.Queue()
-        for i, mutant in enumerate(mutant_list):
-            target_file, mutant, target_file_mutant_dir_path = mutant
-            task_queue.put((target_file, mutant))
-
-        # Clean up build artifacts in remote for each repository directory of each core of all machine
+    def _pre_stage_tasks(self, CONTEXT: EngineContext, tasks: list, staged_files: dict, group_idx: int = None, cost=None) -> dict:
+        """
+        Partition the tasks by machine (in proportion to its cores and speed) and ship the
+        files of each partition ahead of dispatch, so tasks only reference file names.
+        staged_files maps a core directory name (e.g. "stage05-mutant_origin") to the
+        index of the file path in a task tuple. With group_idx, tasks sharing the value
+        at that index (e.g. the origin bug) are kept on the same machine. With cost (the
+        expected cost of a task), the longest expected groups are placed and run first.
+        Returns machine name -> list of tasks of the machine.
+        """
+        machine_cores = {}
         for machine_name, core_idx, home_directory in CONTEXT.CONFIG.MACHINE_CORE_LIST:
-            machine_core_dir = os.path.join(CONTEXT.working_env_dir, f"{machine_name}/core{core_idx}")
-            clean_script_dir = os.path.join(machine_core_dir, CONTEXT.SUBJECT.subject_configs["build_script_working_directory"])
-            cmd = [
-                "ssh", machine_name,
-                "cd", clean_script_dir,
-                "&&",
-                "bash", "clean_script.sh"
-            ]
-            execute_command_as_list(cmd, working_dir=CONTEXT.CONFIG.ENV["CWD"])
-            LOGGER.info(f"Cleaned up build artifacts on {machine_name}::core{core_idx}")
-        
-        with concurrent.futures.ThreadPoolExecutor(max_workers=core_cnt) as executor:
-            futures = [
-                executor.submit(_worker, task_queue, machine_info)
-                for machine_info in CONTEXT.CONFIG.MACHINE_CORE_LIST
-            ]
-            for future in concurrent.futures.as_completed(futures):
-                try:
-                    future.result()
-                except Exception as e:
-                    LOGGER.error(f"Error occurred during mutant testing: {e}")
-
-        # Clean up build artifacts in remote for each repository directory of each core of all machine
+            machine_cores.setdefault(machine_name, []).append(core_idx)
+
+        # the longest expected groups go first, plain tasks keep their order without a cost model
+        longest_first = group_idx is not None or cost is not None
+        cost = cost if cost is not None else (lambda task: 1)
+        if group_idx is None:
+            groups = [[task] for task in tasks]
+        else:
+            grouped = {}
+            for task in tasks:
+                grouped.setdefault(task[group_idx], []).append(task)
+            groups = list(grouped.values())
+        group_costs = [(sum(cost(task) for task in group), group) for group in groups]
+        if longest_first:
+            group_costs.sort(key=lambda entry: entry[0], reverse=True)
+
+        partitions = {machine_name: [] for machine_name in machine_cores}
+        loads = {machine_name: 0.0 for machine_name in machine_cores}
+        for group_cost, group in group_costs:
+            # the machine finishing the group the earliest takes it
+            machine_name = min(partitions, key=lambda m: (loads[m] + group_cost) / self._get_capacity(CONTEXT, m, len(machine_cores[m])))
+            partitions[machine_name].extend(group)
+            loads[machine_name] += group_cost
+
+        for machine_name, machine_tasks in partitions.items():
+            for dir_name, file_idx in staged_files.items():
+                # files shared by several tasks (e.g. origin mutants) are shipped once
+                files = list(dict.fromkeys(task[file_idx] for task in machine_tasks))
+                if not files:
+                    continue
+
+                if not self._stage_files(CONTEXT, machine_name, machine_cores[machine_name], dir_name, files):
+                    # the tasks stay unprocessed and are picked up by the next run of the stage
+                    LOGGER.error(f"Failed to stage {len(files)} files to {dir_name} on {machine_name}, skipping its {len(machine_tasks)} tasks")
+                    partitions[machine_name] = []
+                    break
+                LOGGER.info(f"Staged {len(files)} files of {len(machine_tasks)} tasks to {dir_name} on {machine_name}")
+        return partitions
+
+    def _stage_files(self, CONTEXT: EngineContext, machine_name: str, core_idxs: list, dir_name: str, files: list) -> bool:
+        """Ship the files to dir_name of every core of the machine, returns False if the transfer failed"""
+        # one transfer per machine, then one local copy per core on the machine,
+        # the staging directory is emptied so files of a previous run do not reach the cores
+        staging_dir = os.path.join(CONTEXT.working_env_dir, machine_name, dir_name)
+        CONTEXT.FILE_MANAGER.remove_specific_directory(staging_dir, machine=machine_name)
+        CONTEXT.FILE_MANAGER.make_specific_directory(staging_dir, machine=machine_name)
+        if not CONTEXT.FILE_MANAGER.copy_specific_files(files, staging_dir, machine_name):
+            LOGGER.warning(f"Retrying copy of {len(files)} files to {staging_dir} on {machine_name}")
+            if not CONTEXT.FILE_MANAGER.copy_specific_files(files, staging_dir, machine_name):
+                return False
+
+        for core_idx in core_idxs:
+            core_dir = os.path.join(CONTEXT.working_env_dir, f"{machine_name}/core{core_idx}", dir_name)
+            CONTEXT.FILE_MANAGER.provision_specific_directory(staging_dir, core_dir, machine=machine_name)
+        return True
+
+    def _get_capacity(self, CONTEXT: EngineContext, machine_name: str, core_cnt: int) -> float:
+        return core_cnt * CONTEXT.CONFIG.MACHINE_SPEED.get(machine_name, 1.0)
+
+    def _make_task_sources(self, partitions: dict):
+        """get_task of each core, handing out the tasks of its machine"""
+        sources = {machine_name: make_task_source(machine_tasks) for machine_name, machine_tasks in partitions.items()}
+        return lambda core: sources[core[0]](core)
+
+    def _clean_cores(self, CONTEXT: EngineContext):
+        """Clean up build artifacts in remote for each repository directory of each core of all machine"""
         for machine_name, core_idx, home_directory in CONTEXT.CONFIG.MACHINE_CORE_LIST:
             machine_core_dir = os.path.join(CONTEXT.working_env_dir, f"{machine_name}/core{core_idx}")
             clean_script_dir = os.path.join(machine_core_dir, CONTEXT.SUBJECT.subject_configs["build_script_working_directory"])
             cmd = [
-                "ssh", machine_name,
                 "cd", clean_script_dir,
                 "&&",
                 "bash", "clean_script.sh"
             ]
-            execute_command_as_list(cmd, working_dir=CONTEXT.CONFIG.ENV["CWD"])
+            self.TRANSPORT.run(machine_name, cmd, working_dir=CONTEXT.CONFIG.ENV["CWD"])
             LOGGER.info(f"Cleaned up build artifacts on {machine_name}::core{core_idx}")
-    
-    # Stage02: Usable Bug Tester
-    def test_for_usable_bugs(self, CONTEXT: EngineContext, mutant_list: list):
-        """Test for usable bugs on remote machines"""
-        def _worker(task_queue, machine_info):
-            machine_name, core_idx, home_directory = machine_info
-            machine_core_dir = os.path.join(CONTEXT.working_env_dir, f"{machine_name}/core{core_idx}")
-            assigned_works_dir = os.path.join(machine_core_dir, f"{CONTEXT.CONFIG.STAGE}-assigned_works")
-            
-            needs_configuration = True
-            while True:
-                try:
-                    task = task_queue.get(timeout=1)
-                    if task is None:
-                        break
-                    
-                    target_file, mutant = task
-                    LOGGER.info(f"Worker {machine_name}::core{core_idx} processing mutant {mutant} for file {target_file}")
-
-                    # Copy mutant file to assigned works directory
-                    try:
-                        CONTEXT.FILE_MANAGER.copy_specific_file(mutant, assigned_works_dir, machine_name)
-                    except Exception as e:
-                        LOGGER.warning(f"Retrying copy of mutant {mutant} to {assigned_works_dir} on {machine_name} due to error: {e}")
-                        CONTEXT.FILE_MANAGER.copy_specific_file(mutant, assigned_works_dir, machine_name)
 
-                    src_dir = os.path.join(CONTEXT.CONFIG.ENV["SERVER_HOME"], "cpp_dlfl_feature_extractor/src/")
-                    cmd = [
-                        "ssh", machine_name,
-                        "cd", src_dir,
-                        "&&",
-                        "python3", "main.py",
-                        "--experiment-label", CONTEXT.CONFIG.ARGS.experiment_label,
-                        "--subject", CONTEXT.CONFIG.ARGS.subject,
-                        "--worker-type", "usable_bug_tester",
-                        "--machine", machine_name,
-                        "--core-idx", str(core_idx),
-                        "--target-file", target_file,
-                        "--mutant", mutant.name,
-                    ]
-                    if CONTEXT.CONFIG.ARGS.debug:
-                        cmd.append("--debug")
-                    if CONTEXT.CONFIG.ARGS.verbose:
-                        cmd.append("--verbose")
-                    if needs_configuration:
-                        cmd.append("--needs-configuration")
-                        needs_configuration = False
-
-                    try:
-                        # Execute the command
-                        LOGGER.debug(f"Executing command on {machine_name}::core{core_idx}: {' '.join(cmd)}")
-                        execute_command_as_list(cmd, working_dir=CONTEXT.CONFIG.ENV["CWD"])
-                        LOGGER.debug(f"{machine_name}::core{core_idx} executed command: {' '.join(cmd)} in {home_directory}")
-                    except Exception as e:
-                        LOGGER.error(f"Worker {machine_name}::core{core_idx} encountered an error: {e}")
-                    finally:
-                        task_queue.task_done()
-                except queue.Empty:
-                    break
-                except Exception as e:
-                    LOGGER.error(f"Worker {machine_name}::core{core_idx} encountered an unexpected error: {e}")
-            LOGGER.info(f"Worker {machine_name}::core{core_idx} exiting")
+    def _dispatch_mutant_tasks(self, CONTEXT: EngineContext, mutant_list: list, worker_type: str, after_task=None) -> list:
+        tasks = [(mutant[0], mutant[1]) for mutant in mutant_list]
+        partitions = self._pre_stage_tasks(CONTEXT, tasks, {f"{CONTEXT.CONFIG.STAGE}-assigned_works": 1})
+        dispatcher = TaskDispatcher(
+            self, CONTEXT, worker_type,
+            build_task_args=self._build_mutant_task_args,
+            get_task=self._make_task_sources(partitions),
+            after_task=after_task
+        )
+        return dispatcher.run(CONTEXT.CONFIG.MACHINE_CORE_LIST)
 
+    # Stage01: Mutant Bug Tester
+    def test_for_mutant_bugs(self, CONTEXT: EngineContext, mutant_list: list) -> list:
+        """Test for mutant bugs on remote machines"""
+        self._clean_cores(CONTEXT)
+        results = self._dispatch_mutant_tasks(CONTEXT, mutant_list, "mutant_bug_tester")
+        self._clean_cores(CONTEXT)
+        return results
 
-        core_cnt = len(CONTEXT.CONFIG.MACHINE_CORE_LIST)
-        task_queue = queue.Queue()
-        for i, mutant in enumerate(mutant_list):
-            task_queue.put((mutant[0], mutant[1]))
-        
-        with concurrent.futures.ThreadPoolExecutor(max_workers=core_cnt) as executor:
-            futures = [
-                executor.submit(_worker, task_queue, machine_info)
-                for machine_info in CONTEXT.CONFIG.MACHINE_CORE_LIST
-            ]
-            for future in concurrent.futures.as_completed(futures):
-                try:
-                    future.result()
-                except Exception as e:
-                    LOGGER.error(f"Error occurred during usable bug testing: {e}")
+    # Stage02: Usable Bug Tester
+    def test_for_usable_bugs(self, CONTEXT: EngineContext, mutant_list: list) -> list:
+        """Test for usable bugs on remote machines"""
+        results = self._dispatch_mutant_tasks(CONTEXT, mutant_list, "usable_bug_tester")
+        self._clean_cores(CONTEXT)
+        return results
 
-        # Clean up build artifacts in remote for each repository directory of each core of all machine
-        for machine_name, core_idx, home_directory in CONTEXT.CONFIG.MACHINE_CORE_LIST:
-            machine_core_dir = os.path.join(CONTEXT.working_env_dir, f"{machine_name}/core{core_idx}")
-            clean_script_dir = os.path.join(machine_core_dir, CONTEXT.SUBJECT.subject_configs["build_script_working_directory"])
-            cmd = [
-                "ssh", machine_name,
-                "cd", clean_script_dir,
-                "&&",
-                "bash", "clean_script.sh"
-            ]
-            execute_command_as_list(cmd, working_dir=CONTEXT.CONFIG.ENV["CWD"])
-            LOGGER.info(f"Cleaned up build artifacts on {machine_name}::core{core_idx}")
-    
     # Stage03: Prerequisite Data Tester
-    def test_for_prerequisite_data(self, CONTEXT: EngineContext, mutant_list: list):
+    def test_for_prerequisite_data(self, CONTEXT: EngineContext, mutant_list: list) -> list:
         """Test for prerequisite data on remote machines"""
-        def _worker(task_queue, machine_info):
-            machine_name, core_idx, home_directory = machine_info
-            machine_core_dir = os.path.join(CONTEXT.working_env_dir, f"{machine_name}/core{core_idx}")
-            assigned_works_dir = os.path.join(machine_core_dir, f"{CONTEXT.CONFIG.STAGE}-assigned_works")
-            
-            needs_configuration = True
-            while True:
-                try:
-                    task = task_queue.get(timeout=1)
-                    if task is None:
-                        break
-                    
-                    target_file, mutant = task
-                    LOGGER.info(f"Worker {machine_name}::core{core_idx} processing mutant {mutant} for file {target_file}")
-
-                    # Copy mutant file to assigned works directory
-                    try:
-                        CONTEXT.FILE_MANAGER.copy_specific_file(mutant, assigned_works_dir, machine_name)
-                    except Exception as e:
-                        LOGGER.warning(f"Retrying copy of mutant {mutant} to {assigned_works_dir} on {machine_name} due to error: {e}")
-                        CONTEXT.FILE_MANAGER.copy_specific_file(mutant, assigned_works_dir, machine_name)
-
-                    src_dir = os.path.join(CONTEXT.CONFIG.ENV["SERVER_HOME"], "cpp_dlfl_feature_extractor/src/")
-                    cmd = [
-                        "ssh", machine_name,
-                        "cd", src_dir,
-                        "&&",
-                        "python3", "main.py",
-                        "--experiment-label", CONTEXT.CONFIG.ARGS.experiment_label,
-                        "--subject", CONTEXT.CONFIG.ARGS.subject,
-                        "--worker-type", "prerequisite_data_tester",
-                        "--machine", machine_name,
-                        "--core-idx", str(core_idx),
-                        "--target-file", target_file,
-                        "--mutant", mutant.name,
-                    ]
-                    if CONTEXT.CONFIG.ARGS.debug:
-                        cmd.append("--debug")
-                    if CONTEXT.CONFIG.ARGS.verbose:
-                        cmd.append("--verbose")
-                    if needs_configuration:
-                        cmd.append("--needs-configuration")
-                        needs_configuration = False
-                    
-                    try:
-                        # Execute the command
-                        LOGGER.debug(f"Executing command on {machine_name}::core{core_idx}: {' '.join(cmd)}")
-                        execute_command_as_list(cmd, working_dir=CONTEXT.CONFIG.ENV["CWD"])
-                        LOGGER.debug(f"{machine_name}::core{core_idx} executed command: {' '.join(cmd)} in {home_directory}")
-                    except Exception as e:
-                        LOGGER.error(f"Worker {machine_name}::core{core_idx} encountered an error: {e}")
-                    finally:
-                        task_queue.task_done()
-                except queue.Empty:
-                    break
-                except Exception as e:
-                    LOGGER.error(f"Worker {machine_name}::core{core_idx} encountered an unexpected error: {e}")
-            LOGGER.info(f"Worker {machine_name}::core{core_idx} exiting")
-
-        core_cnt = len(CONTEXT.CONFIG.MACHINE_CORE_LIST)
-        task_queue = queue.Queue()
-        for i, mutant in enumerate(mutant_list):
-            task_queue.put((mutant[0], mutant[1]))
-
-        # Clean up build artifacts in remote for each repository directory of each core of all machine
-        for machine_name, core_idx, home_directory in CONTEXT.CONFIG.MACHINE_CORE_LIST:
-            machine_core_dir = os.path.join(CONTEXT.working_env_dir, f"{machine_name}/core{core_idx}")
-            clean_script_dir = os.path.join(machine_core_dir, CONTEXT.SUBJECT.subject_configs["build_script_working_directory"])
-            cmd = [
-                "ssh", machine_name,
-                "cd", clean_script_dir,
-                "&&",
-                "bash", "clean_script.sh"
-            ]
-            execute_command_as_list(cmd, working_dir=CONTEXT.CONFIG.ENV["CWD"])
-            LOGGER.info(f"Cleaned up build artifacts on {machine_name}::core{core_idx}")
-
-        with concurrent.futures.ThreadPoolExecutor(max_workers=core_cnt) as executor:
-            futures = [
-                executor.submit(_worker, task_queue, machine_info)
-                for machine_info in CONTEXT.CONFIG.MACHINE_CORE_LIST
-            ]
-            for future in concurrent.futures.as_completed(futures):
-                try:
-                    future.result()
-                except Exception as e:
-                    LOGGER.error(f"Error occurred during prerequisite data testing: {e}")
-
-        # Clean up build artifacts in remote for each repository directory of each core of all machine
-        for machine_name, core_idx, home_directory in CONTEXT.CONFIG.MACHINE_CORE_LIST:
-            machine_core_dir = os.path.join(CONTEXT.working_env_dir, f"{machine_name}/core{core_idx}")
-            clean_script_dir = os.path.join(machine_core_dir, CONTEXT.SUBJECT.subject_configs["build_script_working_directory"])
-            cmd = [
-                "ssh", machine_name,
-                "cd", clean_script_dir,
-                "&&",
-                "bash", "clean_script.sh"
-            ]
-            execute_command_as_list(cmd, working_dir=CONTEXT.CONFIG.ENV["CWD"])
-            LOGGER.info(f"Cleaned up build artifacts on {machine_name}::core{core_idx}")
+        self._clean_cores(CONTEXT)
+        results = self._dispatch_mutant_tasks(CONTEXT, mutant_list, "prerequisite_data_tester")
+        self._clean_cores(CONTEXT)
+        return results
 
     # Stage04: Mutant Mutant Generator
-    def generate_mutants_from_mutants(self, CONTEXT: EngineContext, mutant_list: list):
+    def generate_mutants_from_mutants(self, CONTEXT: EngineContext, mutant_list: list) -> list:
         """Generate mutants from existing mutants on remote machines"""
-        def _worker(task_queue, machine_info, CONTEXT: EngineContext):
-            machine_name, core_idx, home_directory = machine_info
-            machine_core_dir = os.path.join(CONTEXT.working_env_dir, f"{machine_name}/core{core_idx}")
-            assigned_works_dir = os.path.join(machine_core_dir, f"{CONTEXT.CONFIG.STAGE}-assigned_works")
-            
-            needs_configuration = True
-            while True:
-                try:
-                    task = task_queue.get(timeout=1)
-                    if task is None:
-                        break
-                    
-                    target_file, mutant = task
-                    LOGGER.info(f"Worker {machine_name}::core{core_idx} processing mutant {mutant} for file {target_file}")
-
-                    # Copy mutant file to assigned works directory
-                    try:
-                        CONTEXT.FILE_MANAGER.copy_specific_file(mutant, assigned_works_dir, machine_name)
-                    except Exception as e:
-                        LOGGER.warning(f"Retrying copy of mutant {mutant} to {assigned_works_dir} on {machine_name} due to error: {e}")
-                        CONTEXT.FILE_MANAGER.copy_specific_file(mutant, assigned_works_dir, machine_name)
-
-                    src_dir = os.path.join(CONTEXT.CONFIG.ENV["SERVER_HOME"], "cpp_dlfl_feature_extractor/src/")
-                    cmd = [
-                        "ssh", machine_name,
-                        "cd", src_dir,
-                        "&&",
-                        "python3", "main.py",
-                        "--experiment-label", CONTEXT.CONFIG.ARGS.experiment_label,
-                        "--subject", CONTEXT.CONFIG.ARGS.subject,
-                        "--worker-type", "mutant_generator_worker",
-                        "--machine", machine_name,
-                        "--core-idx", str(core_idx),
-                        "--target-file", target_file,
-                        "--mutant", mutant.name,
-                    ]
-                    if CONTEXT.CONFIG.ARGS.debug:
-                        cmd.append("--debug")
-                    if CONTEXT.CONFIG.ARGS.verbose:
-                        cmd.append("--verbose")
-                    if needs_configuration:
-                        cmd.append("--needs-configuration")
-                        needs_configuration = False
-                    
-
-                    try:
-                        # Execute the command
-                        LOGGER.debug(f"Executing command on {machine_name}::core{core_idx}: {' '.join(cmd)}")
-                        execute_command_as_list(cmd, working_dir=CONTEXT.CONFIG.ENV["CWD"])
-                        LOGGER.debug(f"{machine_name}::core{core_idx} executed command: {' '.join(cmd)} in {home_directory}")
-
-                        # lets bring back the generated mutant mutants
-                        # source: SERVER_HOME/cpp_research_data/<experiment_label>/<subject>/mutant_mutants/<mutant_name>/
-                        # destination: RESARCH_DATA/<experiment_label>/<subject>/mutant_mutants/<mutant_name>
-                        remote_mutant_mutants_dir = os.path.join(
-                            CONTEXT.CONFIG.ENV["SERVER_HOME"],
-                            "cpp_research_data",
-                            CONTEXT.CONFIG.ARGS.experiment_label,
-                            CONTEXT.CONFIG.ARGS.subject,
-                            "mutant_mutants",
-                            mutant.name
-                        )
-                        local_mutant_mutants_dir = os.path.join(
-                            CONTEXT.out_dir,
-                            "mutant_mutants",
-                        )
-                        CONTEXT.FILE_MANAGER.copy_specific_directory_from_remote(
-                            remote_mutant_mutants_dir,
-                            local_mutant_mutants_dir,
-                            machine_name
-                        )
-                        LOGGER.info(f"Copied generated mutant mutants from {machine_name}:{remote_mutant_mutants_dir} to local {local_mutant_mutants_dir}")
-
-                    except Exception as e:
-                        LOGGER.error(f"Worker {machine_name}::core{core_idx} encountered an error: {e}")
-                    finally:
-                        task_queue.task_done()
-                except queue.Empty:
-                    break
-                except Exception as e:
-                    LOGGER.error(f"Worker {machine_name}::core{core_idx} encountered an unexpected error: {e}")
-            LOGGER.info(f"Worker {machine_name}::core{core_idx} exiting")
-
-        core_cnt = len(CONTEXT.CONFIG.MACHINE_CORE_LIST)
-        task_queue = queue.Queue()
-        for i, mutant in enumerate(mutant_list):
-            task_queue.put((mutant[0], mutant[1]))
-
-        # Clean up build artifacts in remote for each repository directory of each core of all machine
-        for machine_name, core_idx, home_directory in CONTEXT.CONFIG.MACHINE_CORE_LIST:
-            machine_core_dir = os.path.join(CONTEXT.working_env_dir, f"{machine_name}/core{core_idx}")
-            clean_script_dir = os.path.join(machine_core_dir, CONTEXT.SUBJECT.subject_configs["build_script_working_directory"])
-            cmd = [
-                "ssh", machine_name,
-                "cd", clean_script_dir,
-                "&&",
-                "bash", "clean_script.sh"
-            ]
-            execute_command_as_list(cmd, working_dir=CONTEXT.CONFIG.ENV["CWD"])
-            LOGGER.info(f"Cleaned up build artifacts on {machine_name}::core{core_idx}")
-        
-        with concurrent.futures.ThreadPoolExecutor(max_workers=core_cnt) as executor:
-            futures = [
-                executor.submit(_worker, task_queue, machine_info, CONTEXT)
-                for machine_info in CONTEXT.CONFIG.MACHINE_CORE_LIST
-            ]
-            for future in concurrent.futures.as_completed(futures):
-                try:
-                    future.result()
-                except Exception as e:
-                    LOGGER.error(f"Error occurred during mutant generation: {e}")
-
-        # Clean up build artifacts in remote for each repository directory of each core of all machine
-        for machine_name, core_idx, home_directory in CONTEXT.CONFIG.MACHINE_CORE_LIST:
-            machine_core_dir = os.path.join(CONTEXT.working_env_dir, f"{machine_name}/core{core_idx}")
-            clean_script_dir = os.path.join(machine_core_dir, CONTEXT.SUBJECT.subject_configs["build_script_working_directory"])
-            cmd = [
-                "ssh", machine_name,
-                "cd", clean_script_dir,
-                "&&",
-                "bash", "clean_script.sh"
-            ]
-            execute_command_as_list(cmd, working_dir=CONTEXT.CONFIG.ENV["CWD"])
-            LOGGER.info(f"Cleaned up build artifacts on {machine_name}::core{core_idx}")
+        def _retrieve_mutant_mutants(core, task, succeeded):
+            machine_name, core_idx, home_directory = core
+            target_file, mutant = task
+            # lets bring back the generated mutant mutants
+            # source: SERVER_HOME/cpp_research_data/<experiment_label>/<subject>/mutant_mutants/<mutant_name>/
+            # destination: RESARCH_DATA/<experiment_label>/<subject>/mutant_mutants/<mutant_name>
+            remote_mutant_mutants_dir = os.path.join(
+                CONTEXT.CONFIG.ENV["SERVER_HOME"],
+                "cpp_research_data",
+                CONTEXT.CONFIG.ARGS.experiment_label,
+                CONTEXT.CONFIG.ARGS.subject,
+                "mutant_mutants",
+                mutant.name
+            )
+            local_mutant_mutants_dir = os.path.join(
+                CONTEXT.out_dir,
+                "mutant_mutants",
+            )
+            CONTEXT.FILE_MANAGER.copy_specific_directory_from_remote(
+                remote_mutant_mutants_dir,
+                local_mutant_mutants_dir,
+                machine_name
+            )
+            LOGGER.info(f"Copied generated mutant mutants from {machine_name}:{remote_mutant_mutants_dir} to local {local_mutant_mutants_dir}")
+
+        self._clean_cores(CONTEXT)
+        results = self._dispatch_mutant_tasks(
+            CONTEXT, mutant_list, "mutant_generator_worker",
+            after_task=_retrieve_mutant_mutants
+        )
+        self._clean_cores(CONTEXT)
+        return results
 
     # stage05: Mutation Testing Result Tester
-    def test_for_mutation_testing_results(self, CONTEXT: EngineContext, mutant_list: list):
+    def test_for_mutation_testing_results(self, CONTEXT: EngineContext, mutant_list: list) -> list:
         """Test for mutation testing results on remote machines"""
-        def _worker(task_queue, machine_info, CONTEXT: EngineContext):
-            machine_name, core_idx, home_directory = machine_info
-            machine_core_dir = os.path.join(CONTEXT.working_env_dir, f"{machine_name}/core{core_idx}")
-            assigned_works_dir = os.path.join(machine_core_dir, f"{CONTEXT.CONFIG.STAGE}-assigned_works")
-            mutant_origin_dir = os.path.join(machine_core_dir, f"{CONTEXT.CONFIG.STAGE}-mutant_origin")
-            
-            needs_configuration = True
-            while True:
-                try:
-                    task = task_queue.get(timeout=1)
-                    if task is None:
-                        break
-                    
-                    origin_target_code_file, new_target_file, \
-                        origin_mutant_path, new_mutant_path, \
-                        origin_bug_idx, new_mutant_idx  = task
-                    LOGGER.info(f"Worker {machine_name}::core{core_idx} processing mutant {mutant} for file {new_target_file}")
-
-                    # Copy mutant file to assigned works directory
-                    try:
-                        CONTEXT.FILE_MANAGER.copy_specific_file(new_mutant_path, assigned_works_dir, machine_name)
-                    except Exception as e:
-                        LOGGER.warning(f"Retrying copy of mutant {new_mutant_path} to {assigned_works_dir} on {machine_name} due to error: {e}")
-                        CONTEXT.FILE_MANAGER.copy_specific_file(new_mutant_path, assigned_works_dir, machine_name)
-
-                    try:
-                        CONTEXT.FILE_MANAGER.copy_specific_file(origin_mutant_path, mutant_origin_dir, machine_name)
-                    except Exception as e:
-                        LOGGER.warning(f"Retrying copy of origin mutant {origin_mutant_path} to {mutant_origin_dir} on {machine_name} due to error: {e}")
-                        CONTEXT.FILE_MANAGER.copy_specific_file(origin_mutant_path, mutant_origin_dir, machine_name)
-
-                    #  Do not forget that target_file here is from cpp_mutation_info table
-                    src_dir = os.path.join(CONTEXT.CONFIG.ENV["SERVER_HOME"], "cpp_dlfl_feature_extractor/src/")
-                    cmd = [
-                        "ssh", machine_name,
-                        "cd", src_dir,
-                        "&&",
-                        "python3", "main.py",
-                        "--experiment-label", CONTEXT.CONFIG.ARGS.experiment_label,
-                        "--subject", CONTEXT.CONFIG.ARGS.subject,
-                        "--worker-type", "mutation_testing_result_tester",
-                        "--machine", machine_name,
-                        "--core-idx", str(core_idx),
-                        "--target-file", new_target_file,
-                        "--mutant", new_mutant_path.name,
-                        "--origin-mutant-target-file", origin_target_code_file,
-                        "--origin-mutant", origin_mutant_path.name,
-                        "--bug-id", str(origin_bug_idx),
-                        "--mutant-id", str(new_mutant_idx)
-                    ]
-                    if CONTEXT.CONFIG.ARGS.debug:
-                        cmd.append("--debug")
-                    if CONTEXT.CONFIG.ARGS.verbose:
-                        cmd.append("--verbose")
-                    if needs_configuration:
-                        cmd.append("--needs-configuration")
-                        needs_configuration = False
-                    
-                    try:
-                        # Execute the command
-                        LOGGER.debug(f"Executing command on {machine_name}::core{core_idx}: {' '.join(cmd)}")
-                        execute_command_as_list(cmd, working_dir=CONTEXT.CONFIG.ENV["CWD"])
-                        LOGGER.debug(f"{machine_name}::core{core_idx} executed command: {' '.join(cmd)} in {home_directory}")
-                    except Exception as e:
-                        LOGGER.error(f"Worker {machine_name}::core{core_idx} encountered an error: {e}")
-                    finally:
-                        task_queue.task_done()
-                except queue.Empty:
-                    break
-                except Exception as e:
-                    LOGGER.error(f"Worker {machine_name}::core{core_idx} encountered an unexpected error: {e}")
-            LOGGER.info(f"Worker {machine_name}::core{core_idx} exiting")
-
-        core_cnt = len(CONTEXT.CONFIG.MACHINE_CORE_LIST)
-        task_queue = queue.Queue()
-        for i, mutant in enumerate(mutant_list):
-            task_queue.put((mutant[0], mutant[1], mutant[2], mutant[3], mutant[4], mutant[5]))
-
-        # Clean up build artifacts in remote for each repository directory of each core of all machine
-        for machine_name, core_idx, home_directory in CONTEXT.CONFIG.MACHINE_CORE_LIST:
-            machine_core_dir = os.path.join(CONTEXT.working_env_dir, f"{machine_name}/core{core_idx}")
-            clean_script_dir = os.path.join(machine_core_dir, CONTEXT.SUBJECT.subject_configs["build_script_working_directory"])
-            cmd = [
-                "ssh", machine_name,
-                "cd", clean_script_dir,
-                "&&",
-                "bash", "clean_script.sh"
-            ]
-            execute_command_as_list(cmd, working_dir=CONTEXT.CONFIG.ENV["CWD"])
-            LOGGER.info(f"Cleaned up build artifacts on {machine_name}::core{core_idx}")
-        
-        with concurrent.futures.ThreadPoolExecutor(max_workers=core_cnt) as executor:
-            futures = [
-                executor.submit(_worker, task_queue, machine_info, CONTEXT)
-                for machine_info in CONTEXT.CONFIG.MACHINE_CORE_LIST
-            ]
-            for future in concurrent.futures.as_completed(futures):
-                try:
-                    future.result()
-                except Exception as e:
-                    LOGGER.error(f"Error occurred during mutation testing result extraction: {e}")
-
-        # Clean up build artifacts in remote for each repository directory of each core of all machine
-        for machine_name, core_idx, home_directory in CONTEXT.CONFIG.MACHINE_CORE_LIST:
-            machine_core_dir = os.path.join(CONTEXT.working_env_dir, f"{machine_name}/core{core_idx}")
-            clean_script_dir = os.path.join(machine_core_dir, CONTEXT.SUBJECT.subject_configs["build_script_working_directory"])
-            cmd = [
-                "ssh", machine_name,
-                "cd", clean_script_dir,
-                "&&",
-                "bash", "clean_script.sh"
-            ]
-            execute_command_as_list(cmd, working_dir=CONTEXT.CONFIG.ENV["CWD"])
-            LOGGER.info(f"Cleaned up build artifacts on {machine_name}::core{core_idx}")
-
+        tasks = [(mutant[0], mutant[1], mutant[2], mutant[3], mutant[4], mutant[5]) for mutant in mutant_list]
+        # origin mutants are shared by all their mutant mutants, each is shipped once per machine,
+        # and all mutant mutants of one origin bug stay on the same machine
+        partitions = self._pre_stage_tasks(CONTEXT, tasks, {
+            f"{CONTEXT.CONFIG.STAGE}-assigned_works": 3,
+            f"{CONTEXT.CONFIG.STAGE}-mutant_origin": 2,
+        }, group_idx=4, cost=CONTEXT.TASK_COST)
+        # they run back to back on a core of the machine, keeping the origin mutant applied
+        schedulers = {
+            machine_name: AffinityScheduler(
+                machine_tasks,
+                [machine_info for machine_info in CONTEXT.CONFIG.MACHINE_CORE_LIST if machine_info[0] == machine_name],
+                key=lambda task: task[4],
+                cost=CONTEXT.TASK_COST
+            )
+            for machine_name, machine_tasks in partitions.items()
+        }
+
+        self._clean_cores(CONTEXT)
+        dispatcher = TaskDispatcher(
+            self, CONTEXT, "mutation_testing_result_tester",
+            build_task_args=self._build_mutation_testing_task_args,
+            get_task=lambda core: schedulers[core[0]].get(core)
+        )
+        results = dispatcher.run(CONTEXT.CONFIG.MACHINE_CORE_LIST)
+        self._clean_cores(CONTEXT)
+        return results
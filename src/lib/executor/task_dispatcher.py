@@ -0,0 +1,232 @@
+import time
+import signal
+import logging
+import threading
+import concurrent.futures
+from collections import deque
+
+from lib.engine_context import EngineContext
+
+LOGGER = logging.getLogger(__name__)
+
+# consecutive failures to reach the worker daemon of a core before the core is retired
+DEFAULT_CORE_RESTARTS = 3
+
+
+def make_task_source(tasks: list):
+    """get_task handing out the tasks in order to whichever core asks first"""
+    pending = deque(tasks)
+    lock = threading.Lock()
+
+    def get_task(core):
+        with lock:
+            return pending.popleft() if pending else None
+    return get_task
+
+
+class TaskDispatcher:
+    """
+    Runs the tasks of a stage on the worker daemons of the machine cores.
+
+    One thread per core asks get_task(core) for a task only when the core is idle,
+    so no task waits on a busy core, and sends it to the core's worker daemon with
+    the arguments from build_task_args(task, needs_configuration). The optional
+    hooks run around it: prepare_task(core, task) before a task, after_task(core,
+    task, succeeded) after it, before_core(core) and after_core(core) around the
+    life of a core.
+
+    A core whose daemon cannot be reached hands its task back to the cores of the
+    same machine (where the files of the task are staged) and starts a new daemon,
+    up to DISPATCH_CORE_RESTARTS consecutive times. Idle cores wait instead of
+    exiting while tasks of their machine are running and may be handed back.
+
+    The first SIGINT stops handing out tasks and lets the running tasks finish,
+    a second one kills the worker daemons.
+    """
+    def __init__(self, EXECUTOR, CONTEXT: EngineContext, worker_type: str, build_task_args, get_task,
+                 prepare_task=None, after_task=None, before_core=None, after_core=None):
+        self.EXECUTOR = EXECUTOR
+        self.CONTEXT = CONTEXT
+        self.worker_type = worker_type
+        self.build_task_args = build_task_args
+        self.get_task = get_task
+        self.prepare_task = prepare_task
+        self.after_task = after_task
+        self.before_core = before_core
+        self.after_core = after_core
+
+        ENV = CONTEXT.CONFIG.ENV
+        self.max_core_restarts = int(ENV.get("DISPATCH_CORE_RESTARTS", DEFAULT_CORE_RESTARTS))
+        # 0: every core of .machine_settings
+        self.max_cores_per_machine = int(ENV.get("DISPATCH_MAX_CORES_PER_MACHINE", 0))
+
+        self.condition = threading.Condition()
+        self.cancelled = threading.Event()
+        # machine -> tasks handed back by a core, and number of tasks running on the machine
+        self.handed_back = {}
+        self.running = {}
+        self.daemons = {}
+        self.results = []
+
+    def run(self, cores: list) -> list:
+        """
+        Run every task on the cores, returns one result per task:
+        {"machine", "core_idx", "task", "status" ("done", "failed" or "abandoned"), "elapsed_ms"}
+        """
+        cores = self._limit_cores(cores)
+        for machine_name, core_idx, home_directory in cores:
+            self.handed_back.setdefault(machine_name, deque())
+            self.running.setdefault(machine_name, 0)
+
+        previous_handler = self._install_signal_handler()
+        try:
+            with concurrent.futures.ThreadPoolExecutor(max_workers=max(len(cores), 1)) as executor:
+                futures = {executor.submit(self._run_core, core): core for core in cores}
+                for future in concurrent.futures.as_completed(futures):
+                    machine_name, core_idx, home_directory = futures[future]
+                    try:
+                        future.result()
+                    except Exception as e:
+                        LOGGER.error(f"Worker {machine_name}::core{core_idx} stopped with an unexpected error: {e}")
+        finally:
+            if previous_handler is not None:
+                signal.signal(signal.SIGINT, previous_handler)
+
+        # tasks handed back after every core of their machine was retired
+        for machine_name, tasks in self.handed_back.items():
+            for task in tasks:
+                self.results.append(self._make_result(machine_name, None, task, "abandoned", 0.0))
+
+        self._log_summary()
+        return self.results
+
+    def cancel(self):
+        """Stop handing out tasks, the running tasks are finished"""
+        with self.condition:
+            self.cancelled.set()
+            self.condition.notify_all()
+
+    def kill(self):
+        """Stop handing out tasks and kill the worker daemons of the running tasks"""
+        self.cancel()
+        for daemon in list(self.daemons.values()):
+            daemon.kill()
+
+    def _limit_cores(self, cores: list) -> list:
+        if self.max_cores_per_machine <= 0:
+            return list(cores)
+        limited, machine_core_cnt = [], {}
+        for core in cores:
+            machine_core_cnt[core[0]] = machine_core_cnt.get(core[0], 0) + 1
+            if machine_core_cnt[core[0]] <= self.max_cores_per_machine:
+                limited.append(core)
+        return limited
+
+    def _install_signal_handler(self):
+        # signal handlers can only be set from the main thread
+        if threading.current_thread() is not threading.main_thread():
+            return None
+
+        def _handle_sigint(signum, frame):
+            if not self.cancelled.is_set():
+                LOGGER.warning("Interrupted, finishing the running tasks (interrupt again to kill the worker daemons)")
+                self.cancel()
+            else:
+                LOGGER.warning("Interrupted again, killing the worker daemons")
+                self.kill()
+        return signal.signal(signal.SIGINT, _handle_sigint)
+
+    def _next_task(self, core):
+        machine_name = core[0]
+        with self.condition:
+            while not self.cancelled.is_set():
+                if self.handed_back[machine_name]:
+                    task = self.handed_back[machine_name].popleft()
+                else:
+                    task = self.get_task(core)
+                if task is not None:
+                    self.running[machine_name] += 1
+                    return task
+                if self.running[machine_name] == 0:
+                    return None
+                # a running task of the machine may still be handed back
+                self.condition.wait()
+            return None
+
+    def _finish_task(self, core, task, status: str = None, elapsed_ms: float = 0.0):
+        """Record the result of the task, without status the task is handed back"""
+        machine_name, core_idx, home_directory = core
+        with self.condition:
+            self.running[machine_name] -= 1
+            if status is None:
+                self.handed_back[machine_name].append(task)
+            else:
+                self.results.append(self._make_result(machine_name, core_idx, task, status, elapsed_ms))
+            self.condition.notify_all()
+
+    def _make_result(self, machine_name: str, core_idx: int, task, status: str, elapsed_ms: float) -> dict:
+        return {
+            "machine": machine_name,
+            "core_idx": core_idx,
+            "task": task,
+            "status": status,
+            "elapsed_ms": elapsed_ms
+        }
+
+    def _run_core(self, core):
+        machine_name, core_idx, home_directory = core
+        if self.before_core is not None:
+            self.before_core(core)
+
+        daemon = self.EXECUTOR._create_worker_daemon(self.CONTEXT, machine_name, core_idx, self.worker_type)
+        self.daemons[core] = daemon
+        needs_configuration = True
+        failure_cnt = 0
+        try:
+            while True:
+                task = self._next_task(core)
+                if task is None:
+                    break
+
+                start_time = time.time()
+                try:
+                    if self.prepare_task is not None:
+                        self.prepare_task(core, task)
+                    task_args = self.build_task_args(task, needs_configuration)
+                    LOGGER.info(f"Worker {machine_name}::core{core_idx} processing mutant {task_args.get('mutant')} for file {task_args.get('target_file')}")
+                    # Execute the task on the worker daemon of the core
+                    succeeded = self.EXECUTOR._run_worker_task(daemon, task_args)
+                except Exception as e:
+                    LOGGER.error(f"Worker {machine_name}::core{core_idx} encountered an error: {e}")
+                    daemon.kill()
+                    self._finish_task(core, task)
+                    failure_cnt += 1
+                    if failure_cnt >= self.max_core_restarts:
+                        LOGGER.error(f"Worker {machine_name}::core{core_idx} retired after {failure_cnt} consecutive failures")
+                        break
+                    continue
+                needs_configuration = False
+                failure_cnt = 0
+
+                if self.after_task is not None:
+                    try:
+                        self.after_task(core, task, succeeded)
+                    except Exception as e:
+                        LOGGER.error(f"Worker {machine_name}::core{core_idx} failed to finish its task: {e}")
+                        succeeded = False
+                self._finish_task(core, task, "done" if succeeded else "failed", (time.time() - start_time) * 1000)
+        finally:
+            daemon.stop()
+            if self.after_core is not None:
+                self.after_core(core)
+            LOGGER.info(f"Worker {machine_name}::core{core_idx} exiting")
+
+    def _log_summary(self):
+        status_cnt = {}
+        for result in self.results:
+            status_cnt[result["status"]] = status_cnt.get(result["status"], 0) + 1
+        summary = ", ".join(f"{cnt} {status}" for status, cnt in sorted(status_cnt.items()))
+        if self.cancelled.is_set():
+            LOGGER.warning(f"{self.worker_type} tasks cancelled: {summary or 'none run'}")
+        else:
+            LOGGER.info(f"{self.worker_type} tasks finished: {summary or 'none'}")
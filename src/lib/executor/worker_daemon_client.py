@@ -0,0 +1,109 @@
+import os
+import json
+import logging
+import tempfile
+import subprocess as sp
+
+LOGGER = logging.getLogger(__name__)
+
+class WorkerDaemonClient:
+    """Drives a `main.py --worker-daemon` process of a single core over its stdin/stdout pipes"""
+    def __init__(self, cmd: list, working_dir: str = None, name: str = None,
+                 max_attempts: int = 1, retry_backoff_sec: float = 0.0):
+        self.cmd = cmd
+        self.working_dir = working_dir
+        self.name = name if name else " ".join(cmd)
+        # retry policy of failed tasks, only used with the task ledger
+        self.max_attempts = max_attempts
+        self.retry_backoff_sec = retry_backoff_sec
+        self.process = None
+        # stderr of the daemon (tracebacks of a crash before its logger is set up)
+        self.stderr_file = None
+        self.task_cnt = 0
+
+    def start(self):
+        """Start the daemon and wait until it reports to be ready"""
+        LOGGER.debug(f"Starting worker daemon {self.name}: {' '.join(self.cmd)}")
+        if self.stderr_file is not None:
+            self.stderr_file.close()
+        self.stderr_file = tempfile.TemporaryFile()
+        # a session of its own keeps Ctrl-C of the terminal away from the daemon,
+        # the dispatcher decides whether running tasks finish or are killed
+        self.process = sp.Popen(
+            self.cmd, cwd=self.working_dir,
+            stdin=sp.PIPE, stdout=sp.PIPE, stderr=self.stderr_file,
+            text=True, bufsize=1, start_new_session=True
+        )
+        message = self._receive()
+        if message is None or message.get("status") != "ready":
+            self.kill()
+            self._log_stderr()
+            raise RuntimeError(f"Worker daemon {self.name} failed to start")
+        LOGGER.info(f"Worker daemon {self.name} started (pid {message.get('pid')})")
+
+    def is_alive(self) -> bool:
+        return self.process is not None and self.process.poll() is None
+
+    def submit(self, args: dict) -> dict:
+        """Send a task descriptor to the daemon and block until its result is received"""
+        if not self.is_alive():
+            self.start()
+
+        self.task_cnt += 1
+        task_id = f"{self.name}#{self.task_cnt}"
+        try:
+            self.process.stdin.write(json.dumps({"task_id": task_id, "args": args}) + "\n")
+            self.process.stdin.flush()
+        except (BrokenPipeError, OSError) as e:
+            self.kill()
+            return {"task_id": task_id, "status": "failed", "error": f"Worker daemon {self.name} is not reachable: {e}"}
+
+        result = self._receive()
+        if result is None:
+            self.kill()
+            self._log_stderr()
+            return {"task_id": task_id, "status": "failed", "error": f"Worker daemon {self.name} exited unexpectedly"}
+        return result
+
+    def stop(self, timeout: int = 30):
+        """Ask the daemon to shut down, killing it if it does not exit in time"""
+        if not self.is_alive():
+            return
+
+        try:
+            self.process.stdin.write(json.dumps({"command": "shutdown"}) + "\n")
+            self.process.stdin.close()
+            self.process.wait(timeout=timeout)
+        except (BrokenPipeError, OSError, sp.TimeoutExpired) as e:
+            LOGGER.warning(f"Worker daemon {self.name} did not shut down cleanly: {e}")
+            self.kill()
+        LOGGER.info(f"Worker daemon {self.name} stopped after {self.task_cnt} tasks")
+
+    def kill(self):
+        if self.process is not None and self.process.poll() is None:
+            self.process.kill()
+            self.process.wait()
+
+    def _log_stderr(self, max_lines: int = 50):
+        """Log the last lines the daemon wrote to stderr"""
+        if self.stderr_file is None:
+            return
+        # the daemon also logs to stderr, only its end is of interest
+        size = self.stderr_file.seek(0, os.SEEK_END)
+        self.stderr_file.seek(max(size - 65536, 0))
+        lines = self.stderr_file.read().decode(errors="replace").splitlines()[-max_lines:]
+        if lines:
+            LOGGER.error(f"stderr of worker daemon {self.name}:\n" + "\n".join(lines))
+
+    def _receive(self) -> dict:
+        while True:
+            line = self.process.stdout.readline()
+            if not line:
+                return None
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                return json.loads(line)
+            except json.JSONDecodeError:
+                LOGGER.warning(f"Ignoring malformed message from worker daemon {self.name}: {line}")
@@ -74,6 +74,12 @@ class ExperimentConfigs:
             help="Specify the worker type to execute"
         )
 
+        self.PARSER.add_argument(
+            "-ss", "--simulate-schedule",
+            action="store_true",
+            help="Replay the recorded stage05 runs through the schedulers and report the predicted makespan instead of testing"
+        )
+
         # required information for workers
         self.PARSER.add_argument(
             "-m", "--machine",
@@ -100,6 +106,11 @@ class ExperimentConfigs:
             action="store_true",
             help="Indicate if the worker needs configuration"
         )
+        self.PARSER.add_argument(
+            "-wd", "--worker-daemon",
+            action="store_true",
+            help="Run the worker as a long-lived daemon reading task descriptors from stdin"
+        )
 
         # Only required for Stage05 worker: mutation_testing_result_extractor
         self.PARSER.add_argument(
@@ -133,9 +144,12 @@ class ExperimentConfigs:
         settings = json.load(open(machine_settings, 'r'))
         self.MACHINE_LIST = list(settings.keys())
         self.MACHINE_CORE_LIST = []
+        # optional relative speed of a machine's cores (1.0 by default), used to weight the scheduling
+        self.MACHINE_SPEED = {}
         for machine_name, machine_info in settings.items():
             num_cores = machine_info["cores"]
             home_directory = machine_info["homedirectory"]
+            self.MACHINE_SPEED[machine_name] = float(machine_info.get("speed", 1.0))
 
             for idx in range(num_cores):
                 self.MACHINE_CORE_LIST.append((machine_name, idx, home_directory))
@@ -0,0 +1,41 @@
+import logging
+from typing import Dict, Type
+
+from lib.transport.transport import Transport
+from lib.transport.ssh_transport import SSHTransport
+from lib.transport.local_transport import LocalTransport
+
+LOGGER = logging.getLogger(__name__)
+
+class TransportFactory:
+    """Factory class for creating the transports used to reach remote machines"""
+
+    # Registry of available transports
+    _transports: Dict[str, Type[Transport]] = {
+        "ssh": SSHTransport,
+        "local": LocalTransport,
+    }
+
+    @classmethod
+    def create_transport(cls, transport_type: str = "ssh") -> Transport:
+        """Create and return a transport instance of the specified type"""
+        if transport_type not in cls._transports:
+            available_types = ", ".join(cls._transports.keys())
+            error_msg = f"Unknown transport type: {transport_type}. Available types: {available_types}"
+            LOGGER.error(error_msg)
+            raise ValueError(error_msg)
+
+        transport_instance = cls._transports[transport_type]()
+        LOGGER.info(f"Created transport of type: {transport_type}")
+        return transport_instance
+
+    @classmethod
+    def get_available_transports(cls) -> list:
+        """Return a list of available transport types"""
+        return list(cls._transports.keys())
+
+    @classmethod
+    def register_transport(cls, transport_type: str, transport_class: Type[Transport]):
+        """Register a new transport type (useful for plugins or extensions)"""
+        cls._transports[transport_type] = transport_class
+        LOGGER.info(f"Registered new transport type: {transport_type}")
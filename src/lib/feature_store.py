@@ -0,0 +1,116 @@
+import os
+import json
+import math
+import logging
+import numpy as np
+
+LOGGER = logging.getLogger(__name__)
+
+# per-line values kept as-is in the metadata table instead of the float32 matrix
+METADATA_COLUMNS = ["file", "function", "lineno", "is_buggy_line"]
+
+MATRIX_SUFFIX = ".npy"
+SCHEMA_SUFFIX = ".json"
+
+
+class FeatureStore:
+    """
+    Columnar per-bug feature table (one row per candidate line).
+
+    Numeric features are stored as a float32 (num_lines, num_columns) matrix in
+    `{path}.npy` (memory-mappable), and the column schema and line metadata in
+    `{path}.json`. Missing values (e.g., st_distance of unrelated lines) are NaN.
+    """
+    def __init__(self, line_idxs: list, metadata: dict, columns: list, values: np.ndarray, int_columns: list = None):
+        self.line_idxs = list(line_idxs)
+        self.metadata = metadata
+        self.columns = list(columns)
+        self.values = values
+        self.int_columns = set(int_columns or [])
+        self.column_index = {column: idx for idx, column in enumerate(self.columns)}
+
+    # CONVERSION
+    @classmethod
+    def from_lineIdx2lineData(cls, lineIdx2lineData: dict) -> "FeatureStore":
+        line_idxs = list(lineIdx2lineData.keys())
+
+        columns, seen = [], set()
+        for line_data in lineIdx2lineData.values():
+            for key in line_data.keys():
+                if key not in seen and key not in METADATA_COLUMNS:
+                    seen.add(key)
+                    columns.append(key)
+
+        metadata = {
+            column: [lineIdx2lineData[line_idx].get(column) for line_idx in line_idxs]
+            for column in METADATA_COLUMNS
+        }
+
+        values = np.full((len(line_idxs), len(columns)), np.nan, dtype=np.float32)
+        int_columns = []
+        for col_idx, column in enumerate(columns):
+            column_values = [lineIdx2lineData[line_idx].get(column) for line_idx in line_idxs]
+            values[:, col_idx] = [np.nan if value is None else value for value in column_values]
+            if all(type(value) is int for value in column_values if value is not None):
+                int_columns.append(column)
+
+        return cls(line_idxs, metadata, columns, values, int_columns)
+
+    def to_lineIdx2lineData(self) -> dict:
+        """Rebuild the nested-dict representation used by the stage06 score functions"""
+        rows = self.values.tolist()
+        int_flags = [column in self.int_columns for column in self.columns]
+
+        lineIdx2lineData = {}
+        for row_idx, line_idx in enumerate(self.line_idxs):
+            line_data = {column: self.metadata[column][row_idx] for column in METADATA_COLUMNS}
+            for column, is_int, value in zip(self.columns, int_flags, rows[row_idx]):
+                if math.isnan(value):
+                    line_data[column] = None
+                else:
+                    line_data[column] = int(value) if is_int else value
+            lineIdx2lineData[line_idx] = line_data
+        return lineIdx2lineData
+
+    # ACCESS
+    @property
+    def num_lines(self) -> int:
+        return len(self.line_idxs)
+
+    def has_column(self, column: str) -> bool:
+        return column in self.column_index
+
+    def column(self, column: str) -> np.ndarray:
+        return self.values[:, self.column_index[column]]
+
+    # STORAGE
+    def save(self, path: str):
+        """Write `{path}.npy` and `{path}.json`, each replaced atomically"""
+        matrix_file = path + MATRIX_SUFFIX
+        schema_file = path + SCHEMA_SUFFIX
+
+        tmp_matrix_file = f"{path}.tmp{MATRIX_SUFFIX}"
+        np.save(tmp_matrix_file, np.ascontiguousarray(self.values, dtype=np.float32))
+        os.replace(tmp_matrix_file, matrix_file)
+
+        schema = {
+            "line_idxs": self.line_idxs,
+            "columns": self.columns,
+            "int_columns": sorted(self.int_columns),
+            "metadata": self.metadata,
+        }
+        tmp_schema_file = f"{path}.tmp{SCHEMA_SUFFIX}"
+        with open(tmp_schema_file, 'w') as f:
+            json.dump(schema, f)
+        os.replace(tmp_schema_file, schema_file)
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True) -> "FeatureStore":
+        with open(path + SCHEMA_SUFFIX, 'r') as f:
+            schema = json.load(f)
+        values = np.load(path + MATRIX_SUFFIX, mmap_mode='r' if mmap else None)
+        return cls(schema["line_idxs"], schema["metadata"], schema["columns"], values, schema["int_columns"])
+
+    @staticmethod
+    def exists(path: str) -> bool:
+        return os.path.exists(path + SCHEMA_SUFFIX) and os.path.exists(path + MATRIX_SUFFIX)
@@ -16,6 +16,9 @@ class FileManager(ABC):
     
     def copy_file(self, src: str, dest: str):
         copy_file(src, dest)
+
+    def provision_directory(self, src: str, dest: str, read_only_paths: list = None):
+        provision_directory(src, dest, read_only_paths)
     
     def remove_file(self, file_path: str):
         remove_file(file_path)
@@ -41,11 +44,21 @@ class FileManager(ABC):
         """Abstract method to be implemented by subclasses for copying directories in a specific way"""
         raise NotImplementedError("Subclasses must implement copy_specific_directory() method")
     
+    @abstractmethod
+    def provision_specific_directory(self, src: str, dest: str, read_only_paths: list = None, machine: str = None):
+        """Abstract method to be implemented by subclasses for provisioning a working copy of a directory on the machine"""
+        raise NotImplementedError("Subclasses must implement provision_specific_directory() method")
+
     @abstractmethod
     def copy_specific_file(self, src: str, dest: str, machine: str = None):
         """Abstract method to be implemented by subclasses for copying files in a specific way"""
         raise NotImplementedError("Subclasses must implement copy_specific_file() method")
     
+    @abstractmethod
+    def copy_specific_files(self, files: list, dest: str, machine: str = None) -> bool:
+        """Abstract method to be implemented by subclasses for copying many files into a directory at once"""
+        raise NotImplementedError("Subclasses must implement copy_specific_files() method")
+
     @abstractmethod
     def remove_specific_file(self, file_path: str, machine: str = None):
         """Abstract method to be implemented by subclasses for removing files in a specific way"""
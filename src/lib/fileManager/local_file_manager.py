@@ -21,10 +21,20 @@ class LocalFileManager(FileManager):
         copy_directory(src, dest)
         LOGGER.debug(f"Local directory copied from {src} to {dest}")
 
+    def provision_specific_directory(self, src: str, dest: str, read_only_paths: list = None, machine: str = None):
+        provision_directory(src, dest, read_only_paths)
+        LOGGER.debug(f"Local directory provisioned from {src} to {dest}")
+
     def copy_specific_file(self, src: str, dest: str, machine: str = None):
         copy_file(src, dest)
         LOGGER.debug(f"Local file copied from {src} to {dest}")
 
+    def copy_specific_files(self, files: list, dest: str, machine: str = None) -> bool:
+        make_directory(dest)
+        copied = all([copy_file(str(src), dest) for src in files])
+        LOGGER.debug(f"Local files ({len(files)}) copied to {dest}")
+        return copied
+
     def remove_specific_file(self, file_path: str, machine: str = None):
         remove_file(file_path)
         LOGGER.debug(f"Local file removed at: {file_path}")
@@ -1,76 +1,66 @@
 import logging
 
 from lib.fileManager.file_manager import FileManager
+from lib.transport.transport import Transport
+from lib.factories.transport_factory import TransportFactory
 from utils.file_utils import *
 from utils.command_utils import *
 
 LOGGER = logging.getLogger(__name__)
 
 class RemoteFileManager(FileManager):
-    def __init__(self):
+    def __init__(self, TRANSPORT: Transport = None):
+        # commands and transfers share one multiplexed connection per machine
+        self.TRANSPORT = TRANSPORT if TRANSPORT is not None else TransportFactory.create_transport("ssh")
         LOGGER.info("RemoteFileManager initialized")
 
     def make_specific_directory(self, dir_path: str, machine: str = None):
-        cmd = [
-            "ssh", machine,
-            "mkdir", "-p", dir_path
-        ]
-        execute_command_as_list(cmd)
+        self.TRANSPORT.run(machine, ["mkdir", "-p", dir_path])
         LOGGER.debug(f"Remote directory created at: {dir_path}")
-    
+
     def remove_specific_directory(self, dir_path, machine = None):
-        cmd = [
-            "ssh", machine,
-            "rm", "-rf", dir_path
-        ]
-        execute_command_as_list(cmd)
+        self.TRANSPORT.run(machine, ["rm", "-rf", dir_path])
         LOGGER.debug(f"Remote directory removed at: {dir_path}")
 
     def copy_specific_directory(self, src: str, dest: str, machine: str = None):
-        cmd = [
-            "rsync", "-t", "-r", 
-            f"{src}", f"{machine}:{dest}"
-        ]
-        execute_command_as_list(cmd)
+        self.TRANSPORT.push(src, dest, machine, recursive=True)
         LOGGER.debug(f"Remote directory copied from {src} to {dest}")
-    
+
     def copy_specific_directory_from_remote(self, src: str, dest: str, machine: str = None):
-        cmd = [
-            "rsync", "-t", "-r", 
-            f"{machine}:{src}", f"{dest}"
-        ]
-        execute_command_as_list(cmd)
+        self.TRANSPORT.pull(src, dest, machine, recursive=True)
         LOGGER.debug(f"Remote directory copied from {src} on {machine} to {dest}")
-    
-    def copy_specific_file(self, src: str, dest: str, machine: str = None):
+
+    def provision_specific_directory(self, src: str, dest: str, read_only_paths: list = None, machine: str = None):
+        # src is a directory already on the machine, cp clones the files where the filesystem supports reflinks
         cmd = [
-            "rsync", "-t", 
-            f"{src}", f"{machine}:{dest}"
+            "mkdir", "-p", dest,
+            "&&", "cp", "-a", "--reflink=auto", f"{src}/.", dest
         ]
-        execute_command_as_list(cmd)
+        self.TRANSPORT.run(machine, cmd)
+        LOGGER.debug(f"Remote directory provisioned from {src} to {dest}")
+
+    def copy_specific_file(self, src: str, dest: str, machine: str = None):
+        self.TRANSPORT.push(src, dest, machine)
         LOGGER.debug(f"Remote file copied from {src} to {dest}")
 
+    def copy_specific_files(self, files: list, dest: str, machine: str = None) -> bool:
+        # one transfer for the whole batch instead of a connection per file
+        ret = self.TRANSPORT.push_files(files, dest, machine)
+        LOGGER.debug(f"Remote files ({len(files)}) copied to {dest}")
+        return ret == 0
+
     def remove_specific_file(self, file_path: str, machine: str = None):
-        cmd = [
-            "ssh", machine,
-            "rm", "-f", file_path
-        ]
-        execute_command_as_list(cmd)
+        self.TRANSPORT.run(machine, ["rm", "-f", file_path])
         LOGGER.debug(f"Remote file removed at: {file_path}")
 
     def zip_specific_directory(self, src: str, zip_path: str, machine: str = None):
         cmd = [
-            "ssh", machine,
             "zip", "-r", f"{zip_path}.zip", src,
             "&&", "rm", "-rf", src
         ]
-        execute_command_as_list(cmd)
+        self.TRANSPORT.run(machine, cmd)
         LOGGER.debug(f"Remote directory zipped from {src} to {zip_path}.zip")
 
     def unzip_specific_directory(self, zip_path: str, extract_to: str, machine: str = None):
-        cmd = [
-            "ssh", machine,
-            "unzip", "-o", f"{zip_path}.zip", "-d", extract_to
-        ]
-        execute_command_as_list(cmd)
+        self.TRANSPORT.run(machine, ["unzip", "-o", f"{zip_path}.zip", "-d", extract_to])
         LOGGER.debug(f"Remote zip file {zip_path} extracted to {extract_to}")
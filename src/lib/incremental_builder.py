@@ -0,0 +1,110 @@
+import os
+import json
+import shlex
+import logging
+import subprocess as sp
+
+from utils.command_utils import *
+
+LOGGER = logging.getLogger(__name__)
+
+
+class IncrementalBuilder:
+    """
+    Object-level rebuild of a patched subject using its compile_commands.json.
+
+    Only the translation units of the patched files are recompiled with their
+    recorded compile command, then the subject is relinked with the build script
+    (or the `link_script` given in configurations.json), so no clean build is needed.
+    Enabled per subject with `"incremental_build": true` (or an object with a
+    `link_script`) in configurations.json.
+    """
+    def __init__(self, SUBJECT):
+        self.SUBJECT = SUBJECT
+        incremental_build = SUBJECT.subject_configs.get("incremental_build", False)
+        self.enabled = bool(incremental_build)
+
+        self.link_script = SUBJECT.build_script
+        if isinstance(incremental_build, dict) and incremental_build.get("link_script"):
+            self.link_script = os.path.join(SUBJECT.build_script_working_directory, incremental_build["link_script"])
+
+        self.compile_commands_json = SUBJECT.compile_commands_json_path
+        if os.path.isdir(self.compile_commands_json):
+            self.compile_commands_json = os.path.join(self.compile_commands_json, "compile_commands.json")
+
+        # source file -> compile_commands.json entry, reloaded when the file changes
+        self.source2entry = {}
+        self.loaded_mtime = None
+
+    def _load_compile_commands(self) -> bool:
+        if not os.path.exists(self.compile_commands_json):
+            LOGGER.warning(f"compile_commands.json does not exist: {self.compile_commands_json}")
+            return False
+
+        mtime = os.path.getmtime(self.compile_commands_json)
+        if mtime == self.loaded_mtime:
+            return True
+
+        with open(self.compile_commands_json, 'r') as f:
+            entries = json.load(f)
+        self.source2entry = {}
+        for entry in entries:
+            source_file = os.path.realpath(os.path.join(entry["directory"], entry["file"]))
+            self.source2entry[source_file] = entry
+        self.loaded_mtime = mtime
+        LOGGER.debug(f"Loaded {len(self.source2entry)} compile commands from {self.compile_commands_json}")
+        return True
+
+    def get_compile_entry(self, source_file: str):
+        if not self._load_compile_commands():
+            return None
+        return self.source2entry.get(os.path.realpath(source_file))
+
+    def get_compile_arguments(self, entry: dict) -> list:
+        if "arguments" in entry:
+            return list(entry["arguments"])
+        return shlex.split(entry["command"])
+
+    def get_object_file(self, source_file: str):
+        """Object file produced for source_file, None if it is not a known translation unit"""
+        entry = self.get_compile_entry(source_file)
+        if entry is None:
+            return None
+        output = entry.get("output")
+        if output is None:
+            arguments = self.get_compile_arguments(entry)
+            if "-o" in arguments[:-1]:
+                output = arguments[arguments.index("-o") + 1]
+        if output is None:
+            return None
+        return os.path.join(entry["directory"], output)
+
+    def compile(self, source_file: str) -> int:
+        entry = self.get_compile_entry(source_file)
+        arguments = self.get_compile_arguments(entry)
+        res = sp.run(arguments, cwd=entry["directory"], stdout=sp.DEVNULL, stderr=sp.PIPE)
+        if res.returncode != 0:
+            LOGGER.error(f"Error compiling {source_file} with command: {' '.join(arguments)}")
+            LOGGER.error(f"Error output: {res.stderr.decode().strip()}")
+        return res.returncode
+
+    def build(self, source_files: list):
+        """
+        Recompile the translation units of source_files and relink.
+        Returns the return code, or None if a file is not in compile_commands.json
+        and the build scripts must be used instead.
+        """
+        if not self.enabled:
+            return None
+        source_files = list(dict.fromkeys(source_files))
+        for source_file in source_files:
+            if self.get_compile_entry(source_file) is None:
+                LOGGER.info(f"{source_file} not found in compile_commands.json, using build scripts")
+                return None
+
+        for source_file in source_files:
+            res = self.compile(source_file)
+            if res != 0:
+                return res
+        LOGGER.debug(f"Recompiled {len(source_files)} translation unit(s), relinking")
+        return execute_bash_script(self.link_script, self.SUBJECT.build_script_working_directory)
@@ -1,15 +1,18 @@
 import subprocess as sp
 import os
 import signal
+import time
 import logging
 import json
+import concurrent.futures
+import numpy as np
 
 from lib.database import CRUD
 from lib.worker_context import WorkerContext
+from lib.coverage_matrix import CoverageMatrix, unpack_mask, mask_popcount
 
 from utils.command_utils import *
 from utils.gdb_utils import *
-from utils.bitwise_utils import *
 from utils.bbcov_utils import *
 
 LOGGER = logging.getLogger(__name__)
@@ -25,7 +28,8 @@ class Mutant:
                     origin_mutant_target_file_path = None,
                     origin_mutant_file = None,
                     origin_mutant_file_path = None,
-                    origin_patch_file = None
+                    origin_patch_file = None,
+                    SWAPPER = None
                     ):
         LOGGER.info("Mutant initialized")
         self.subject = subject
@@ -46,13 +50,17 @@ class Mutant:
         self.origin_mutant_file_path = origin_mutant_file_path
         self.origin_patch_file = origin_patch_file
 
+        # swap-based apply/revert, diff and patch are used when not given
+        self.SWAPPER = SWAPPER
+
         self.bug_idx = None
         self.tc_info = {"fail": [], "pass": [], "crashed": [], "cctc": []}
 
     def make_patch_file(self):
         cmd = ["diff", self.target_file_path, self.mutant_file_path]
         try:
-            res = sp.run(cmd, stdout=open(self.patch_file, 'w'))
+            with open(self.patch_file, 'w') as f:
+                res = sp.run(cmd, stdout=f)
             if res.returncode not in [0, 1]:  # diff returns 0 if no differences, 1 if differences found
                 LOGGER.error(f"Error creating patch file with command: {' '.join(cmd)}")
                 return False
@@ -64,7 +72,8 @@ class Mutant:
     def make_patch_file_og(self):
         cmd = ["diff", self.origin_mutant_target_file_path, self.origin_mutant_file_path]
         try:
-            res = sp.run(cmd, stdout=open(self.origin_patch_file, 'w'))
+            with open(self.origin_patch_file, 'w') as f:
+                res = sp.run(cmd, stdout=f)
             if res.returncode not in [0, 1]:  # diff returns 0 if no differences, 1 if differences found
                 LOGGER.error(f"Error creating origin patch file with command: {' '.join(cmd)}")
                 return False
@@ -74,6 +83,11 @@ class Mutant:
             raise e
 
     def apply_patch(self, revert=False):
+        if self.SWAPPER is not None:
+            if revert:
+                return self.SWAPPER.revert(self.target_file_path)
+            return self.SWAPPER.apply(self.target_file_path, self.mutant_file_path)
+
         if revert:
             cmd = ["patch", "-R", "-i", self.patch_file, self.target_file_path]
         else:
@@ -92,6 +106,11 @@ class Mutant:
             raise e
     
     def apply_patch_og(self, revert=False):
+        if self.SWAPPER is not None:
+            if revert:
+                return self.SWAPPER.revert(self.origin_mutant_target_file_path)
+            return self.SWAPPER.apply(self.origin_mutant_target_file_path, self.origin_mutant_file_path)
+
         if revert:
             cmd = ["patch", "-R", "-i", self.origin_patch_file, self.origin_mutant_target_file_path]
         else:
@@ -119,7 +138,7 @@ class Mutant:
                 shell=True, cwd=tc_dir,
                 stderr=sp.DEVNULL, stdout=sp.DEVNULL,
                 env=os.environ,
-                preexec_fn=os.setsid  # Create new process group
+                start_new_session=True  # Create new process group, safe when tests run from threads
             )
             proc.wait(timeout=10)
             returncode = proc.returncode
@@ -149,6 +168,46 @@ class Mutant:
             LOGGER.info(f"Test case {tc_name} crashed with return code {returncode}")
         return returncode
 
+    def run_tests_with_testScripts(self, tc_scripts: list, width: int = 1, after_test=None) -> list:
+        """
+        Run test scripts with up to `width` tests at a time.
+        Each test keeps the process-group kill-on-timeout of run_test_with_testScript.
+        Scripts that write the same {name}.bbcd output are never run concurrently,
+        and after_test(tc_script, returncode) runs right after each test, before the
+        next test sharing its output, e.g., to read the test's coverage.
+        Tests competing for the CPU run longer than alone, so time_duration_ms is only
+        measured when the tests run one at a time and is None otherwise.
+        :return: List of (returncode, time_duration_ms, after_test result) in the order of tc_scripts
+        """
+        results = [None] * len(tc_scripts)
+
+        def _run_group(indices, timed):
+            for idx in indices:
+                start_time = time.time()
+                res = self.run_test_with_testScript(tc_scripts[idx])
+                time_duration_ms = ((time.time() - start_time) * 1000) if timed else None # time in milliseconds
+                after_result = after_test(tc_scripts[idx], res) if after_test is not None else None
+                results[idx] = (res, time_duration_ms, after_result)
+
+        # group by the .bbcd output name of the test script
+        groups = {}
+        for idx, tc_script in enumerate(tc_scripts):
+            output_key = os.path.join(
+                os.path.dirname(str(tc_script)),
+                os.path.basename(str(tc_script)).strip().split(".")[0]
+            )
+            groups.setdefault(output_key, []).append(idx)
+
+        if width <= 1 or len(groups) <= 1:
+            _run_group(range(len(tc_scripts)), True)
+            return results
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=width) as executor:
+            futures = [executor.submit(_run_group, indices, False) for indices in groups.values()]
+            for future in concurrent.futures.as_completed(futures):
+                future.result()
+        return results
+
     def set_bug_idx_from_db(self, DB: CRUD):
         bug_info = DB.read(
             "cpp_bug_info",
@@ -349,20 +408,10 @@ class Mutant:
         return raw_cov_file
     
     def generate_bbcov_line_output(self, target_files: list, bbcov_file: str) -> dict:
-        bbcov_line_cov = os.environ["BBCOV_LINE_COV"]
-        cmd = ["python3", bbcov_line_cov, bbcov_file]
         try:
-            # read the line sequence in stdout
-            res = sp.run(cmd, stdout=sp.PIPE, stderr=sp.PIPE)
-            if res.returncode != 0:
-                LOGGER.error(f"Error generating bbcov line output with command: {' '.join(cmd)}")
-                LOGGER.error(f"Error output: {res.stderr.decode().strip()}")
-                return {}
-            # it is not json format i will parse it
-            output_lines = res.stdout.decode().strip().split("\n")
-            line_cov_dict = parse_bbcov_line_cov_output(target_files, output_lines)
+            line_cov_dict = read_bbcov_line_cov(target_files, bbcov_file)
         except Exception as e:
-            LOGGER.error(f"Exception occurred while generating bbcov line output with command: {' '.join(cmd)}")
+            LOGGER.error(f"Exception occurred while generating bbcov line output for {bbcov_file}: {e}")
             return {}
         return line_cov_dict
 
@@ -542,33 +591,49 @@ class Mutant:
         
         save_line2function = True
         
+        def _read_coverage(tc_script, res):
+            # # 2.3 remove untargeted files for gcovr
+            # self.remove_untargeted_files_for_gcovr(CONTEXT)
+
+            # # 2-4. Collect coverage
+            # raw_cov_file = self.generate_coverage_json(CONTEXT, tc_name)
+            tc_name_without_sh = os.path.basename(tc_script).strip().split(".")[0]
+            bbcov_file = os.path.join(
+                CONTEXT.testcases_dir,
+                f"{tc_name_without_sh}.bbcd"
+            )
+            if not os.path.exists(bbcov_file):
+                return None
+
+            # {filename: {line_num: {"covered": int, "function": str}}}
+            return self.generate_bbcov_line_output(
+                CONTEXT.SUBJECT.subject_configs["target_files"],
+                bbcov_file
+            )
+
         for test_type in ["fail", "pass", "cctc"]:
-            for tc_idx, tc_name in self.tc_info[test_type]:
-                # # 2.1 remove all gcda files
-                # self.remove_all_gcda()
+            tc_list = list(self.tc_info[test_type])
 
-                # 2.2 run the test case
-                res = self.run_test_with_testScript(os.path.join(CONTEXT.testcases_dir, tc_name))
-                
-                # # 2.3 remove untargeted files for gcovr
-                # self.remove_untargeted_files_for_gcovr(CONTEXT)
+            # # 2.1 remove all gcda files
+            # self.remove_all_gcda()
 
-                # # 2-4. Collect coverage
-                # raw_cov_file = self.generate_coverage_json(CONTEXT, tc_name)
+            # 2.2 run the test cases, reading each coverage right after its test
+            results = self.run_tests_with_testScripts(
+                [os.path.join(CONTEXT.testcases_dir, tc_name) for _, tc_name in tc_list],
+                width=CONTEXT.SUBJECT.test_execution_width,
+                after_test=_read_coverage
+            )
+
+            for (tc_idx, tc_name), (res, _, cov_json) in zip(tc_list, results):
                 tc_name_without_sh = tc_name.strip().split(".")[0]
                 bbcov_file = os.path.join(
                     CONTEXT.testcases_dir,
                     f"{tc_name_without_sh}.bbcd"
                 )
-                if not os.path.exists(bbcov_file):
+                if cov_json is None:
                     LOGGER.error(f"BBCOV file {bbcov_file} does not exist for test case {tc_name}, skipping coverage measurement")
                     return False
                 
-                # {filename: {line_num: {"covered": int, "function": str}}}
-                cov_json = self.generate_bbcov_line_output(
-                    CONTEXT.SUBJECT.subject_configs["target_files"],
-                    bbcov_file
-                )
                 if len(cov_json) == 0:
                     LOGGER.error(f"Failed to generate coverage json from bbcov file {bbcov_file} for test case {tc_name}, skipping coverage measurement")
                     return False
@@ -630,18 +695,16 @@ class Mutant:
             LOGGER.debug(f"No cctcs found for mutant {self.mutant_name}, not updating DB")
             return
         
-        for tc_idx, tc_name in self.tc_info["cctc"]:
-            DB.update(
-                "cpp_tc_info",
-                set_values={
-                    "tc_result": "cctc"
-                },
-                conditions={
-                    "bug_idx": self.bug_idx,
-                    "tc_idx": tc_idx,
-                    "tc_name": tc_name
-                }
-            )
+        rows = [
+            (self.bug_idx, tc_idx, tc_name, "cctc")
+            for tc_idx, tc_name in self.tc_info["cctc"]
+        ]
+        DB.bulk_update(
+            "cpp_tc_info",
+            set_columns=["tc_result"],
+            key_columns=["bug_idx", "tc_idx", "tc_name"],
+            rows=rows
+        )
         
         LOGGER.debug(f"Updated {len(self.tc_info['cctc'])} cctcs for mutant {self.mutant_name} in DB")
         return
@@ -708,10 +771,10 @@ class Mutant:
         self.lineIdx2lineKey = lineIdx2lineKey
         LOGGER.debug(f"Created lineKey2lineIdx mapping with {len(all_line_keys)} unique lines from bbcd coverage files")
 
-    def get_lineCovBitVal_from_tc_list(self, CONTEXT: WorkerContext, tc_list: list):
-        tcsIdx2lineCovBitVal = {}
-        for tc_idx, tc_name in tc_list:
-            lineCovBitSeq = ['0'] * len(self.lineKey2lineIdx)
+    def get_lineCovMatrix_from_tc_list(self, CONTEXT: WorkerContext, tc_list: list) -> CoverageMatrix:
+        """Coverage matrix over all lines of lineKey2lineIdx, one row per test case of tc_list"""
+        covMatrix = CoverageMatrix.zeros(len(tc_list), len(self.lineKey2lineIdx))
+        for row_idx, (tc_idx, tc_name) in enumerate(tc_list):
             tc_name_without_sh = tc_name.strip().split(".")[0]
             cov_file = os.path.join(
                 CONTEXT.coverage_dir,
@@ -720,20 +783,19 @@ class Mutant:
             )
             with open(cov_file, 'r') as f:
                 cov_data = json.load(f)
+            covered_line_idxs = []
             for filename in cov_data:
                 for line_number_str, lineData in cov_data[filename].items():
                     line_number = int(line_number_str)
                     count = lineData["covered"]
                     key = self.make_key(filename, line_number)
-                    if key in self.lineKey2lineIdx:
-                        idx = self.lineKey2lineIdx[key]
-                        if int(count) > 0:
-                            lineCovBitSeq[idx] = '1'
-            tcsIdx2lineCovBitVal[tc_idx] = int("".join(lineCovBitSeq), 2)
-        return tcsIdx2lineCovBitVal
+                    if key in self.lineKey2lineIdx and int(count) > 0:
+                        covered_line_idxs.append(self.lineKey2lineIdx[key])
+            covMatrix.set_row(row_idx, covered_line_idxs)
+        return covMatrix
     
-    def _get_lineCovBitVal_for_initialization_cmd(self, CONTEXT: WorkerContext):
-        lineCovBitSeq = ['0'] * len(self.lineKey2lineIdx)
+    def _get_lineCovMatrix_for_initialization_cmd(self, CONTEXT: WorkerContext) -> CoverageMatrix:
+        covered_line_idxs = []
         raw_cov_file = os.path.join(CONTEXT.coverage_dir, self.mutant_name, "initialization.raw.json")
         with open(raw_cov_file, 'r') as f:
             cov_data = json.load(f)
@@ -747,11 +809,14 @@ class Mutant:
                 idx = self.lineKey2lineIdx[key]
 
                 if int(count) > 0:
-                    lineCovBitSeq[idx] = '1'
-        return int("".join(lineCovBitSeq), 2)
+                    covered_line_idxs.append(idx)
+        covMatrix = CoverageMatrix.zeros(1, len(self.lineKey2lineIdx))
+        covMatrix.set_row(0, covered_line_idxs)
+        return covMatrix
     
     def save_candidate_lines_to_db(self, DB: CRUD, candidate_lineKeys2newlineIdx: dict):
         buggy_file, buggy_function, buggy_lineno = self.buggy_line_key.split("#")
+        rows = []
         for lineKey, newIdx in candidate_lineKeys2newlineIdx.items():
             filename, function_name, lineno = lineKey.split("#")
 
@@ -761,57 +826,55 @@ class Mutant:
                 and buggy_lineno == lineno:
                 is_buggy_line = True
             
-            values = [
+            rows.append([
                 self.bug_idx,
                 filename, function_name, int(lineno),
                 newIdx, is_buggy_line
-            ]
+            ])
             
-            DB.insert(
-                "cpp_line_info",
-                "bug_idx, file, function, lineno, line_idx, is_buggy_line",
-                values
-            )
+        DB.bulk_insert(
+            "cpp_line_info",
+            "bug_idx, file, function, lineno, line_idx, is_buggy_line",
+            rows
+        )
     
     def update_tc_result_to_irrelevant(self, DB: CRUD, notRelevantTCs: list):       
+        notRelevantTCs = set(notRelevantTCs)
+        rows = []
         for tc_result_type in ["fail", "pass", "cctc", "crashed"]:
             for tc_idx, tc_name in self.tc_info[tc_result_type]:
                 relevant_status = True
                 if tc_idx in notRelevantTCs or tc_result_type == "crashed" or tc_result_type == "cctc":
                     relevant_status = False
+                rows.append((self.bug_idx, tc_idx, tc_name, relevant_status))
 
-                DB.update(
-                    "cpp_tc_info",
-                    set_values={"relevant_tcs": relevant_status},
-                    conditions={
-                        "bug_idx": self.bug_idx,
-                        "tc_idx": tc_idx,
-                        "tc_name": tc_name
-                    }
-                )
+        DB.bulk_update(
+            "cpp_tc_info",
+            set_columns=["relevant_tcs"],
+            key_columns=["bug_idx", "tc_idx", "tc_name"],
+            rows=rows
+        )
     
-    def save_lineCovBit_to_db(self, DB: CRUD, tcs2lineCovBitVal: dict, tc_type: str, suffix: str, numLines: int):
+    def save_lineCovBit_to_db(self, DB: CRUD, tc_list: list, covMatrix: CoverageMatrix, tc_type: str, suffix: str):
         bit_sequence_length_col = f"{suffix}bit_sequence_length"
-        line_coverage_bit_sequence_col = f"{suffix}line_coverage_bit_sequence"
-
-        updated_count = 0
-        for tc_idx, lineCovBitVal in tcs2lineCovBitVal.items():
-            lineCovBitValStr = format(lineCovBitVal, f'0{numLines}b')
-            values = {
-                bit_sequence_length_col: numLines,
-                line_coverage_bit_sequence_col: lineCovBitValStr
-            }
-            DB.update(
-                "cpp_tc_info",
-                set_values=values,
-                conditions={
-                    "bug_idx": self.bug_idx,
-                    "tc_idx": tc_idx,
-                    "tc_result": tc_type
-                }
-            )
-            updated_count += 1
-        LOGGER.debug(f"Updated {updated_count} {tc_type} test cases in DB with {suffix}lineCovBitVal")
+        line_coverage_bits_col = f"{suffix}line_coverage_bits"
+
+        # only the packed bits are stored, readers decode them with the bit sequence length
+        rows = []
+        for row_idx, (tc_idx, tc_name) in enumerate(tc_list):
+            rows.append((
+                self.bug_idx, tc_idx, tc_type, covMatrix.num_cols, covMatrix.row_to_bytes(row_idx)
+            ))
+
+        # bit sequences can be long, keep each statement at a moderate size
+        DB.bulk_update(
+            "cpp_tc_info",
+            set_columns=[bit_sequence_length_col, line_coverage_bits_col],
+            key_columns=["bug_idx", "tc_idx", "tc_result"],
+            rows=rows,
+            page_size=200
+        )
+        LOGGER.debug(f"Updated {len(rows)} {tc_type} test cases in DB with {suffix}lineCovBitVal")
 
     def postprocess_coverage_info(self, CONTEXT: WorkerContext, DB: CRUD = None):
         # 1. set buggy_line_key
@@ -840,46 +903,42 @@ class Mutant:
         # 3. Get coverage info for each test case list
         numTotalLines = len(self.lineKey2lineIdx)
 
-        failTcs2lineCovBitVal = self.get_lineCovBitVal_from_tc_list(CONTEXT, self.tc_info["fail"])
-        failLinesBitVal = merge_lineCovBitVal(failTcs2lineCovBitVal)
-        failLinesBitValStr = format(failLinesBitVal, f'0{len(self.lineKey2lineIdx)}b')
-        numLinesExecutedByFailingTCs = failLinesBitValStr.count("1")
+        failCovMatrix = self.get_lineCovMatrix_from_tc_list(CONTEXT, self.tc_info["fail"])
+        failLinesMask = failCovMatrix.union()
+        numLinesExecutedByFailingTCs = mask_popcount(failLinesMask)
         LOGGER.debug(f"Number of lines executed by failing TCs: {numLinesExecutedByFailingTCs}")
 
-        passTcs2lineCovBitVal = self.get_lineCovBitVal_from_tc_list(CONTEXT, self.tc_info["pass"])
-        passLinesBitVal = merge_lineCovBitVal(passTcs2lineCovBitVal)
-        passLinesBitValStr = format(passLinesBitVal, f'0{len(self.lineKey2lineIdx)}b')
-        numLinesExecutedByPassingTCs = passLinesBitValStr.count("1")
+        passCovMatrix = self.get_lineCovMatrix_from_tc_list(CONTEXT, self.tc_info["pass"])
+        passLinesMask = passCovMatrix.union()
+        numLinesExecutedByPassingTCs = mask_popcount(passLinesMask)
         LOGGER.debug(f"Number of lines executed by passing TCs: {numLinesExecutedByPassingTCs}")
 
-        cctcTcs2lineCovBitVal = self.get_lineCovBitVal_from_tc_list(CONTEXT, self.tc_info["cctc"])
-        cctcLinesBitVal = merge_lineCovBitVal(cctcTcs2lineCovBitVal)
-        cctcLinesBitValStr = format(cctcLinesBitVal, f'0{len(self.lineKey2lineIdx)}b')
-        numLinesExecutedByCCTCs = cctcLinesBitValStr.count("1")
+        cctcCovMatrix = self.get_lineCovMatrix_from_tc_list(CONTEXT, self.tc_info["cctc"])
+        cctcLinesMask = cctcCovMatrix.union()
+        numLinesExecutedByCCTCs = mask_popcount(cctcLinesMask)
         LOGGER.debug(f"Number of lines executed by cctc TCs: {numLinesExecutedByCCTCs}")
 
-        totalNumLinesExecutedStr = format((failLinesBitVal | passLinesBitVal | cctcLinesBitVal), f'0{len(self.lineKey2lineIdx)}b')
-        numTotalLinesExecuted = totalNumLinesExecutedStr.count("1")
+        numTotalLinesExecuted = mask_popcount(failLinesMask | passLinesMask | cctcLinesMask)
         LOGGER.debug(f"Number of total lines executed by all TCs: {numTotalLinesExecuted}")
 
         # 4. Get candidate lines which are lines executed by failing test cases
+        candidate_lineIdxs = np.flatnonzero(unpack_mask(failLinesMask, numTotalLines))
         candidate_lineKeys2newlineIdx = {}
-        newIdx = -1
-        for bitCharIdx, bitChar in enumerate(failLinesBitValStr):
-            if bitChar == '1':
-                newIdx += 1
-                lineKey = self.lineIdx2lineKey[bitCharIdx]
-                candidate_lineKeys2newlineIdx[lineKey] = newIdx
-                if lineKey == self.buggy_line_key:
-                    LOGGER.debug(f"FOUND buggy line in candidates: {lineKey}")
+        for newIdx, lineIdx in enumerate(candidate_lineIdxs):
+            lineKey = self.lineIdx2lineKey[int(lineIdx)]
+            candidate_lineKeys2newlineIdx[lineKey] = newIdx
+            if lineKey == self.buggy_line_key:
+                LOGGER.debug(f"FOUND buggy line in candidates: {lineKey}")
         
         self.save_candidate_lines_to_db(DB, candidate_lineKeys2newlineIdx)
         
         # 5. Identify not-relevant test cases among passing and cctc test cases
         # not-relevant test cases are test cases that do not cover any candidate lines
         notRelevantTCs = []
-        passIrrelevant = identify_not_relevant_tcs(passTcs2lineCovBitVal, failLinesBitVal)
-        cctcsIrrelevant = identify_not_relevant_tcs(cctcTcs2lineCovBitVal, failLinesBitVal)
+        passRelevant = passCovMatrix.intersects(failLinesMask)
+        cctcsRelevant = cctcCovMatrix.intersects(failLinesMask)
+        passIrrelevant = [tc_idx for (tc_idx, tc_name), relevant in zip(self.tc_info["pass"], passRelevant) if not relevant]
+        cctcsIrrelevant = [tc_idx for (tc_idx, tc_name), relevant in zip(self.tc_info["cctc"], cctcsRelevant) if not relevant]
         LOGGER.debug(f"Identified {len(passIrrelevant)} irrelevant passing test cases")
         LOGGER.debug(f"Identified {len(cctcsIrrelevant)} irrelevant cctc test cases")
         notRelevantTCs.extend(passIrrelevant)
@@ -888,44 +947,37 @@ class Mutant:
         
         self.update_tc_result_to_irrelevant(DB, notRelevantTCs)
 
-        # 6. Reform covBitVal to only include candidate lines
-        reformedFailTcs2lineCovBitVal = reform_covBitVal_to_candidate_lines(failTcs2lineCovBitVal, candidate_lineKeys2newlineIdx, numTotalLines, self.lineIdx2lineKey)
-        reformedPassTcs2lineCovBitVal = reform_covBitVal_to_candidate_lines(passTcs2lineCovBitVal, candidate_lineKeys2newlineIdx, numTotalLines, self.lineIdx2lineKey)
-        reformedCctcTcs2lineCovBitVal = reform_covBitVal_to_candidate_lines(cctcTcs2lineCovBitVal, candidate_lineKeys2newlineIdx, numTotalLines, self.lineIdx2lineKey)
+        # 6. Reform coverage to only include candidate lines
+        reformedFailCovMatrix = failCovMatrix.select_columns(candidate_lineIdxs)
+        reformedPassCovMatrix = passCovMatrix.select_columns(candidate_lineIdxs)
+        reformedCctcCovMatrix = cctcCovMatrix.select_columns(candidate_lineIdxs)
 
         if CONTEXT.SUBJECT.subject_configs["test_initialization"]["status"] == True:
-            initializationCovBitVal = self._get_lineCovBitVal_for_initialization_cmd(CONTEXT)
-            # LOGGER.debug(f"achieved initializationCovBitVal: {initializationCovBitVal}")
-            reformedInitializationCovBitVal = reform_covBitVal_to_candidate_lines(
-                {"initialization_cmd": initializationCovBitVal},
-                candidate_lineKeys2newlineIdx, 
-                numTotalLines, self.lineIdx2lineKey
-            )
-            initLineCovBitValStr = format(initializationCovBitVal, f'0{numTotalLines}b')
-            reformedInitLineCovBitValStr = format(reformedInitializationCovBitVal["initialization_cmd"], f'0{len(candidate_lineKeys2newlineIdx)}b')
+            initializationCovMatrix = self._get_lineCovMatrix_for_initialization_cmd(CONTEXT)
+            reformedInitializationCovMatrix = initializationCovMatrix.select_columns(candidate_lineIdxs)
             cols = [
                 "bug_idx", "tc_idx", "tc_name",
                 "tc_result", "tc_ret_code", "execution_time_ms",
-                "full_bit_sequence_length", "full_line_coverage_bit_sequence",
-                "bit_sequence_length", "line_coverage_bit_sequence",
+                "full_bit_sequence_length", "full_line_coverage_bits",
+                "bit_sequence_length", "line_coverage_bits",
                 "relevant_tcs"
             ]
             col_str = ", ".join(cols)
             values = [
                 self.bug_idx, -1, "initialization",
                 "initialization", 0, 0,
-                numTotalLines, initLineCovBitValStr,
-                len(candidate_lineKeys2newlineIdx), reformedInitLineCovBitValStr,
+                numTotalLines, initializationCovMatrix.row_to_bytes(0),
+                len(candidate_lineKeys2newlineIdx), reformedInitializationCovMatrix.row_to_bytes(0),
                 False
             ]
             DB.insert("cpp_tc_info", col_str, values)
 
-        self.save_lineCovBit_to_db(DB, failTcs2lineCovBitVal, "fail", "full_", numTotalLines)
-        self.save_lineCovBit_to_db(DB, passTcs2lineCovBitVal, "pass", "full_", numTotalLines)
-        self.save_lineCovBit_to_db(DB, cctcTcs2lineCovBitVal, "cctc", "full_", numTotalLines)
-        self.save_lineCovBit_to_db(DB, reformedFailTcs2lineCovBitVal, "fail", "", len(candidate_lineKeys2newlineIdx))
-        self.save_lineCovBit_to_db(DB, reformedPassTcs2lineCovBitVal, "pass", "", len(candidate_lineKeys2newlineIdx))
-        self.save_lineCovBit_to_db(DB, reformedCctcTcs2lineCovBitVal, "cctc", "", len(candidate_lineKeys2newlineIdx))
+        self.save_lineCovBit_to_db(DB, self.tc_info["fail"], failCovMatrix, "fail", "full_")
+        self.save_lineCovBit_to_db(DB, self.tc_info["pass"], passCovMatrix, "pass", "full_")
+        self.save_lineCovBit_to_db(DB, self.tc_info["cctc"], cctcCovMatrix, "cctc", "full_")
+        self.save_lineCovBit_to_db(DB, self.tc_info["fail"], reformedFailCovMatrix, "fail", "")
+        self.save_lineCovBit_to_db(DB, self.tc_info["pass"], reformedPassCovMatrix, "pass", "")
+        self.save_lineCovBit_to_db(DB, self.tc_info["cctc"], reformedCctcCovMatrix, "cctc", "")
 
         # 7. Prepare coverage summary
         coverage_summary = {
@@ -999,7 +1051,7 @@ class Mutant:
                     stdout=sp.PIPE,
                     encoding="utf-8",
                     env=os.environ,
-                    preexec_fn=os.setsid  # Create new process group
+                    start_new_session=True  # Create new process group, safe when tests run from threads
                 )
                 proc.wait(timeout=20)
                 stdout_output = proc.stdout.read()
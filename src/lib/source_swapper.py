@@ -0,0 +1,153 @@
+import os
+import time
+import shutil
+import logging
+
+LOGGER = logging.getLogger(__name__)
+
+# minimal mtime increase of a swapped file, keeps it newer than objects built from the previous content
+MTIME_STEP_NS = 1_000_000
+
+
+class SourceSwapper:
+    """
+    Applies mutants by swapping whole files instead of spawning diff and patch.
+
+    A mutant file is a complete copy of its target file, so applying it writes
+    its bytes over the target (atomically, with os.replace) and reverting writes
+    back the previous content, which is kept in memory. The original bytes of a
+    target are read once per worker. Every swap strictly increases the target's
+    mtime so incremental builds always see the change.
+
+    pristine_resolver maps a target to its untouched copy (e.g. the machine's
+    subject repository), so a file left mutated by a crashed worker is not
+    mistaken for the original. journal_file lists the targets currently swapped,
+    so a new worker process can restore the files a crashed one left mutated.
+    """
+    def __init__(self, pristine_resolver=None, journal_file: str = None):
+        self.pristine_resolver = pristine_resolver
+        self.journal_file = journal_file
+        # target file path -> original (pristine) bytes
+        self.snapshots = {}
+        # target file path -> stack of applied contents
+        self.applied = {}
+
+    def snapshot(self, target_file_path: str) -> bytes:
+        if target_file_path not in self.snapshots:
+            with open(target_file_path, 'rb') as f:
+                content = f.read()
+
+            pristine_file_path = self.pristine_resolver(target_file_path) if self.pristine_resolver else None
+            if pristine_file_path is not None and os.path.exists(pristine_file_path):
+                with open(pristine_file_path, 'rb') as f:
+                    pristine = f.read()
+                if content != pristine:
+                    LOGGER.warning(f"{target_file_path} was left modified, restoring it from {pristine_file_path}")
+                    self._write(target_file_path, pristine)
+                content = pristine
+
+            self.snapshots[target_file_path] = content
+            LOGGER.debug(f"Snapshot taken of {target_file_path}")
+        return self.snapshots[target_file_path]
+
+    def current(self, target_file_path: str) -> bytes:
+        stack = self.applied.get(target_file_path)
+        if stack:
+            return stack[-1]
+        return self.snapshot(target_file_path)
+
+    def _write(self, target_file_path: str, content: bytes):
+        previous_mtime_ns = os.stat(target_file_path).st_mtime_ns
+        tmp_file_path = f"{target_file_path}.swap{os.getpid()}"
+        with open(tmp_file_path, 'wb') as f:
+            f.write(content)
+        shutil.copymode(target_file_path, tmp_file_path)
+        os.replace(tmp_file_path, target_file_path)
+
+        mtime_ns = max(time.time_ns(), previous_mtime_ns + MTIME_STEP_NS)
+        os.utime(target_file_path, ns=(mtime_ns, mtime_ns))
+
+    def apply(self, target_file_path: str, mutant_file_path: str) -> bool:
+        try:
+            self.snapshot(target_file_path)
+            with open(mutant_file_path, 'rb') as f:
+                content = f.read()
+            self._write_journal(target_file_path)
+            self._write(target_file_path, content)
+        except OSError as e:
+            LOGGER.error(f"Error swapping {mutant_file_path} into {target_file_path}: {e}")
+            return False
+        self.applied.setdefault(target_file_path, []).append(content)
+        LOGGER.debug(f"Swapped {mutant_file_path} into {target_file_path}")
+        return True
+
+    def _write_journal(self, swapping: str = None):
+        """Rewrite the journal with the targets currently applied, and the one about to be swapped"""
+        if self.journal_file is None:
+            return
+        targets = [target_file_path for target_file_path, stack in self.applied.items() if stack]
+        if swapping is not None and swapping not in targets:
+            targets.append(swapping)
+
+        if not targets:
+            if os.path.exists(self.journal_file):
+                os.remove(self.journal_file)
+            return
+        tmp_file_path = f"{self.journal_file}.tmp{os.getpid()}"
+        with open(tmp_file_path, 'w') as f:
+            f.write("".join(target_file_path + "\n" for target_file_path in targets))
+        os.replace(tmp_file_path, self.journal_file)
+
+    def _read_journal(self) -> list:
+        if self.journal_file is None or not os.path.exists(self.journal_file):
+            return []
+        with open(self.journal_file, 'r') as f:
+            return [line.strip() for line in f if line.strip()]
+
+    def restore_all(self, keep: list = None) -> list:
+        """
+        Bring every known target back to its original bytes, returns the restored paths.
+        Used before a task so a previous task that died mid-way cannot leave a mutant applied.
+        Targets in keep stay at their first applied content (e.g. the origin mutant shared
+        by consecutive tasks), only what was applied on top of it is reverted.
+        """
+        keep = keep or []
+        restored = []
+        # targets swapped by a previous worker process are checked against their pristine copy
+        for target_file_path in dict.fromkeys(self._read_journal()):
+            if target_file_path not in self.snapshots and os.path.exists(target_file_path):
+                with open(target_file_path, 'rb') as f:
+                    on_disk = f.read()
+                if on_disk != self.snapshot(target_file_path):
+                    restored.append(target_file_path)
+
+        for target_file_path, content in self.snapshots.items():
+            stack = self.applied.pop(target_file_path, None)
+            kept_depth = 0
+            if target_file_path in keep and stack:
+                content = stack[0]
+                self.applied[target_file_path] = [content]
+                kept_depth = 1
+            with open(target_file_path, 'rb') as f:
+                on_disk = f.read()
+            if len(stack or []) > kept_depth or on_disk != content:
+                self._write(target_file_path, content)
+                restored.append(target_file_path)
+
+        # only the kept targets remain in the journal
+        self._write_journal()
+        return restored
+
+    def revert(self, target_file_path: str) -> bool:
+        """Restore the content before the last apply, reverting an unmodified file rewrites its original bytes"""
+        stack = self.applied.get(target_file_path)
+        if stack:
+            stack.pop()
+        try:
+            self._write(target_file_path, self.current(target_file_path))
+            self._write_journal()
+        except OSError as e:
+            LOGGER.error(f"Error restoring {target_file_path}: {e}")
+            return False
+        LOGGER.debug(f"Restored {target_file_path}")
+        return True
@@ -9,6 +9,7 @@ LOGGER = logging.getLogger(__name__)
 class Subject():
     def __init__(self, name: str):
         self.name = name
+        self.environment_set_for = None
         LOGGER.info("Subject initialized")
     
     def set_files(self, repo_dir: str = None):
@@ -27,6 +28,10 @@ class Subject():
         self.build_script = os.path.join(self.build_script_working_directory, "build_script.sh")
         self.clean_script = os.path.join(self.build_script_working_directory, "clean_script.sh")
 
+        # number of test scripts a worker core runs at the same time (stage03 and stage05),
+        # stage01 runs them one at a time to record their execution_time_ms
+        self.test_execution_width = max(1, int(self.subject_configs.get("test_execution_width", 1)))
+
     def check_required_scripts_exists(self):
         assert os.path.exists(self.configure_no_cov_script), "Configure script does not exist"
         assert os.path.exists(self.configure_yes_cov_script), "Configure script does not exist"
@@ -38,6 +43,13 @@ class Subject():
         assert os.path.exists(self.test_case_directory)
 
     def set_environmental_variables(self, core_dir: str):
+        # A long-lived worker executes many tasks in the same process,
+        # so the paths must only be prepended once per core directory
+        if self.environment_set_for == core_dir:
+            LOGGER.debug("Subject environmental variables already set")
+            return
+        self.environment_set_for = core_dir
+
         if self.subject_configs["environment_setting"]["needed"]:
             for key, value in self.subject_configs["environment_setting"]["variables"].items():
                 path = os.path.join(core_dir, value)
@@ -0,0 +1,158 @@
+import json
+import logging
+
+from lib.database import CRUD
+
+LOGGER = logging.getLogger(__name__)
+
+LEDGER_TABLE = "cpp_task_ledger"
+TASK_STATES = ["queued", "running", "done", "failed"]
+
+# defaults of the TASK_LEDGER_* settings
+DEFAULT_MAX_ATTEMPTS = 3
+DEFAULT_RETRY_BACKOFF_SEC = 30
+DEFAULT_LEASE_SEC = 7200
+
+
+def is_ledger_enabled(ENV) -> bool:
+    return ENV.get("TASK_LEDGER", "false").lower() == "true"
+
+def get_max_attempts(ENV) -> int:
+    return int(ENV.get("TASK_LEDGER_MAX_ATTEMPTS", DEFAULT_MAX_ATTEMPTS))
+
+def get_retry_backoff(ENV) -> float:
+    return float(ENV.get("TASK_LEDGER_RETRY_BACKOFF_SEC", DEFAULT_RETRY_BACKOFF_SEC))
+
+def get_retry_delay(backoff_sec: float, attempts: int) -> float:
+    """Seconds to wait before retrying a task that failed `attempts` times (exponential backoff)"""
+    return backoff_sec * (2 ** max(attempts - 1, 0))
+
+def make_task_key(args: dict) -> str:
+    """Identify a task by its descriptor, needs_configuration only depends on the core's history"""
+    return json.dumps(
+        {key: value for key, value in args.items() if key != "needs_configuration" and value is not None},
+        sort_keys=True
+    )
+
+
+class TaskLedger:
+    """
+    Durable record of the tasks of a stage in the DB (cpp_task_ledger).
+
+    A task is claimed atomically before it runs (queued/failed -> running, or an
+    expired lease of a running task), and marked done or failed with its machine,
+    core, attempt count and timestamps. Failed tasks are retried after an
+    exponential backoff until the maximum number of attempts, and tasks already
+    done are skipped, so an interrupted stage resumes at the exact task boundary.
+    Tasks are tracked per subject and experiment label, mutant file names repeat
+    across them.
+    """
+    def __init__(self, DB: CRUD, stage: str, subject: str, experiment_label: str, ENV: dict = None):
+        ENV = ENV if ENV is not None else {}
+        self.DB = DB
+        self.stage = stage
+        self.subject = subject
+        self.experiment_label = experiment_label
+        self.max_attempts = get_max_attempts(ENV)
+        self.backoff_sec = get_retry_backoff(ENV)
+        self.lease_sec = int(ENV.get("TASK_LEDGER_LEASE_SEC", DEFAULT_LEASE_SEC))
+
+    def _scope(self) -> list:
+        """Values of the subject, experiment_label and stage columns"""
+        return [self.subject, self.experiment_label, self.stage]
+
+    def initialize(self):
+        if not self.DB.table_exists(LEDGER_TABLE):
+            cols = [
+                "subject TEXT NOT NULL",
+                "experiment_label TEXT NOT NULL",
+                "stage TEXT NOT NULL",
+                "task_key TEXT NOT NULL",
+                "status TEXT NOT NULL DEFAULT 'queued'",
+                "machine TEXT",
+                "core_idx INT",
+                "attempts INT NOT NULL DEFAULT 0",
+                "last_error TEXT",
+                "queued_at TIMESTAMP DEFAULT NOW()",
+                "started_at TIMESTAMP",
+                "finished_at TIMESTAMP",
+                "lease_expires_at TIMESTAMP",
+                "next_attempt_at TIMESTAMP",
+                "PRIMARY KEY (subject, experiment_label, stage, task_key)"
+            ]
+            self.DB.create_table(LEDGER_TABLE, ",".join(cols))
+            self.DB.create_index(LEDGER_TABLE, f"idx_{LEDGER_TABLE}_status", "subject, experiment_label, stage, status")
+
+    def requeue_interrupted(self) -> int:
+        """Put back the tasks left running by a previous run of the stage, returns their number"""
+        rows = self.DB.execute(
+            f"UPDATE {LEDGER_TABLE} SET status = 'queued', lease_expires_at = NULL "
+            f"WHERE subject = %s AND experiment_label = %s AND stage = %s AND status = 'running' RETURNING task_key",
+            self._scope()
+        )
+        self.DB.commit()
+        if rows:
+            LOGGER.info(f"Requeued {len(rows)} interrupted {self.stage} tasks")
+        return len(rows)
+
+    def enqueue(self, task_key: str):
+        self.DB.safe_execute(
+            f"INSERT INTO {LEDGER_TABLE} (subject, experiment_label, stage, task_key) "
+            f"VALUES (%s, %s, %s, %s) ON CONFLICT DO NOTHING",
+            self._scope() + [task_key]
+        )
+        self.DB.commit()
+
+    def claim(self, task_key: str, machine: str, core_idx: int) -> bool:
+        """Mark the task as running on the core, False if it is done, exhausted, backing off or leased by another core"""
+        self.enqueue(task_key)
+        rows = self.DB.execute(
+            f"UPDATE {LEDGER_TABLE} SET status = 'running', machine = %s, core_idx = %s, "
+            f"attempts = attempts + 1, started_at = NOW(), finished_at = NULL, "
+            f"lease_expires_at = NOW() + %s * INTERVAL '1 second' "
+            f"WHERE subject = %s AND experiment_label = %s AND stage = %s AND task_key = %s AND ("
+            f"(status IN ('queued', 'failed') AND attempts < %s AND (next_attempt_at IS NULL OR next_attempt_at <= NOW())) "
+            f"OR (status = 'running' AND lease_expires_at < NOW())"
+            f") RETURNING attempts",
+            [machine, core_idx, self.lease_sec] + self._scope() + [task_key, self.max_attempts]
+        )
+        self.DB.commit()
+        return len(rows) > 0
+
+    def complete(self, task_key: str):
+        self.DB.safe_execute(
+            f"UPDATE {LEDGER_TABLE} SET status = 'done', last_error = NULL, finished_at = NOW(), "
+            f"lease_expires_at = NULL "
+            f"WHERE subject = %s AND experiment_label = %s AND stage = %s AND task_key = %s",
+            self._scope() + [task_key]
+        )
+        self.DB.commit()
+
+    def fail(self, task_key: str, error: str):
+        self.DB.safe_execute(
+            f"UPDATE {LEDGER_TABLE} SET status = 'failed', last_error = %s, finished_at = NOW(), "
+            f"lease_expires_at = NULL, "
+            f"next_attempt_at = NOW() + %s * POWER(2, GREATEST(attempts - 1, 0)) * INTERVAL '1 second' "
+            f"WHERE subject = %s AND experiment_label = %s AND stage = %s AND task_key = %s",
+            [error, self.backoff_sec] + self._scope() + [task_key]
+        )
+        self.DB.commit()
+
+    def can_retry(self, task_key: str) -> bool:
+        """Whether a task that could not be claimed failed before and still has attempts left"""
+        state = self.get_state(task_key)
+        return state is not None and state[0] == "failed" and state[1] < self.max_attempts
+
+    def get_state(self, task_key: str):
+        """(status, attempts) of the task, None if it was never queued"""
+        rows = self.DB.read(
+            LEDGER_TABLE,
+            columns="status, attempts",
+            conditions={
+                "subject": self.subject,
+                "experiment_label": self.experiment_label,
+                "stage": self.stage,
+                "task_key": task_key
+            }
+        )
+        return tuple(rows[0]) if rows else None
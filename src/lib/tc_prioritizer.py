@@ -0,0 +1,67 @@
+import logging
+
+from lib.database import CRUD
+
+LOGGER = logging.getLogger(__name__)
+
+# execution time assumed for tests without a recorded time (ms)
+DEFAULT_EXECUTION_TIME_MS = 1000.0
+
+
+class TcPrioritizer:
+    """
+    Orders the test cases of a bug by expected information per second.
+
+    The information of a test is its estimated probability to kill a mutant,
+    (kills + 1) / (executions + 2) over the mutants of the same line tested so
+    far, and its cost the execution time recorded in stage01 (cpp_tc_info).
+    Without kill history this orders cheap tests first.
+    """
+    def __init__(self, DB: CRUD, bug_idx: int):
+        self.DB = DB
+        self.bug_idx = bug_idx
+        self.tcIdx2time = {}
+        self.tcIdx2kills = {}
+        self.tcIdx2executions = {}
+        self._load_execution_times()
+
+    def _load_execution_times(self):
+        tc_info = self.DB.read(
+            "cpp_tc_info",
+            columns="tc_idx, execution_time_ms",
+            conditions={"bug_idx": self.bug_idx},
+            special="AND tc_idx != -1"
+        )
+        for tc_idx, execution_time_ms in tc_info:
+            self.tcIdx2time[tc_idx] = float(execution_time_ms) if execution_time_ms is not None else DEFAULT_EXECUTION_TIME_MS
+        LOGGER.debug(f"Loaded execution times of {len(self.tcIdx2time)} test cases for bug {self.bug_idx}")
+
+    def load_kill_history(self, line_idx: int):
+        """Count the transitions of each test over the mutants of line_idx already tested in stage05"""
+        self.tcIdx2kills = {}
+        self.tcIdx2executions = {}
+        if line_idx is None:
+            return
+
+        mutation_info = self.DB.read(
+            "cpp_mutation_info",
+            columns="result_transition",
+            conditions={"bug_idx": self.bug_idx, "line_idx": line_idx},
+            special="AND build_result IS TRUE AND result_transition IS NOT NULL"
+        )
+        for (result_transition,) in mutation_info:
+            for tc_idx, symbol in enumerate(result_transition):
+                if symbol == "1":
+                    self.tcIdx2kills[tc_idx] = self.tcIdx2kills.get(tc_idx, 0) + 1
+                if symbol in ("0", "1"):
+                    self.tcIdx2executions[tc_idx] = self.tcIdx2executions.get(tc_idx, 0) + 1
+        LOGGER.debug(f"Loaded kill history of {len(mutation_info)} mutants on line {line_idx} for bug {self.bug_idx}")
+
+    def priority(self, tc_idx: int) -> float:
+        kill_probability = (self.tcIdx2kills.get(tc_idx, 0) + 1) / (self.tcIdx2executions.get(tc_idx, 0) + 2)
+        execution_time_ms = self.tcIdx2time.get(tc_idx, DEFAULT_EXECUTION_TIME_MS)
+        return kill_probability / max(execution_time_ms, 1.0)
+
+    def order(self, tcs: list) -> list:
+        """Sort test case tuples (tc_idx first) by decreasing priority, ties keep their order"""
+        return sorted(tcs, key=lambda tc: -self.priority(tc[0]))
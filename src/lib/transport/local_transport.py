@@ -0,0 +1,48 @@
+import os
+import shutil
+import logging
+
+from lib.transport.transport import Transport
+
+LOGGER = logging.getLogger(__name__)
+
+
+class LocalTransport(Transport):
+    """
+    Stand-in transport executing "remote" commands and transfers on this machine,
+    used to run the remote executor and file manager without ssh (e.g. in tests).
+    """
+    def command(self, machine: str, cmd: list) -> list:
+        # ssh joins the arguments into one shell command line on the machine
+        return ["bash", "-c", " ".join(cmd)]
+
+    def _copy(self, src: str, dest: str, recursive: bool) -> int:
+        # same destination semantics as rsync without a trailing slash on src
+        if os.path.isdir(dest):
+            dest = os.path.join(dest, os.path.basename(os.path.normpath(src)))
+        try:
+            if os.path.isdir(src):
+                if not recursive:
+                    LOGGER.warning(f"Skipping directory {src} of a non-recursive copy")
+                    return 0
+                shutil.copytree(src, dest, dirs_exist_ok=True)
+            else:
+                shutil.copy2(src, dest)
+        except OSError as e:
+            LOGGER.error(f"Error copying {src} to {dest}: {e}")
+            return 1
+        return 0
+
+    def push(self, src: str, dest: str, machine: str, recursive: bool = False) -> int:
+        return self._copy(src, dest, recursive)
+
+    def push_files(self, files: list, dest: str, machine: str) -> int:
+        os.makedirs(dest, exist_ok=True)
+        for src in files:
+            ret = self._copy(str(src), dest, recursive=False)
+            if ret != 0:
+                return ret
+        return 0
+
+    def pull(self, src: str, dest: str, machine: str, recursive: bool = True) -> int:
+        return self._copy(src, dest, recursive)
@@ -0,0 +1,109 @@
+import os
+import time
+import logging
+import tempfile
+import threading
+import subprocess as sp
+
+from lib.transport.transport import Transport
+from utils.command_utils import *
+
+LOGGER = logging.getLogger(__name__)
+
+# shared by every SSHTransport of the process, so one master connection is kept per machine
+# (control_dir, machine) -> last time the master was used
+_MASTER_LAST_USED = {}
+_OPEN_LOCK = threading.Lock()
+
+
+class SSHTransport(Transport):
+    """
+    Runs commands and rsync transfers over one multiplexed ssh connection per machine.
+
+    The first use of a machine starts a ControlMaster connection (kept for
+    control_persist idle seconds), later ssh and rsync invocations reuse its
+    socket and skip the TCP and SSH handshakes. Without a master they connect
+    directly, as before.
+    """
+    def __init__(self, control_dir: str = None, control_persist: int = 600):
+        if control_dir is None:
+            control_dir = os.path.join(tempfile.gettempdir(), f"cpp_dlfl_ssh_{os.getuid()}")
+        os.makedirs(control_dir, mode=0o700, exist_ok=True)
+        self.control_dir = control_dir
+        self.control_persist = control_persist
+        # %C is a hash of the connection, keeps the socket path short
+        self.control_path = os.path.join(control_dir, "%C")
+
+    def ssh_options(self) -> list:
+        return ["-o", f"ControlPath={self.control_path}", "-o", "ControlMaster=no"]
+
+    def open(self, machine: str):
+        """Start the master connection of the machine if it is not running"""
+        with _OPEN_LOCK:
+            key = (self.control_dir, machine)
+            now = time.time()
+            # the master exits after control_persist idle seconds
+            if key in _MASTER_LAST_USED and now - _MASTER_LAST_USED[key] < self.control_persist:
+                _MASTER_LAST_USED[key] = now
+                return
+            if self.is_open(machine):
+                _MASTER_LAST_USED[key] = now
+                return
+
+            cmd = [
+                "ssh", "-o", f"ControlPath={self.control_path}",
+                "-o", "ControlMaster=yes",
+                "-o", f"ControlPersist={self.control_persist}",
+                "-N", "-f", machine
+            ]
+            # the backgrounded master must not hold the pipes of the caller
+            res = sp.run(cmd, stdin=sp.DEVNULL, stdout=sp.DEVNULL, stderr=sp.DEVNULL)
+            # a failed attempt is not repeated before control_persist seconds either
+            _MASTER_LAST_USED[key] = now
+            if res.returncode == 0:
+                LOGGER.info(f"SSH master connection opened to {machine}")
+            else:
+                LOGGER.warning(f"Failed to open SSH master connection to {machine}, connecting per command")
+
+    def is_open(self, machine: str) -> bool:
+        cmd = ["ssh", "-o", f"ControlPath={self.control_path}", "-O", "check", machine]
+        return sp.run(cmd, stdin=sp.DEVNULL, stdout=sp.DEVNULL, stderr=sp.DEVNULL).returncode == 0
+
+    def close(self, machine: str):
+        with _OPEN_LOCK:
+            cmd = ["ssh", "-o", f"ControlPath={self.control_path}", "-O", "exit", machine]
+            sp.run(cmd, stdin=sp.DEVNULL, stdout=sp.DEVNULL, stderr=sp.DEVNULL)
+            _MASTER_LAST_USED.pop((self.control_dir, machine), None)
+            LOGGER.info(f"SSH master connection to {machine} closed")
+
+    def command(self, machine: str, cmd: list) -> list:
+        self.open(machine)
+        return ["ssh"] + self.ssh_options() + [machine] + cmd
+
+    def _rsync_shell(self) -> str:
+        return " ".join(["ssh"] + self.ssh_options())
+
+    def push(self, src: str, dest: str, machine: str, recursive: bool = False) -> int:
+        self.open(machine)
+        cmd = ["rsync", "-t"] + (["-r"] if recursive else []) + ["-e", self._rsync_shell(), f"{src}", f"{machine}:{dest}"]
+        return execute_command_as_list(cmd)
+
+    def push_files(self, files: list, dest: str, machine: str) -> int:
+        """Ship all files in one rsync session, flattened into dest (--no-relative)"""
+        if not files:
+            return 0
+        self.open(machine)
+        with tempfile.NamedTemporaryFile("w", prefix="files_from_", suffix=".txt") as files_from:
+            # --files-from paths are relative to the source root /
+            files_from.write("\n".join(os.path.abspath(str(src)).lstrip("/") for src in files) + "\n")
+            files_from.flush()
+            cmd = [
+                "rsync", "-t", "--no-relative", f"--files-from={files_from.name}",
+                "-e", self._rsync_shell(), "/", f"{machine}:{dest}/"
+            ]
+            return execute_command_as_list(cmd)
+
+    def pull(self, src: str, dest: str, machine: str, recursive: bool = True) -> int:
+        self.open(machine)
+        cmd = ["rsync", "-t"] + (["-r"] if recursive else []) + ["-e", self._rsync_shell(), f"{machine}:{src}", f"{dest}"]
+        return execute_command_as_list(cmd)
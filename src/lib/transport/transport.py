@@ -0,0 +1,47 @@
+from abc import ABC, abstractmethod
+
+from utils.command_utils import *
+
+
+class Transport(ABC):
+    """
+    Abstract channel to the machines of an experiment.
+
+    Commands are given as lists joined into a shell command on the machine
+    (as `ssh machine cmd...` does), and files are pushed to or pulled from it.
+    """
+
+    @abstractmethod
+    def command(self, machine: str, cmd: list) -> list:
+        """Return the local command list running cmd on the machine"""
+        raise NotImplementedError("Subclasses must implement command() method")
+
+    def run(self, machine: str, cmd: list, working_dir: str = None) -> int:
+        """Run cmd on the machine and return its return code"""
+        return execute_command_as_list(self.command(machine, cmd), working_dir=working_dir)
+
+    @abstractmethod
+    def push(self, src: str, dest: str, machine: str, recursive: bool = False) -> int:
+        """Copy a local file (or directory) into dest on the machine"""
+        raise NotImplementedError("Subclasses must implement push() method")
+
+    def push_files(self, files: list, dest: str, machine: str) -> int:
+        """Copy many local files into the dest directory of the machine, one transfer where supported"""
+        for src in files:
+            ret = self.push(src, dest, machine)
+            if ret != 0:
+                return ret
+        return 0
+
+    @abstractmethod
+    def pull(self, src: str, dest: str, machine: str, recursive: bool = True) -> int:
+        """Copy a file (or directory) of the machine into the local dest"""
+        raise NotImplementedError("Subclasses must implement pull() method")
+
+    def open(self, machine: str):
+        """Optionally establish a persistent connection to the machine"""
+        pass
+
+    def close(self, machine: str):
+        """Optionally release the persistent connection to the machine"""
+        pass
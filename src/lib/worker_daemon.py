@@ -0,0 +1,163 @@
+import os
+import sys
+import json
+import time
+import logging
+import traceback
+
+from lib.experiment_configs import ExperimentConfigs
+from lib.factories.worker_factory import WorkerFactory
+from lib.workers.worker import Worker
+from lib.task_ledger import TaskLedger, is_ledger_enabled, make_task_key
+
+LOGGER = logging.getLogger(__name__)
+
+# Task descriptor keys that are copied onto CONFIG.ARGS before each task
+TASK_ARGUMENTS = [
+    "target_file",
+    "mutant",
+    "origin_mutant_target_file",
+    "origin_mutant",
+    "bug_id",
+    "mutant_id",
+    "needs_configuration",
+]
+
+class WorkerDaemon:
+    """
+    Long-lived worker process bound to a single machine core.
+
+    Task descriptors are read as JSON lines from stdin and one JSON result line
+    is written back per task, so the Subject, WorkerContext and DB connection
+    are set up once per core instead of once per mutant.
+    """
+    def __init__(self, CONFIG: ExperimentConfigs, log_file_resolver=None):
+        self.CONFIG = CONFIG
+        self.log_file_resolver = log_file_resolver
+        self.WORKER: Worker = None
+        self.LEDGER: TaskLedger = None
+        self.channel = None
+
+    def serve(self):
+        """Serve task descriptors until stdin is closed or a shutdown command is received"""
+        self._open_channel()
+        self._send({"status": "ready", "pid": os.getpid()})
+        LOGGER.info(f"Worker daemon {self.CONFIG.ARGS.machine}::core{self.CONFIG.ARGS.core_idx} ready")
+
+        for line in sys.stdin:
+            line = line.strip()
+            if not line:
+                continue
+
+            try:
+                task = json.loads(line)
+            except json.JSONDecodeError as e:
+                self._send({"status": "failed", "error": f"Invalid task descriptor: {e}"})
+                continue
+
+            if task.get("command") == "shutdown":
+                break
+
+            self._send(self.run_task(task))
+
+        self.stop()
+
+    def run_task(self, task: dict) -> dict:
+        """Execute a single task descriptor and return its result"""
+        task_id = task.get("task_id")
+        task_key = make_task_key(task.get("args", {}))
+        start_time = time.time()
+        claimed = False
+        try:
+            self._set_task_arguments(task)
+            self._switch_log_file()
+
+            if self.WORKER is None:
+                self.WORKER = WorkerFactory.create_worker(self.CONFIG)
+                LOGGER.info(f"Successfully created worker: {self.CONFIG.ARGS.worker_type}")
+                if is_ledger_enabled(self.CONFIG.ENV):
+                    self.LEDGER = TaskLedger(
+                        self.WORKER.DB, self.CONFIG.STAGE,
+                        self.CONFIG.ARGS.subject, self.CONFIG.ARGS.experiment_label,
+                        self.CONFIG.ENV
+                    )
+            else:
+                self.WORKER.prepare_for_task()
+
+            if self.LEDGER is not None:
+                claimed = self.LEDGER.claim(task_key, self.CONFIG.ARGS.machine, self.CONFIG.ARGS.core_idx)
+                if not claimed:
+                    # done, out of attempts or leased by another core; "deferred" is still waiting for its retry
+                    status = "deferred" if self.LEDGER.can_retry(task_key) else "skipped"
+                    LOGGER.info(f"Task {task_id} not claimed ({status}): {task_key}")
+                    return {"task_id": task_id, "status": status, "error": None, "elapsed_ms": 0.0}
+
+            self.WORKER.verify_clean_state()
+            self.WORKER.execute()
+            status, error = "done", None
+        except Exception as e:
+            LOGGER.error(f"Error running worker task {task_id}: {e}")
+            LOGGER.debug(traceback.format_exc())
+            status, error = "failed", str(e)
+
+        if claimed:
+            try:
+                if status == "done":
+                    self.LEDGER.complete(task_key)
+                else:
+                    self.LEDGER.fail(task_key, error)
+            except Exception as e:
+                LOGGER.error(f"Error recording task {task_id} in the task ledger: {e}")
+
+        elapsed_ms = (time.time() - start_time) * 1000
+        return {
+            "task_id": task_id,
+            "status": status,
+            "error": error,
+            "elapsed_ms": elapsed_ms
+        }
+
+    def stop(self):
+        if self.WORKER is not None:
+            self.WORKER.stop()
+            self.WORKER = None
+        LOGGER.info(f"Worker daemon {self.CONFIG.ARGS.machine}::core{self.CONFIG.ARGS.core_idx} exiting")
+
+    def _set_task_arguments(self, task: dict):
+        args = task.get("args", {})
+        for key in TASK_ARGUMENTS:
+            default = False if key == "needs_configuration" else None
+            setattr(self.CONFIG.ARGS, key, args.get(key, default))
+
+    def _switch_log_file(self):
+        """Point the root file handler to the log file of the current task"""
+        if self.log_file_resolver is None:
+            return
+
+        log_file = self.log_file_resolver(self.CONFIG)
+        root_logger = logging.getLogger()
+        for handler in list(root_logger.handlers):
+            if isinstance(handler, logging.FileHandler):
+                if handler.baseFilename == os.path.abspath(log_file):
+                    return
+                formatter = handler.formatter
+                root_logger.removeHandler(handler)
+                handler.close()
+
+                new_handler = logging.FileHandler(log_file, mode='w')
+                new_handler.setFormatter(formatter)
+                root_logger.addHandler(new_handler)
+                return
+
+    def _open_channel(self):
+        """
+        Keep a private duplicate of stdout for the protocol and redirect fd 1 to stderr,
+        so output of build scripts or tests can never corrupt the result stream
+        """
+        self.channel = os.fdopen(os.dup(sys.stdout.fileno()), "w", buffering=1)
+        sys.stdout.flush()
+        os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+
+    def _send(self, message: dict):
+        self.channel.write(json.dumps(message) + "\n")
+        self.channel.flush()
@@ -63,7 +63,7 @@ class MutantBugTester(Worker):
             return
 
         # 3. Build the subject, if build fails, skip the mutant
-        res = execute_bash_script(self.SUBJECT.build_script, self.SUBJECT.build_script_working_directory)
+        res = self.build_subject([MUTANT.target_file_path], self.SUBJECT.configure_no_cov_script)
         test_results = None
         if res != 0:
             LOGGER.warning(f"Build failed after applying mutant {self.CONFIG.ARGS.mutant}, skipping")
@@ -95,14 +95,14 @@ class MutantBugTester(Worker):
             "fail": [],
             "crashed": []
         }
-        for tc_script in Path(self.testcases_dir).iterdir():
-            # only execute if file ends with *.sh
-            if not tc_script.name.endswith(".sh"):
-                continue
-            start_time = time.time()
-            res = MUTANT.run_test_with_testScript(tc_script)
-            end_time = time.time()
-            time_duration_ms = ((end_time - start_time) * 1000) # time in milliseconds
+        # only execute if file ends with *.sh
+        tc_scripts = [
+            tc_script for tc_script in Path(self.testcases_dir).iterdir()
+            if tc_script.name.endswith(".sh")
+        ]
+        # one test at a time, the baseline execution_time_ms of concurrent tests is not measured
+        results = MUTANT.run_tests_with_testScripts(tc_scripts, width=1)
+        for tc_script, (res, time_duration_ms, _) in zip(tc_scripts, results):
             # if res in crash_codes:
             #     test_results["fail"].append((tc_script, tc_script.name, res, time_duration_ms))
             if res == 0:
@@ -117,7 +117,8 @@ class MutantBugTester(Worker):
         return test_results
 
     def save_mutant(self, MUTANT: Mutant, test_results: dict = None):
-        def _save_mutant_info():
+        """Save the mutant and its test results in a single transaction"""
+        def _save_mutant_info() -> int:
             cols = [
                 "subject", "experiment_label", "version",
                 "type", "mutant_type", "target_code_file", "buggy_code_file",
@@ -127,47 +128,53 @@ class MutantBugTester(Worker):
                 self.CONFIG.ARGS.subject, self.CONFIG.ARGS.experiment_label, MUTANT.mutant_name,
                 "mutant", MUTANT.mutant_type, MUTANT.target_file, MUTANT.mutant_file,
             ]
-            self.DB.insert(
+            return self.DB.insert(
                 "cpp_bug_info",
                 col_str,
-                values
+                values,
+                returning="bug_idx",
+                commit=False
             )
         
         def _save_test_results(bug_idx: int):
             if test_results is None:
                 return
             
+            rows = []
             tc_idx = -1
             for status in ["fail", "pass", "crashed"]:
                 for tc_script, tc_name, res, time_duration_ms in test_results[status]:
                     tc_idx += 1
-                    cols = [
-                        "bug_idx", "tc_idx", "tc_name",
-                        "tc_result", "tc_ret_code", "execution_time_ms"
-                    ]
-                    col_str = ", ".join(cols)
-                    values = [
+                    rows.append([
                         bug_idx, tc_idx, tc_name,
                         status, res, time_duration_ms
-                    ]
-                    self.DB.insert(
-                        "cpp_tc_info",
-                        col_str,
-                        values
-                    )
+                    ])
+
+            cols = [
+                "bug_idx", "tc_idx", "tc_name",
+                "tc_result", "tc_ret_code", "execution_time_ms"
+            ]
+            col_str = ", ".join(cols)
+            self.DB.bulk_insert(
+                "cpp_tc_info",
+                col_str,
+                rows,
+                commit=False
+            )
         
-        _save_mutant_info()
-        bug_idx = self.DB.read(
-            "cpp_bug_info",
-            columns="bug_idx",
-            conditions={
-                "subject": self.CONFIG.ARGS.subject,
-                "experiment_label": self.CONFIG.ARGS.experiment_label,
-                "version": MUTANT.mutant_name
-            }
-        )
-        bug_idx = bug_idx[0][0]
-        _save_test_results(bug_idx)
+        def _save() -> int:
+            bug_idx = _save_mutant_info()
+            _save_test_results(bug_idx)
+            return bug_idx
+
+        try:
+            # a lost connection drops both inserts, they are replayed together
+            bug_idx = self.DB.run_transaction(_save)
+        except Exception as e:
+            LOGGER.error(f"Failed to save mutant {MUTANT.mutant_name}: {e}")
+            self.DB.rollback()
+            raise
+        LOGGER.debug(f"Saved mutant {MUTANT.mutant_name} as bug_idx {bug_idx}")
 
 
     def stop(self):
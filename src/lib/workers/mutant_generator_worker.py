@@ -25,6 +25,7 @@ class MutantGeneratorWorker(Worker):
         super().__init__(CONFIG)
         LOGGER.info("MutantGeneratorWorker initialized")
 
+    def prepare_for_task(self):
         self.version_mutant_mutants_dir = os.path.join(self.mutant_mutants_dir, self.CONFIG.ARGS.mutant)
         if not os.path.exists(self.version_mutant_mutants_dir):
             os.makedirs(self.version_mutant_mutants_dir, exist_ok=True)
@@ -64,8 +65,7 @@ class MutantGeneratorWorker(Worker):
             return
         
         # 3. Build the subject, if build fails, skip the mutant
-        execute_bash_script(self.SUBJECT.clean_script, self.SUBJECT.build_script_working_directory)
-        res = execute_bash_script(self.SUBJECT.build_script, self.SUBJECT.build_script_working_directory)
+        res = self.build_subject([MUTANT.target_file_path], self.SUBJECT.configure_no_cov_script, clean=True)
         if res != 0:
             LOGGER.error(f"Build failed after applying patch {MUTANT.patch_file}, skipping mutant")
             MUTANT.apply_patch(revert=True)
@@ -1,18 +1,51 @@
 import os
 import time
+import numpy as np
 
 from lib.workers.worker import Worker
 from lib.experiment_configs import ExperimentConfigs
 from lib.mutant import Mutant
+from lib.tc_prioritizer import TcPrioritizer
+from lib.coverage_matrix import CoverageMatrix
 
 from utils.command_utils import *
+from utils.mbfl_utils import SKIPPED_TRANSITION
+
+# MUTATION_TESTING_EARLY_EXIT modes: stop testing a mutant once the given transition is observed
+EARLY_EXIT_MODES = ["none", "first_transition", "first_f2p", "first_p2f"]
 
 
 class MutationTestingResultTester(Worker):
     def __init__(self, CONFIG: ExperimentConfigs):
         super().__init__(CONFIG)
+        # {bug_idx: ({tc_idx: row_idx}, CoverageMatrix)} of the current origin bug only,
+        # replaced when a task of another origin bug comes in
+        self.tc_coverage_cache = {}
+        self.PRIORITIZER = None
+        # (origin target file path, origin mutant) left applied for the next mutant mutant of the same origin bug
+        self.applied_origin = None
         LOGGER.info("MutationTestingResultTester initialized")
 
+    def _get_origin_key(self):
+        return (
+            os.path.join(self.core_dir, self.CONFIG.ARGS.origin_mutant_target_file),
+            self.CONFIG.ARGS.origin_mutant
+        )
+
+    def _revert_origin(self):
+        if self.applied_origin is not None:
+            self.SOURCE_SWAPPER.revert(self.applied_origin[0])
+            self.applied_origin = None
+
+    def verify_clean_state(self):
+        # tasks are scheduled by origin bug, the origin mutant stays applied until the next origin bug
+        if self.applied_origin is not None and self.applied_origin != self._get_origin_key():
+            self._revert_origin()
+        return super().verify_clean_state()
+
+    def get_retained_files(self) -> list:
+        return [self.applied_origin[0]] if self.applied_origin is not None else []
+
     def execute(self):
         """Execute the mutation testing result tester"""
         LOGGER.info("Executing MutationTestingResultTester")
@@ -37,27 +70,32 @@ class MutationTestingResultTester(Worker):
         MUTANT.set_bug_idx_with_specific_mutant_name_from_db(self.DB, self.CONFIG.ARGS.origin_mutant)
         MUTANT.set_relevant_tc_info_as_sorted_list_from_db(self.DB)
 
-        # 2. Apply patch of original mutant code
-        res = MUTANT.apply_patch_og(revert=False)
-        if not res:
-            LOGGER.error(f"Failed to apply ORIGIN patch {MUTANT.patch_file} to {MUTANT.target_file}, skipping mutant")
-            return
+        # 2. Apply patch of original mutant code, unless the previous task left it applied
+        if self.applied_origin != self._get_origin_key():
+            res = MUTANT.apply_patch_og(revert=False)
+            if not res:
+                LOGGER.error(f"Failed to apply ORIGIN patch {MUTANT.patch_file} to {MUTANT.target_file}, skipping mutant")
+                return
+            self.applied_origin = self._get_origin_key()
+        else:
+            LOGGER.debug(f"Origin mutant {self.CONFIG.ARGS.origin_mutant} is already applied")
 
         # 2. Apply patch to taget_file
         res = MUTANT.apply_patch(revert=False)
         if not res:
-            MUTANT.apply_patch_og(revert=True)
             LOGGER.error(f"Failed to apply patch {MUTANT.patch_file} to {MUTANT.target_file}, skipping mutant")
             return
         
         # 3. Build the subject, if build fails, skip the mutant
         build_start_time = time.time()
-        res = execute_bash_script(self.SUBJECT.build_script, self.SUBJECT.build_script_working_directory)
+        res = self.build_subject(
+            [MUTANT.target_file_path, MUTANT.origin_mutant_target_file_path],
+            self.SUBJECT.configure_no_cov_script
+        )
         build_time_duration = ((time.time() - build_start_time) * 1000)
         if res != 0:
             LOGGER.error(f"Build failed after applying patch {MUTANT.patch_file} to {MUTANT.target_file}, skipping mutant")
             MUTANT.apply_patch(revert=True)
-            MUTANT.apply_patch_og(revert=True)
             self.DB.update(
                 "cpp_mutation_info",
                 set_values={"build_result": False},
@@ -72,21 +110,32 @@ class MutationTestingResultTester(Worker):
         result_transition = ["0"] * len(MUTANT.tc_list)
         LOGGER.debug(f"FOUND {len(MUTANT.tc_list)} tc_list")
         # 4. Run the relevant test cases
-        relevant_tcs_cnt = 0
-        for tc_idx, tc_name, tc_result, relevant_status in MUTANT.tc_list:
-            if relevant_status == False:
-                continue
-            relevant_tcs_cnt += 1
+        relevant_tcs = [
+            (tc_idx, tc_name, tc_result)
+            for tc_idx, tc_name, tc_result, relevant_status in MUTANT.tc_list
+            if relevant_status != False
+        ]
+        relevant_tcs_cnt = len(relevant_tcs)
 
-            # 4.1 run the test case
-            res = MUTANT.run_test_with_testScript(os.path.join(self.testcases_dir, tc_name))
+        line_idx = self._get_mutant_line_idx(MUTANT)
 
-            # 4.2 check the result transition
-            if tc_result == "fail" and res == 0: # res == 0 means pass
-                result_transition[tc_idx] = "1"
-            elif tc_result == "pass" and res != 0: # res != 0 means fail
-                result_transition[tc_idx] = "1"
-        LOGGER.debug(f"EXECUTED {relevant_tcs_cnt} relevant tcs")
+        # tests not executing the mutated line keep "0" (no transition) without being run
+        if self.CONFIG.ENV.get("MUTATION_TESTING_COVERAGE_SELECTION", "false").lower() == "true":
+            covering_tc_idxs = self._get_covering_tc_idxs(MUTANT, line_idx, [tc[0] for tc in relevant_tcs])
+            if covering_tc_idxs is not None:
+                relevant_tcs = [tc for tc in relevant_tcs if tc[0] in covering_tc_idxs]
+                LOGGER.debug(f"SELECTED {len(relevant_tcs)} of {relevant_tcs_cnt} relevant tcs covering the mutated line")
+                relevant_tcs_cnt = len(relevant_tcs)
+
+        # order by expected information per second (execution time, kill history of the line)
+        if self.PRIORITIZER is None or self.PRIORITIZER.bug_idx != MUTANT.bug_idx:
+            self.PRIORITIZER = TcPrioritizer(self.DB, MUTANT.bug_idx)
+        self.PRIORITIZER.load_kill_history(line_idx)
+        relevant_tcs = self.PRIORITIZER.order(relevant_tcs)
+
+        # 4.1 run the test cases, tests left out by the early exit mode are marked as skipped
+        executed_tcs_cnt = self._run_relevant_tcs(MUTANT, relevant_tcs, result_transition)
+        LOGGER.debug(f"EXECUTED {executed_tcs_cnt} of {relevant_tcs_cnt} relevant tcs")
             
         # 5. Update the result transition in the database
         self.DB.update(
@@ -106,12 +155,134 @@ class MutationTestingResultTester(Worker):
         # Update usable status in DB
         self.update_status_column_in_db(MUTANT.bug_idx, "mbfl")
 
-        # REVERT after completion
+        # REVERT after completion, the origin mutant is kept for the next task
         MUTANT.apply_patch(revert=True)
-        MUTANT.apply_patch_og(revert=True)
 
 
+    def _get_mutant_line_idx(self, MUTANT: Mutant):
+        mutation_info = self.DB.read(
+            "cpp_mutation_info",
+            columns="line_idx",
+            conditions={
+                "bug_idx": MUTANT.bug_idx,
+                "mutant_idx": self.CONFIG.ARGS.mutant_id,
+                "mutant_filename": self.CONFIG.ARGS.mutant
+            }
+        )
+        if not mutation_info:
+            return None
+        return mutation_info[0][0]
+
+    def _get_covering_tc_idxs(self, MUTANT: Mutant, line_idx: int, tc_idxs: list):
+        """
+        Return the tc_idx set of the given test cases executing the mutated line,
+        or None if the line or the coverage of the origin bug is unknown.
+        """
+        if line_idx is None:
+            LOGGER.warning(f"Line of mutant {self.CONFIG.ARGS.mutant} is unknown, running all relevant tcs")
+            return None
+
+        if MUTANT.bug_idx not in self.tc_coverage_cache:
+            self.tc_coverage_cache = {MUTANT.bug_idx: self._read_tc_coverage(MUTANT.bug_idx)}
+        tcIdx2row, covMatrix = self.tc_coverage_cache[MUTANT.bug_idx]
+
+        row_idxs = [tcIdx2row.get(tc_idx) for tc_idx in tc_idxs]
+        if None in row_idxs or line_idx >= covMatrix.num_cols:
+            LOGGER.warning("Coverage of the test cases is missing, running all relevant tcs")
+            return None
+
+        covered = covMatrix.column_to_bool(line_idx)
+        return {tc_idx for tc_idx, row_idx in zip(tc_idxs, row_idxs) if covered[row_idx]}
+
+    def _read_tc_coverage(self, bug_idx: int):
+        """
+        Read the candidate line coverage of the test cases of the origin bug,
+        returns ({tc_idx: row_idx}, CoverageMatrix). Test cases without coverage have no row.
+        """
+        tc_coverage = self.DB.read(
+            "cpp_tc_info",
+            columns="tc_idx, bit_sequence_length, line_coverage_bits, line_coverage_bit_sequence",
+            conditions={"bug_idx": bug_idx},
+            special="AND tc_idx != -1 AND bit_sequence_length IS NOT NULL"
+        )
+        num_lines = tc_coverage[0][1] if tc_coverage else 0
+
+        tcIdx2row = {}
+        covMatrix = CoverageMatrix.zeros(len(tc_coverage), num_lines)
+        for row_idx, (tc_idx, bit_sequence_length, line_coverage_bits, line_coverage_bit_sequence) in enumerate(tc_coverage):
+            if bit_sequence_length != num_lines:
+                continue
+            if line_coverage_bits is not None:
+                covMatrix.packed[row_idx] = np.frombuffer(bytes(line_coverage_bits), dtype=np.uint8)
+            elif line_coverage_bit_sequence is not None:
+                # rows written before the packed coverage, "0" when there is no candidate line
+                covMatrix.packed[row_idx] = CoverageMatrix.from_bit_strings(
+                    [line_coverage_bit_sequence[:num_lines]], num_lines
+                ).packed[0]
+            else:
+                continue
+            tcIdx2row[tc_idx] = row_idx
+        return tcIdx2row, covMatrix
+
+    def _run_relevant_tcs(self, MUTANT: Mutant, relevant_tcs: list, result_transition: list) -> int:
+        """
+        Run the relevant test cases and fill result_transition ("1": transition, "0": none).
+        With MUTATION_TESTING_EARLY_EXIT or MUTATION_TESTING_TEST_BUDGET set, tests are run
+        in batches of test_execution_width and the remaining tests are marked SKIPPED_TRANSITION
+        once the criterion is met or the budget is used.
+        :return: Number of executed test cases
+        """
+        early_exit = self.CONFIG.ENV.get("MUTATION_TESTING_EARLY_EXIT", "none")
+        if early_exit not in EARLY_EXIT_MODES:
+            raise ValueError(f"Unknown MUTATION_TESTING_EARLY_EXIT mode: {early_exit}")
+        test_budget = int(self.CONFIG.ENV.get("MUTATION_TESTING_TEST_BUDGET", 0))
+        width = self.SUBJECT.test_execution_width
+
+        if early_exit == "none" and test_budget <= 0:
+            batch_size = max(len(relevant_tcs), 1)
+        else:
+            batch_size = width
+            # failing tests first when f2p decides the early exit, passing tests first for p2f,
+            # the (stable) sort keeps the prioritized order within each group
+            first_result = "pass" if early_exit == "first_p2f" else "fail"
+            relevant_tcs = sorted(relevant_tcs, key=lambda tc: tc[2] != first_result)
+
+        f2p, p2f, executed_tcs = 0, 0, 0
+        for start in range(0, len(relevant_tcs), batch_size):
+            stop_reached = (early_exit == "first_transition" and (f2p + p2f) > 0) \
+                or (early_exit == "first_f2p" and f2p > 0) \
+                or (early_exit == "first_p2f" and p2f > 0) \
+                or (test_budget > 0 and executed_tcs >= test_budget)
+            if stop_reached:
+                for tc_idx, _, _ in relevant_tcs[start:]:
+                    result_transition[tc_idx] = SKIPPED_TRANSITION
+                break
+
+            batch = relevant_tcs[start:start + batch_size]
+            if test_budget > 0:
+                batch = batch[:test_budget - executed_tcs]
+                for tc_idx, _, _ in relevant_tcs[start + len(batch):start + batch_size]:
+                    result_transition[tc_idx] = SKIPPED_TRANSITION
+
+            results = MUTANT.run_tests_with_testScripts(
+                [os.path.join(self.testcases_dir, tc_name) for _, tc_name, _ in batch],
+                width=width
+            )
+            executed_tcs += len(batch)
+
+            for (tc_idx, tc_name, tc_result), (res, _, _) in zip(batch, results):
+                # 4.2 check the result transition
+                if tc_result == "fail" and res == 0: # res == 0 means pass
+                    result_transition[tc_idx] = "1"
+                    f2p += 1
+                elif tc_result == "pass" and res != 0: # res != 0 means fail
+                    result_transition[tc_idx] = "1"
+                    p2f += 1
+
+        return executed_tcs
+
     def stop(self):
         """Stop the mutation testing result tester"""
         LOGGER.info("Stopping MutationTestingResultTester")
+        self._revert_origin()
         super().stop()
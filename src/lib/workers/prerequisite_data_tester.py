@@ -12,6 +12,7 @@ class PrerequisiteDataTester(Worker):
         super().__init__(CONFIG)
         LOGGER.info("PrerequisiteDataTester initialized")
 
+    def prepare_for_task(self):
         self.version_coverage_dir = os.path.join(self.coverage_dir, self.CONFIG.ARGS.mutant)
         if not os.path.exists(self.version_coverage_dir):
             os.makedirs(self.version_coverage_dir, exist_ok=True)
@@ -57,7 +58,7 @@ class PrerequisiteDataTester(Worker):
             return
         
         # 2. Build the subject, if build fails, skip the mutant
-        res = execute_bash_script(self.CONTEXT.SUBJECT.build_script, self.CONTEXT.SUBJECT.build_script_working_directory)
+        res = self.build_subject([MUTANT.target_file_path], self.SUBJECT.configure_yes_cov_script)
         if res != 0:
             LOGGER.warning(f"Build failed after applying patch {MUTANT.patch_file}, skipping mutant")
             MUTANT.apply_patch(revert=True)
@@ -5,6 +5,7 @@ import os
 from lib.workers.worker import Worker
 from lib.experiment_configs import ExperimentConfigs
 from lib.mutant import Mutant
+from lib.tc_prioritizer import TcPrioritizer
 
 from utils.command_utils import *
 
@@ -51,6 +52,9 @@ class UsableBugTester(Worker):
         MUTANT.set_tc_info_from_db(self.DB)
         # MUTANT.set_filtered_files_for_gcovr(self.CONTEXT)
 
+        # cheapest failing tests first, the mutant is rejected at the first unexpected result
+        MUTANT.tc_info["fail"] = TcPrioritizer(self.DB, MUTANT.bug_idx).order(MUTANT.tc_info["fail"])
+
         # 2. Apply patch to taget_file
         res = MUTANT.apply_patch(revert=False)
         if not res:
@@ -58,7 +62,7 @@ class UsableBugTester(Worker):
             return
 
         # 3. Build the subject, if build fails, skip the mutant
-        res = execute_bash_script(self.SUBJECT.build_script, self.SUBJECT.build_script_working_directory)
+        res = self.build_subject([MUTANT.target_file_path], self.SUBJECT.configure_yes_cov_script)
         if res != 0:
             LOGGER.warning(f"Build failed after applying patch {MUTANT.patch_file}, skipping mutant")
             MUTANT.apply_patch(revert=True)
@@ -8,6 +8,9 @@ from lib.factories.file_manager_factory import FileManagerFactory
 from lib.database import CRUD
 from lib.mutant import Mutant
 from lib.worker_context import WorkerContext
+from lib.build_cache import BuildCache, DEFAULT_MAX_MB
+from lib.incremental_builder import IncrementalBuilder
+from lib.source_swapper import SourceSwapper
 
 from utils.command_utils import *
 
@@ -28,8 +31,17 @@ class Worker(ABC):
         # Set up all directories
         self._set_directories()
 
+        # mutants are applied by swapping whole files, original contents are kept for the worker's life
+        self.SOURCE_SWAPPER = SourceSwapper(
+            pristine_resolver=self.get_pristine_file_path,
+            journal_file=os.path.join(self.core_dir, "swapped_files.journal")
+        )
+
         # Create context for executors with updated paths
         self.CONTEXT = self._create_context()
+
+        # Set up the directories of the task given in CONFIG.ARGS
+        self.prepare_for_task()
     
     def _initialize_paths(self):
         """Initialize all directory and file paths"""
@@ -134,6 +146,18 @@ class Worker(ABC):
         self.coverage_dir = os.path.join(self.core_dir, "coverage")
         LOGGER.debug(f"Coverage directory: {self.coverage_dir}")
 
+        # build cache shared by the cores of this machine
+        self.build_cache_dir = os.path.join(self.working_env_dir, self.CONFIG.ARGS.machine, "build_cache")
+        self.BUILD_CACHE = BuildCache(
+            self.SUBJECT, self.core_dir, self.build_cache_dir,
+            max_bytes=int(self.CONFIG.ENV.get("BUILD_CACHE_MAX_MB", DEFAULT_MAX_MB)) * 1024 * 1024,
+            # every (origin mutant, mutant mutant) source state of stage05 is built once
+            store_entries=self.CONFIG.STAGE != "stage05"
+        )
+        LOGGER.debug(f"Build cache directory: {self.build_cache_dir} (enabled: {self.BUILD_CACHE.enabled})")
+        self.INCREMENTAL_BUILDER = IncrementalBuilder(self.SUBJECT)
+        LOGGER.debug(f"Incremental build enabled: {self.INCREMENTAL_BUILDER.enabled}")
+
         # line2function out dir
         self.line2function_dir = os.path.join(self.out_dir, "line2function")
         if not os.path.exists(self.line2function_dir):
@@ -154,6 +178,37 @@ class Worker(ABC):
         )
         LOGGER.debug(f"Updated bug_idx {bug_idx} to status {col_key} in DB")
 
+    def build_subject(self, source_files: list, configure_script: str, clean: bool = False) -> int:
+        """
+        Build the subject after patching source_files, restoring from the build cache when possible.
+        With incremental_build, only the patched translation units are recompiled and relinked
+        (clean is then not needed), otherwise the clean and build scripts are run.
+        """
+        builder = self.INCREMENTAL_BUILDER.build if self.INCREMENTAL_BUILDER.enabled else None
+        return self.BUILD_CACHE.build(source_files, configure_script, clean=clean, builder=builder)
+
+    def get_pristine_file_path(self, file_path: str):
+        """Path of file_path in the machine's subject repository, from which the core was provisioned"""
+        rel_path = os.path.relpath(file_path, self.core_dir)
+        if rel_path.startswith(".."):
+            return None
+        return os.path.join(self.working_dir, rel_path)
+
+    def get_retained_files(self) -> list:
+        """Target files whose applied mutant is deliberately kept from the previous task"""
+        return []
+
+    def verify_clean_state(self):
+        """Restore the target files of previous tasks that are not in their original state"""
+        restored = self.SOURCE_SWAPPER.restore_all(keep=self.get_retained_files())
+        for file_path in restored:
+            LOGGER.warning(f"{file_path} was not reverted by a previous task, restored from snapshot")
+        return len(restored) == 0
+
+    def prepare_for_task(self):
+        """Set up per-task state from CONFIG.ARGS, called again by the worker daemon for every new task"""
+        pass
+
     @abstractmethod
     def execute(self):
         """Execute the worker's main functionality"""
@@ -205,9 +260,13 @@ class Worker(ABC):
             origin_mutant_target_file_path = origin_mutant_target_file_path,
             origin_mutant_file = origin_mutant_file,
             origin_mutant_file_path = origin_mutant_file_path,
-            origin_patch_file = origin_patch_file
+            origin_patch_file = origin_patch_file,
+            SWAPPER = self.SOURCE_SWAPPER
         )
 
+        # mutant files are complete copies of their target files, no patch files are needed to swap them
+        if MUTANT.SWAPPER is not None:
+            return MUTANT
 
         if self.CONFIG.ARGS.worker_type == "mutation_testing_result_tester":
             res = MUTANT.make_patch_file_og()
@@ -8,6 +8,7 @@ from lib.factories.engine_factory import EngineFactory
 from lib.factories.worker_factory import WorkerFactory
 from lib.engines.engine import Engine
 from lib.workers.worker import Worker
+from lib.worker_daemon import WorkerDaemon
 
 from utils.file_utils import *
 
@@ -25,6 +26,22 @@ def configurate_directories(CONFIG: ExperimentConfigs):
     CONFIG.set_machine_status()
     CONFIG.set_stage()
 
+def get_worker_log_file(CONFIG: ExperimentConfigs) -> str:
+    log_dir = os.path.join(
+        CONFIG.ENV["ROOT_DIR"], 
+        "logs",
+        CONFIG.ARGS.experiment_label,
+        CONFIG.ARGS.subject,
+        "workers",
+        CONFIG.ARGS.worker_type,
+    )
+    make_directory(log_dir)
+    if CONFIG.ARGS.worker_daemon and not CONFIG.ARGS.mutant:
+        return os.path.join(log_dir, f"{CONFIG.ARGS.machine}--core{CONFIG.ARGS.core_idx}--daemon.log")
+    if CONFIG.ARGS.worker_type == "mutation_testing_result_tester":
+        return os.path.join(log_dir, f"{CONFIG.ARGS.machine}--core{CONFIG.ARGS.core_idx}--{CONFIG.ARGS.origin_mutant}--{CONFIG.ARGS.mutant}.log")
+    return os.path.join(log_dir, f"{CONFIG.ARGS.machine}--core{CONFIG.ARGS.core_idx}--{CONFIG.ARGS.mutant}.log")
+
 def configurate_logger(CONFIG: ExperimentConfigs):
     if CONFIG.ARGS.engine_type:
         if CONFIG.ARGS.engine_type == "dataset_postprocessor":
@@ -45,19 +62,7 @@ def configurate_logger(CONFIG: ExperimentConfigs):
             make_directory(log_dir)
             main_log_file = os.path.join(log_dir, f"{CONFIG.ARGS.engine_type}-main.log")
     else:
-        log_dir = os.path.join(
-            CONFIG.ENV["ROOT_DIR"], 
-            "logs",
-            CONFIG.ARGS.experiment_label,
-            CONFIG.ARGS.subject,
-            "workers",
-            CONFIG.ARGS.worker_type,
-        )
-        make_directory(log_dir)
-        if CONFIG.ARGS.worker_type == "mutation_testing_result_tester":
-            main_log_file = os.path.join(log_dir, f"{CONFIG.ARGS.machine}--core{CONFIG.ARGS.core_idx}--{CONFIG.ARGS.origin_mutant}--{CONFIG.ARGS.mutant}.log")
-        else:
-            main_log_file = os.path.join(log_dir, f"{CONFIG.ARGS.machine}--core{CONFIG.ARGS.core_idx}--{CONFIG.ARGS.mutant}.log")
+        main_log_file = get_worker_log_file(CONFIG)
 
     if CONFIG.ARGS.debug:
         log_level = logging.DEBUG
@@ -119,6 +124,15 @@ def main():
         except Exception as e:
             logging.error(f"Error running engine: {e}")
     
+    # Handle worker daemon execution
+    if CONFIG.ARGS.worker_type and CONFIG.ARGS.worker_daemon:
+        try:
+            daemon = WorkerDaemon(CONFIG, log_file_resolver=get_worker_log_file)
+            daemon.serve()
+        except Exception as e:
+            logging.error(f"Error running worker daemon: {e}")
+        return
+
     # Handle worker execution
     if CONFIG.ARGS.worker_type:
         try:
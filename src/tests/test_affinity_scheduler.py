@@ -0,0 +1,43 @@
+from lib.affinity_scheduler import *
+
+
+def drain(scheduler, worker):
+    tasks = []
+    while True:
+        task = scheduler.get(worker)
+        if task is None:
+            return tasks
+        tasks.append(task)
+
+
+def test_groups_run_back_to_back_on_one_worker():
+    # (mutant, origin bug)
+    tasks = [(f"m{idx}", idx % 3) for idx in range(9)] + [("m9", 0)]
+    scheduler = AffinityScheduler(tasks, ["core0", "core1"], key=lambda task: task[1])
+    assert scheduler.remaining() == 10
+
+    # the largest group goes first, to the least loaded worker
+    first = scheduler.get("core0")
+    assert first[1] == 0
+    group = [first] + [scheduler.get("core0") for _ in range(3)]
+    assert [task[1] for task in group] == [0, 0, 0, 0]
+
+    core1_tasks = drain(scheduler, "core1")
+    core0_tasks = drain(scheduler, "core0")
+    assert sorted(group + core0_tasks + core1_tasks) == sorted(tasks)
+    assert scheduler.remaining() == 0
+    # each worker sees every origin bug as one contiguous run
+    for worker_tasks in [core0_tasks, core1_tasks]:
+        bugs = [task[1] for task in worker_tasks]
+        assert bugs == sorted(bugs, key=bugs.index)
+
+
+def test_idle_worker_steals_whole_groups():
+    tasks = [(f"m{idx}", idx % 4) for idx in range(8)]
+    scheduler = AffinityScheduler(tasks, ["core0", "core1"], key=lambda task: task[1])
+
+    # core1 never asks, core0 takes its own groups then steals core1's groups
+    core0_tasks = drain(scheduler, "core0")
+    assert sorted(core0_tasks) == sorted(tasks)
+    assert scheduler.steal_cnt == 2
+    assert scheduler.get("core1") is None
@@ -30,4 +30,51 @@ def test_parse_bbcov_file():
     assert 35 in line_cov_dict["crown/tc_generator/src/run_crown/atomic_expression.cc"]
     target = line_cov_dict["crown/tc_generator/src/run_crown/atomic_expression.cc"][53]
     assert target["covered"] == 0
-    assert target["function"] == "crown::AtomicExpr::Equals(crown::SymbolicExpr const&) const"
\ No newline at end of file
+    assert target["function"] == "crown::AtomicExpr::Equals(crown::SymbolicExpr const&) const"
+
+
+def test_read_bbcov_line_cov(tmp_path, monkeypatch):
+    cwd = os.getcwd()
+    bbcov_file_path = os.path.join(cwd, "tests/files/TC1.bbcd.line")
+
+    # stand-in for $BBCOV_LINE_COV, decoding its argument in-process or from the command line
+    script = tmp_path / "bbcov_line_cov.py"
+    script.write_text(
+        "import sys\n"
+        "def iter_line_cov(bbcov_file):\n"
+        "    with open(bbcov_file) as f:\n"
+        "        yield from f\n"
+        "if __name__ == '__main__':\n"
+        "    for line in iter_line_cov(sys.argv[1]):\n"
+        "        print(line, end='')\n"
+    )
+    cli_script = tmp_path / "bbcov_line_cov_cli.py"
+    cli_script.write_text(
+        "import sys\n"
+        "with open(sys.argv[1]) as f:\n"
+        "    for line in f:\n"
+        "        print(line, end='')\n"
+    )
+
+    target_files = [
+        "crown/tc_generator/src/run_crown/atomic_expression.cc",
+        "run_crown/z3_solver.cc",
+        "src/run_crown/z3_solver.cc",
+    ]
+    with open(bbcov_file_path, "r") as f:
+        expected = parse_bbcov_line_cov_output(target_files, f.readlines())
+
+    with monkeypatch.context() as patch:
+        # no interpreter is started per test
+        patch.setattr(sp, "Popen", None)
+        line_cov_dict = read_bbcov_line_cov(target_files, bbcov_file_path, script_path=str(script))
+    assert line_cov_dict == expected
+    assert load_bbcov_line_cov_decoder(str(script)) is load_bbcov_line_cov_decoder(str(script))
+    # scripts without a decoder run in their own process
+    assert load_bbcov_line_cov_decoder(str(cli_script)) is None
+    assert read_bbcov_line_cov(target_files, bbcov_file_path, script_path=str(cli_script)) == expected
+    assert "src/run_crown/z3_solver.cc" not in line_cov_dict
+    assert line_cov_dict["run_crown/z3_solver.cc"][145]["covered"] == 1
+
+    records = list(iter_bbcov_line_records(target_files, ["File /a/run_crown/z3_solver.cc", "F foo()", "L 3 2"]))
+    assert records == [("run_crown/z3_solver.cc", "foo()", 3, 2)]
@@ -0,0 +1,100 @@
+import os
+from types import SimpleNamespace
+
+from lib.build_cache import *
+
+
+def make_subject(core_dir):
+    work_dir = os.path.join(core_dir, "subject")
+    os.makedirs(os.path.join(work_dir, "src"))
+    with open(os.path.join(work_dir, "src", "a.c"), "w") as f:
+        f.write("int a = 0;\n")
+    # the build copies the source into the artifact and counts its invocations
+    with open(os.path.join(work_dir, "build_script.sh"), "w") as f:
+        f.write("mkdir -p build && cp src/a.c build/a.o && echo x >> ../build_count\n")
+    with open(os.path.join(work_dir, "clean_script.sh"), "w") as f:
+        f.write("rm -rf build\n")
+    with open(os.path.join(work_dir, "configure_no_cov_script.sh"), "w") as f:
+        f.write("true\n")
+    with open(os.path.join(work_dir, "configurations.json"), "w") as f:
+        f.write("{}\n")
+
+    return SimpleNamespace(
+        subject_configs={"build_cache_artifacts": ["subject/build"]},
+        configurations_json=os.path.join(work_dir, "configurations.json"),
+        configure_no_cov_script=os.path.join(work_dir, "configure_no_cov_script.sh"),
+        build_script=os.path.join(work_dir, "build_script.sh"),
+        clean_script=os.path.join(work_dir, "clean_script.sh"),
+        build_script_working_directory=work_dir,
+    )
+
+
+def build_count(core_dir):
+    with open(os.path.join(core_dir, "build_count")) as f:
+        return len(f.readlines())
+
+
+def test_build_cache_restores_identical_source_state(tmp_path):
+    cache_dir = str(tmp_path / "build_cache")
+    cores = [str(tmp_path / "core0"), str(tmp_path / "core1")]
+    subjects = [make_subject(core_dir) for core_dir in cores]
+    caches = [BuildCache(subject, core_dir, cache_dir) for subject, core_dir in zip(subjects, cores)]
+    sources = [os.path.join(core_dir, "subject", "src", "a.c") for core_dir in cores]
+
+    assert caches[0].build([sources[0]], subjects[0].configure_no_cov_script) == 0
+    assert build_count(cores[0]) == 1
+
+    # same source state on another core of the machine is restored, not rebuilt
+    assert caches[1].build([sources[1]], subjects[1].configure_no_cov_script, clean=True) == 0
+    assert not os.path.exists(os.path.join(cores[1], "build_count"))
+    with open(os.path.join(cores[1], "subject", "build", "a.o")) as f:
+        assert f.read() == "int a = 0;\n"
+
+    # a patched source is a different entry
+    with open(sources[0], "w") as f:
+        f.write("int a = 1;\n")
+    key = caches[0].make_key([sources[0]], subjects[0].configure_no_cov_script)
+    assert not caches[0].contains(key)
+    assert caches[0].build([sources[0]], subjects[0].configure_no_cov_script) == 0
+    assert build_count(cores[0]) == 2
+    assert caches[0].contains(key)
+
+
+def test_build_cache_disabled_without_artifacts(tmp_path):
+    core_dir = str(tmp_path / "core0")
+    subject = make_subject(core_dir)
+    subject.subject_configs = {}
+    cache = BuildCache(subject, core_dir, str(tmp_path / "build_cache"))
+    source = os.path.join(core_dir, "subject", "src", "a.c")
+
+    assert not cache.enabled
+    assert cache.build([source], subject.configure_no_cov_script) == 0
+    assert cache.build([source], subject.configure_no_cov_script) == 0
+    assert build_count(core_dir) == 2
+    assert not os.path.exists(str(tmp_path / "build_cache"))
+
+
+def test_build_cache_evicts_least_recently_used(tmp_path):
+    core_dir = str(tmp_path / "core0")
+    subject = make_subject(core_dir)
+    source = os.path.join(core_dir, "subject", "src", "a.c")
+    # room for two entries of the 11 bytes artifact
+    cache = BuildCache(subject, core_dir, str(tmp_path / "build_cache"), max_bytes=25)
+
+    keys = []
+    for value in range(3):
+        with open(source, "w") as f:
+            f.write(f"int a = {value};\n")
+        keys.append(cache.make_key([source], subject.configure_no_cov_script))
+        assert cache.build([source], subject.configure_no_cov_script) == 0
+        if value == 1:
+            # restoring the first entry makes the second the least recently used
+            os.utime(cache.entry_dir(keys[0]), (0, 0))
+            os.utime(cache.entry_dir(keys[1]), (0, 0))
+            assert cache.restore(keys[0])
+    assert [cache.contains(key) for key in keys] == [True, False, True]
+
+    # lookups only, nothing stored
+    cache = BuildCache(subject, core_dir, str(tmp_path / "lookup_cache"), store_entries=False)
+    assert cache.build([source], subject.configure_no_cov_script) == 0
+    assert not cache.contains(keys[2]) and build_count(core_dir) == 4
@@ -0,0 +1,52 @@
+import pytest
+
+pytest.importorskip("psycopg2")  # lib.cost_model imports the database layer
+
+from lib.cost_model import *
+from lib.affinity_scheduler import AffinityScheduler
+
+class FakeDB:
+    def __init__(self, builds, tc_info, mutation_info):
+        # bug_idx -> rows
+        self.tables = {"builds": builds, "cpp_tc_info": tc_info, "cpp_mutation_info": mutation_info}
+
+    def read(self, table_name, columns="*", conditions={}, special=""):
+        if table_name == "cpp_mutation_info" and columns == "build_time_duration":
+            table_name = "builds"
+        return self.tables[table_name].get(conditions["bug_idx"], [])
+
+def test_estimate_from_recorded_builds_and_relevant_tests():
+    DB = FakeDB(
+        builds={1: [(1000.0,), (3000.0,)]},
+        tc_info={1: [(100.0, True), (50.0, False), (None, None)], 2: [(10.0, True)]},
+        mutation_info={1: [(0, 500.0, True), (1, None, False)]}
+    )
+    COST_MODEL = CostModel(DB)
+    COST_MODEL.load([1, 2, 1])
+
+    # mean build 2000, relevant tests 100 + default 1000, overhead per relevant test
+    assert COST_MODEL.estimate(1) == 2000.0 + 1100.0 + 2 * TEST_OVERHEAD_MS
+    # bug 2 has no recorded build, the mean over the loaded bugs is used
+    assert COST_MODEL.estimate(2) == 2000.0 + 10.0 + TEST_OVERHEAD_MS
+    assert COST_MODEL.estimate_task(("a.c", "a.c", None, None, 2, 7)) == COST_MODEL.estimate(2)
+
+    # a failed build costs its build only
+    assert COST_MODEL.load_recorded_tasks([1]) == [
+        (1, 0, 500.0 + 1100.0 + 2 * TEST_OVERHEAD_MS),
+        (1, 1, 2000.0),
+    ]
+
+def test_longest_first_shortens_simulated_makespan():
+    # (bug_idx, mutant_idx, cost): the long task comes last in the queue
+    tasks = [(bug_idx, 0, 1.0) for bug_idx in range(6)] + [(6, 0, 6.0)]
+    workers = [("faster0", 0, "~"), ("faster1", 0, "~")]
+    cost = lambda task: task[2]
+
+    assert simulate_fifo_makespan(tasks, workers, cost) == 9.0
+    scheduler = AffinityScheduler(tasks, workers, key=lambda task: task[0], cost=cost)
+    assert simulate_makespan(scheduler.get, workers, cost) == 6.0
+
+    # a twice as fast machine takes twice the work
+    speeds = {("faster0", 0, "~"): 2.0}
+    scheduler = AffinityScheduler(tasks, workers, key=lambda task: task[0], cost=cost, speeds=speeds)
+    assert simulate_makespan(scheduler.get, workers, cost, speeds) == 4.0
@@ -0,0 +1,68 @@
+import numpy as np
+
+from lib.coverage_matrix import *
+
+BIT_STRINGS = [
+    "1100000001",
+    "0010000000",
+    "0000000000",
+]
+
+def test_bit_string_round_trip():
+    cov = CoverageMatrix.from_bit_strings(BIT_STRINGS)
+    assert cov.shape == (3, 10)
+    assert cov.to_bit_strings() == BIT_STRINGS
+
+    # packed rows must decode to the same values as the int("...", 2) representation
+    assert int.from_bytes(cov.row_to_bytes(0), "big") >> 6 == int(BIT_STRINGS[0], 2)
+
+def test_bytes_round_trip():
+    cov = CoverageMatrix.from_bit_strings(BIT_STRINGS)
+    restored = CoverageMatrix.from_bytes_list(cov.to_bytes_list(), cov.num_cols)
+    assert restored.to_bit_strings() == BIT_STRINGS
+    assert len(cov.row_to_bytes(0)) == 2
+
+def test_column_to_bool():
+    cov = CoverageMatrix.from_bit_strings(BIT_STRINGS)
+    assert cov.column_to_bool(0).tolist() == [True, False, False]
+    assert cov.column_to_bool(2).tolist() == [False, True, False]
+    assert cov.column_to_bool(9).tolist() == [True, False, False]
+
+def test_from_rows_and_transpose():
+    packed = CoverageMatrix.from_bit_strings(BIT_STRINGS)
+    # packed rows, legacy bit strings ("0" without lines) and missing rows
+    cov = CoverageMatrix.from_rows([packed.row_to_bytes(0), BIT_STRINGS[1], None], 10)
+    assert cov.to_bit_strings() == [BIT_STRINGS[0], BIT_STRINGS[1], "0" * 10]
+    assert CoverageMatrix.from_rows(["0"], 0).shape == (1, 0)
+
+    rng = np.random.default_rng(0)
+    dense = rng.random((1100, 13)) < 0.3
+    transposed = CoverageMatrix.from_bool(dense).transpose()
+    assert transposed.shape == (13, 1100)
+    assert np.array_equal(transposed.to_bool(), dense.T)
+
+def test_union_intersection_popcount():
+    cov = CoverageMatrix.from_bit_strings(BIT_STRINGS)
+    assert "".join("1" if bit else "0" for bit in unpack_mask(cov.union(), 10)) == "1110000001"
+    assert mask_popcount(cov.union()) == 4
+    assert mask_popcount(cov.intersection()) == 0
+    assert cov.popcount().tolist() == [3, 1, 0]
+
+def test_intersects_and_select():
+    cov = CoverageMatrix.from_bit_strings(BIT_STRINGS)
+    fail_mask = CoverageMatrix.from_bit_strings(["0000000001"]).union()
+    assert cov.intersects(fail_mask).tolist() == [True, False, False]
+
+    selected = cov.select_columns([0, 2, 9])
+    assert selected.to_bit_strings() == ["101", "010", "000"]
+    assert cov.select_rows([1]).to_bit_strings() == ["0010000000"]
+
+def test_column_counts():
+    rng = np.random.default_rng(0)
+    dense = rng.random((1100, 37)) < 0.3
+    cov = CoverageMatrix.from_bool(dense)
+    weights = rng.integers(0, 2, size=1100)
+
+    assert np.array_equal(cov.to_bool(), dense)
+    assert np.array_equal(cov.column_counts(), dense.sum(axis=0))
+    assert np.array_equal(cov.column_counts(weights), weights @ dense)
@@ -0,0 +1,157 @@
+import pytest
+
+psycopg2 = pytest.importorskip("psycopg2")
+
+import psycopg2.extras
+
+from lib.database import *
+
+
+class FakeCursor:
+    def __init__(self, connection):
+        self.connection = connection
+        self.returned = None
+
+    def execute(self, query, args):
+        self.connection.run(query, args)
+        self.returned = (len(self.connection.statements),)
+
+    def fetchone(self):
+        return self.returned
+
+    def fetchall(self):
+        return [self.returned]
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    """Connection whose statements fail with OperationalError while `broken`"""
+    def __init__(self, broken=0):
+        self.broken = broken
+        self.statements = []
+        self.committed = []
+        self.rollback_cnt = 0
+
+    def run(self, query, args):
+        if self.broken:
+            self.broken -= 1
+            raise psycopg2.OperationalError("server closed the connection unexpectedly")
+        self.statements.append((query, args))
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def commit(self):
+        self.committed.extend(self.statements)
+        self.statements = []
+
+    def rollback(self):
+        self.rollback_cnt += 1
+        self.statements = []
+
+    def close(self):
+        pass
+
+
+class FakePool:
+    def __init__(self, connections):
+        self.connections = list(connections)
+        self.used = []
+
+    def getconn(self):
+        self.used.append(self.connections.pop(0))
+        return self.used[-1]
+
+    def putconn(self, connection, close=False):
+        pass
+
+
+@pytest.fixture(autouse=True)
+def fake_execute_values(monkeypatch):
+    def execute_values(cursor, query, rows, page_size=100, fetch=False):
+        cursor.connection.run(query, rows)
+        return [] if fetch else None
+    monkeypatch.setattr(psycopg2.extras, "execute_values", execute_values)
+
+
+def make_crud(*connections):
+    pool = FakePool(connections)
+    return CRUD("localhost", 5432, "user", "password", "db", pool=pool), pool
+
+
+def test_insert_returning_and_bulk_writes():
+    DB, pool = make_crud(FakeConnection())
+    connection = pool.used[0]
+
+    assert DB.insert("cpp_bug_info", "subject, version", ["libxml2", "a.MUT1.c"], returning="bug_idx") == 1
+    assert connection.committed[0] == ("INSERT INTO cpp_bug_info (subject, version) VALUES (%s, %s) RETURNING bug_idx", ["libxml2", "a.MUT1.c"])
+
+    DB.bulk_insert("cpp_tc_info", "bug_idx, tc_idx", [[1, 0], [1, 1]])
+    assert connection.committed[1] == ("INSERT INTO cpp_tc_info (bug_idx, tc_idx) VALUES %s", [[1, 0], [1, 1]])
+
+    DB.bulk_update("cpp_tc_info", ["relevant_tcs"], ["bug_idx", "tc_idx"], [[1, 0, True]])
+    assert connection.committed[2] == (
+        "UPDATE cpp_tc_info SET relevant_tcs = v.relevant_tcs FROM (VALUES %s) AS v (bug_idx, tc_idx, relevant_tcs) "
+        "WHERE cpp_tc_info.bug_idx = v.bug_idx AND cpp_tc_info.tc_idx = v.tc_idx",
+        [[1, 0, True]]
+    )
+
+    # empty batches do not reach the database
+    DB.bulk_insert("cpp_tc_info", "bug_idx, tc_idx", [])
+    DB.bulk_update("cpp_tc_info", ["relevant_tcs"], ["bug_idx", "tc_idx"], [])
+    assert len(connection.committed) == 3
+    assert not DB.pending_writes
+
+
+def test_lost_connection_inside_transaction_is_not_retried():
+    DB, pool = make_crud(FakeConnection(), FakeConnection())
+    first = pool.used[0]
+
+    DB.insert("cpp_bug_info", "version", ["a.MUT1.c"], returning="bug_idx", commit=False)
+    first.broken = 1
+    with pytest.raises(TransactionLostError):
+        DB.bulk_insert("cpp_tc_info", "bug_idx, tc_idx", [[1, 0]], commit=False)
+
+    # the insert was lost with the connection and the bulk insert not replayed alone
+    second = pool.used[1]
+    assert first.committed == [] and second.statements == []
+    assert not DB.pending_writes
+
+
+def test_run_transaction_replays_the_whole_unit():
+    DB, pool = make_crud(FakeConnection(), FakeConnection())
+    pool.used[0].broken = 0
+
+    def _save():
+        bug_idx = DB.insert("cpp_bug_info", "version", ["a.MUT1.c"], returning="bug_idx", commit=False)
+        if len(pool.used) == 1:
+            pool.used[0].broken = 1
+        DB.bulk_insert("cpp_tc_info", "bug_idx, tc_idx", [[bug_idx, 0]], commit=False)
+        return bug_idx
+
+    assert DB.run_transaction(_save, delay=0) == 1
+    first, second = pool.used
+    assert first.committed == []
+    assert [query.split(" (")[0] for query, _ in second.committed] == [
+        "INSERT INTO cpp_bug_info",
+        "INSERT INTO cpp_tc_info"
+    ]
+    assert second.committed[1][1] == [[1, 0]]
+
+
+def test_failed_unit_is_rolled_back():
+    DB, pool = make_crud(FakeConnection())
+    connection = pool.used[0]
+
+    def _save():
+        DB.insert("cpp_bug_info", "version", ["a.MUT1.c"], returning="bug_idx", commit=False)
+        raise ValueError("no test results")
+
+    with pytest.raises(ValueError):
+        DB.run_transaction(_save)
+    DB.rollback()
+    assert connection.rollback_cnt == 1
+    assert connection.committed == [] and connection.statements == []
+    assert not DB.pending_writes
@@ -0,0 +1,60 @@
+import math
+import pickle
+
+from lib.feature_store import *
+from utils.postprocessor_utils import normalize_data, get_bid_data_files, SBFL_FORMULA, MBFL_FORMULA
+
+ENV = {"tcs_reduction": "All", "target_lines": [100], "mutation_cnt": [1, 10]}
+
+def make_lineIdx2lineData(num_lines=6):
+    lineIdx2lineData = {}
+    for line_idx in range(num_lines):
+        line_data = {
+            "file": f"src/file{line_idx % 2}.cpp", "function": "foo()",
+            "lineno": 10 + line_idx, "is_buggy_line": line_idx == 2,
+            "st_relevance": 0.5 ** (line_idx + 1), "st_distance": None if line_idx % 2 else line_idx,
+            "st_relevance_linear": 0.25,
+        }
+        for formula in SBFL_FORMULA:
+            line_data[formula] = 0.125 * line_idx
+            line_data[f"{formula}_rank"] = num_lines - line_idx
+        for mut_cnt in ENV["mutation_cnt"]:
+            for formula in MBFL_FORMULA:
+                key = f"lineCnt100_mutCnt{mut_cnt}_tcsAll_result_transition_final_{formula}_score"
+                line_data[key] = -10.0
+                line_data[f"{key}_rank"] = line_idx + 1
+        lineIdx2lineData[line_idx] = line_data
+    return lineIdx2lineData
+
+def test_round_trip(tmp_path):
+    lineIdx2lineData = make_lineIdx2lineData()
+    path = str(tmp_path / "bug1--a.MUT1.cpp--lineIdx2lineData")
+    FeatureStore.from_lineIdx2lineData(lineIdx2lineData).save(path)
+
+    assert FeatureStore.exists(path)
+    store = FeatureStore.load(path)
+    assert isinstance(store.values, np.memmap)
+    assert store.values.dtype == np.float32
+    assert store.to_lineIdx2lineData() == lineIdx2lineData
+
+def test_normalize_matches_legacy_pickle(tmp_path):
+    lineIdx2lineData = make_lineIdx2lineData()
+    FeatureStore.from_lineIdx2lineData(lineIdx2lineData).save(str(tmp_path / "bug1--a.MUT1.cpp--lineIdx2lineData"))
+    with open(tmp_path / "bug2--a.MUT2.cpp--lineIdx2lineData.pkl", 'wb') as f:
+        pickle.dump(lineIdx2lineData, f)
+    with open(tmp_path / "bug1--a.MUT1.cpp--lineIdx2lineData.pkl", 'wb') as f:
+        pickle.dump(lineIdx2lineData, f)
+
+    assert get_bid_data_files(str(tmp_path)) == [
+        "bug1--a.MUT1.cpp--lineIdx2lineData.json",
+        "bug2--a.MUT2.cpp--lineIdx2lineData.pkl",
+    ]
+
+    from_store = normalize_data(str(tmp_path / "bug1--a.MUT1.cpp--lineIdx2lineData.json"), ENV)
+    from_pkl = normalize_data(str(tmp_path / "bug2--a.MUT2.cpp--lineIdx2lineData.pkl"), ENV)
+    for line_idx, line_data in from_store.items():
+        for key, value in line_data.items():
+            if isinstance(value, float):
+                assert math.isclose(value, from_pkl[line_idx][key], rel_tol=1e-6)
+            else:
+                assert value == from_pkl[line_idx][key]
@@ -32,3 +32,28 @@ def test_copy_specific_directory_from_remote():
         f"{machine}:{src}", f"{dest}"
     ]
     sp.run(cmd)
+
+def test_provision_directory(tmp_path):
+    src = tmp_path / "subject"
+    (src / "src").mkdir(parents=True)
+    (src / "testcases").mkdir()
+    (src / "src" / "a.c").write_text("int a = 0;\n")
+    (src / "testcases" / "TC1.sh").write_text("exit 0\n")
+
+    for core_idx in range(2):
+        dest = tmp_path / f"core{core_idx}" / "subject"
+        counts = provision_directory(str(src), str(dest), read_only_paths=["testcases"])
+        assert sum(counts.values()) == 2
+        assert (dest / "src" / "a.c").read_text() == "int a = 0;\n"
+        assert (dest / "testcases" / "TC1.sh").read_text() == "exit 0\n"
+
+        # mutable files never share their inode with the source
+        assert not os.path.samefile(src / "src" / "a.c", dest / "src" / "a.c")
+        if counts["reflink"] == 0:
+            assert os.path.samefile(src / "testcases" / "TC1.sh", dest / "testcases" / "TC1.sh")
+
+    # provisioning again keeps the hardlinks and overwrites modified copies
+    (tmp_path / "core0" / "subject" / "src" / "a.c").write_text("int a = 1;\n")
+    provision_directory(str(src), str(tmp_path / "core0" / "subject"), read_only_paths=["testcases"])
+    assert (tmp_path / "core0" / "subject" / "src" / "a.c").read_text() == "int a = 0;\n"
+    assert (src / "src" / "a.c").read_text() == "int a = 0;\n"
@@ -0,0 +1,59 @@
+import os
+import json
+from types import SimpleNamespace
+
+from lib.incremental_builder import *
+
+
+def make_subject(tmp_path, incremental_build=True):
+    work_dir = str(tmp_path / "subject")
+    os.makedirs(os.path.join(work_dir, "obj"))
+    for name in ["a.c", "b.c"]:
+        with open(os.path.join(work_dir, name), "w") as f:
+            f.write(f"// {name}\n")
+    # the "compiler" copies the source into the object file
+    with open(os.path.join(work_dir, "cc.sh"), "w") as f:
+        f.write('cp "$1" "$3"\n')
+    with open(os.path.join(work_dir, "build_script.sh"), "w") as f:
+        f.write("cat obj/*.o > program && echo x >> link_count\n")
+    with open(os.path.join(work_dir, "compile_commands.json"), "w") as f:
+        json.dump([
+            {"directory": work_dir, "file": "a.c", "arguments": ["bash", "cc.sh", "a.c", "-o", "obj/a.o"]},
+            {"directory": work_dir, "file": os.path.join(work_dir, "b.c"), "command": "bash cc.sh b.c -o obj/b.o"},
+        ], f)
+
+    return SimpleNamespace(
+        subject_configs={"incremental_build": incremental_build},
+        build_script=os.path.join(work_dir, "build_script.sh"),
+        build_script_working_directory=work_dir,
+        compile_commands_json_path=work_dir,
+    )
+
+
+def test_incremental_build_recompiles_patched_translation_unit(tmp_path):
+    SUBJECT = make_subject(tmp_path)
+    work_dir = SUBJECT.build_script_working_directory
+    builder = IncrementalBuilder(SUBJECT)
+
+    assert builder.enabled
+    assert builder.get_object_file(os.path.join(work_dir, "a.c")) == os.path.join(work_dir, "obj/a.o")
+    assert builder.get_object_file(os.path.join(work_dir, "b.c")) == os.path.join(work_dir, "obj/b.o")
+
+    with open(os.path.join(work_dir, "a.c"), "w") as f:
+        f.write("// patched\n")
+    assert builder.build([os.path.join(work_dir, "a.c")]) == 0
+    with open(os.path.join(work_dir, "program")) as f:
+        assert f.read() == "// patched\n"
+    assert not os.path.exists(os.path.join(work_dir, "obj/b.o"))
+
+
+def test_incremental_build_falls_back_to_scripts(tmp_path):
+    SUBJECT = make_subject(tmp_path)
+    work_dir = SUBJECT.build_script_working_directory
+    with open(os.path.join(work_dir, "c.c"), "w") as f:
+        f.write("// c.c\n")
+
+    # unknown translation unit and disabled mode leave the build to the scripts
+    assert IncrementalBuilder(SUBJECT).build([os.path.join(work_dir, "c.c")]) is None
+    assert IncrementalBuilder(make_subject(tmp_path / "disabled", False)).build([os.path.join(work_dir, "a.c")]) is None
+    assert not os.path.exists(os.path.join(work_dir, "link_count"))
@@ -0,0 +1,278 @@
+import copy
+import math
+import random
+import numpy as np
+
+from utils.mbfl_utils import *
+
+# reference implementation, one mutation count at a time, the vectorized functions are checked against
+
+def reference_transition_counts(transition_bit_seq, tcIdx2tcInfo, line_idx, tcs_reduction):
+    f2p, p2f, f2f, p2p = 0, 0, 0, 0
+    execution_time_ms = 0
+
+    for tcIdx, bit_val in enumerate(transition_bit_seq):
+
+        if tcIdx2tcInfo[tcIdx]["relevant_tcs"] == False:
+            continue
+
+        # Not executed for this mutant, neither a transition nor a non-transition
+        if bit_val == SKIPPED_TRANSITION:
+            continue
+
+        # Exclude test cases that does not execute the line of the mutant
+        if tcs_reduction == "Reduced" \
+            and tcIdx2tcInfo[tcIdx]["line_coverage_bit_sequence"][line_idx] == '0':
+            continue
+
+        baseline_outcome = 1 if tcIdx2tcInfo[tcIdx]['tc_result'] == 'fail' else 0
+
+        if baseline_outcome == 1: # failing
+            if bit_val == '1':
+                f2p += 1
+            else:
+                f2f += 1
+        else: # passing
+            if bit_val == '1':
+                p2f += 1
+            else:
+                p2p += 1
+        
+        # increment time, tests without a recorded time count as 0
+        execution_time_ms += tcIdx2tcInfo[tcIdx]['execution_time_ms'] or 0
+
+    return f2p, p2f, f2f, p2p, execution_time_ms
+
+def reference_overall_data(using_mutants, total_failing_tcs, line_cnt, mut_cnt, tcs_reduction):
+    overall_data = {
+        "total_failing_tcs": total_failing_tcs,
+        "total_mutants": 0,
+    }
+
+    for transition_type, transition_key in TRANSITION_TYPES.items():
+        overall_data[f"lineCnt{line_cnt}_mutCnt{mut_cnt}_tcs{tcs_reduction}_{transition_type}_total_f2p"] = 0
+        overall_data[f"lineCnt{line_cnt}_mutCnt{mut_cnt}_tcs{tcs_reduction}_{transition_type}_total_p2f"] = 0
+        overall_data[f"lineCnt{line_cnt}_mutCnt{mut_cnt}_tcs{tcs_reduction}_{transition_type}_total_f2f"] = 0
+        overall_data[f"lineCnt{line_cnt}_mutCnt{mut_cnt}_tcs{tcs_reduction}_{transition_type}_total_p2p"] = 0
+        overall_data[f"lineCnt{line_cnt}_mutCnt{mut_cnt}_tcs{tcs_reduction}_{transition_type}_total_execution_time_ms"] = 0
+
+    for line_idx, mutation_list in using_mutants.items():
+
+        for mutation_data in mutation_list:
+            if mutation_data["build_result"] == False:
+                continue
+            overall_data["total_mutants"] += 1
+            for transition_type, transition_key in TRANSITION_TYPES.items():
+                f2p = mutation_data[transition_key]["f2p"]
+                p2f = mutation_data[transition_key]["p2f"]
+                f2f = mutation_data[transition_key]["f2f"]
+                p2p = mutation_data[transition_key]["p2p"]
+                execution_time_ms = mutation_data[transition_key]["execution_time_ms"]
+
+                overall_data[f"lineCnt{line_cnt}_mutCnt{mut_cnt}_tcs{tcs_reduction}_{transition_type}_total_f2p"] += f2p
+                overall_data[f"lineCnt{line_cnt}_mutCnt{mut_cnt}_tcs{tcs_reduction}_{transition_type}_total_p2f"] += p2f
+                overall_data[f"lineCnt{line_cnt}_mutCnt{mut_cnt}_tcs{tcs_reduction}_{transition_type}_total_f2f"] += f2f
+                overall_data[f"lineCnt{line_cnt}_mutCnt{mut_cnt}_tcs{tcs_reduction}_{transition_type}_total_p2p"] += p2p
+                overall_data[f"lineCnt{line_cnt}_mutCnt{mut_cnt}_tcs{tcs_reduction}_{transition_type}_total_execution_time_ms"] += execution_time_ms
+
+    return overall_data
+
+def reference_muse_on_line(using_mutants, overall_f2p, overall_p2f, transition_key, line_cnt, mut_cnt, tcs_reduction):
+    abs_muts = len(using_mutants)
+
+    line_total_f2p = 0
+    line_total_p2f = 0
+
+    for mutant in using_mutants:
+        if mutant["build_result"] == False:
+            continue
+        f2p = mutant[transition_key]["f2p"]
+        p2f = mutant[transition_key]["p2f"]
+
+        line_total_f2p += f2p
+        line_total_p2f += p2f
+
+    muse_1 = (1 / ((abs_muts + 1) * (overall_f2p + 1)))
+    muse_2 = (1 / ((abs_muts + 1) * (overall_p2f + 1)))
+
+    muse_3 = muse_1 * line_total_f2p
+    muse_4 = muse_2 * line_total_p2f
+
+    final_muse_score = muse_3 - muse_4
+
+    muse_data = {
+        f"lineCnt{line_cnt}_mutCnt{mut_cnt}_tcs{tcs_reduction}_{transition_key}_abs_muts": abs_muts,
+        f"lineCnt{line_cnt}_mutCnt{mut_cnt}_tcs{tcs_reduction}_{transition_key}_line_total_f2p": line_total_f2p,
+        f"lineCnt{line_cnt}_mutCnt{mut_cnt}_tcs{tcs_reduction}_{transition_key}_line_total_p2f": line_total_p2f,
+        f"lineCnt{line_cnt}_mutCnt{mut_cnt}_tcs{tcs_reduction}_{transition_key}_muse_1": muse_1,
+        f"lineCnt{line_cnt}_mutCnt{mut_cnt}_tcs{tcs_reduction}_{transition_key}_muse_2": muse_2,
+        f"lineCnt{line_cnt}_mutCnt{mut_cnt}_tcs{tcs_reduction}_{transition_key}_muse_3": muse_3,
+        f"lineCnt{line_cnt}_mutCnt{mut_cnt}_tcs{tcs_reduction}_{transition_key}_muse_4": muse_4,
+        f"lineCnt{line_cnt}_mutCnt{mut_cnt}_tcs{tcs_reduction}_{transition_key}_final_muse_score": final_muse_score,
+    }
+
+    return muse_data
+
+def reference_metal_on_line(using_mutants, total_failing_tcs, transition_key, line_cnt, mut_cnt, tcs_reduction):
+    metal_scores = []
+
+    for mutant in using_mutants:
+        if mutant["build_result"] == False:
+            continue
+        f2p = mutant[transition_key]["f2p"]
+        p2f = mutant[transition_key]["p2f"]
+
+        score = 0.0
+        if f2p + p2f == 0:
+            score = 0.0
+        else:
+            score = ((f2p) / math.sqrt(total_failing_tcs * (f2p + p2f)))
+
+        metal_scores.append(score)
+
+    if len(metal_scores) == 0:
+        metal_score = 0.0
+    else:
+        metal_score = max(metal_scores)
+
+    metal_data = {
+        f"lineCnt{line_cnt}_mutCnt{mut_cnt}_tcs{tcs_reduction}_{transition_key}_final_metal_score": metal_score
+    }
+
+    return metal_data
+
+def reference_mbfl_susp_scores(lineIdx2lineData, using_mutants, line_cnt, mut_cnt, tcs_reduction, overall_data):
+    default_values = {}
+    for transition_type, transition_key in TRANSITION_TYPES.items():
+        default_values[f"lineCnt{line_cnt}_mutCnt{mut_cnt}_tcs{tcs_reduction}_{transition_key}_total_execution_time_ms"] = \
+            overall_data[f"lineCnt{line_cnt}_mutCnt{mut_cnt}_tcs{tcs_reduction}_{transition_type}_total_execution_time_ms"]
+        default_values[f"lineCnt{line_cnt}_mutCnt{mut_cnt}_tcs{tcs_reduction}_{transition_key}_abs_muts"] = 0
+        default_values[f"lineCnt{line_cnt}_mutCnt{mut_cnt}_tcs{tcs_reduction}_{transition_key}_line_total_f2p"] = -10.0
+        default_values[f"lineCnt{line_cnt}_mutCnt{mut_cnt}_tcs{tcs_reduction}_{transition_key}_line_total_p2f"] = -10.0
+        default_values[f"lineCnt{line_cnt}_mutCnt{mut_cnt}_tcs{tcs_reduction}_{transition_key}_muse_1"] = -10.0
+        default_values[f"lineCnt{line_cnt}_mutCnt{mut_cnt}_tcs{tcs_reduction}_{transition_key}_muse_2"] = -10.0
+        default_values[f"lineCnt{line_cnt}_mutCnt{mut_cnt}_tcs{tcs_reduction}_{transition_key}_muse_3"] = -10.0
+        default_values[f"lineCnt{line_cnt}_mutCnt{mut_cnt}_tcs{tcs_reduction}_{transition_key}_muse_4"] = -10.0
+        default_values[f"lineCnt{line_cnt}_mutCnt{mut_cnt}_tcs{tcs_reduction}_{transition_key}_final_muse_score"] = -10.0
+        default_values[f"lineCnt{line_cnt}_mutCnt{mut_cnt}_tcs{tcs_reduction}_{transition_key}_final_metal_score"] = -10.0
+    
+
+    for lineIdx in lineIdx2lineData.keys():
+        if lineIdx not in using_mutants:
+            lineIdx2lineData[lineIdx] = {**lineIdx2lineData[lineIdx], **default_values}
+            continue
+        
+        for transition_type, transition_key in TRANSITION_TYPES.items():
+            overall_f2p = overall_data[f"lineCnt{line_cnt}_mutCnt{mut_cnt}_tcs{tcs_reduction}_{transition_type}_total_f2p"]
+            overall_p2f = overall_data[f"lineCnt{line_cnt}_mutCnt{mut_cnt}_tcs{tcs_reduction}_{transition_type}_total_p2f"]
+            total_failing_tcs = overall_data["total_failing_tcs"]
+            total_execution_time_ms = overall_data[f"lineCnt{line_cnt}_mutCnt{mut_cnt}_tcs{tcs_reduction}_{transition_type}_total_execution_time_ms"]
+
+            muse_data = reference_muse_on_line(using_mutants[lineIdx], overall_f2p, overall_p2f, transition_key, line_cnt, mut_cnt, tcs_reduction)
+            metal_data = reference_metal_on_line(using_mutants[lineIdx], total_failing_tcs, transition_key, line_cnt, mut_cnt, tcs_reduction)
+
+            lineIdx2lineData[lineIdx] = {
+                f"lineCnt{line_cnt}_mutCnt{mut_cnt}_tcs{tcs_reduction}_{transition_key}_total_execution_time_ms": total_execution_time_ms,
+                **lineIdx2lineData[lineIdx], 
+                **muse_data, 
+                **metal_data
+            }
+
+def make_tcIdx2tcInfo(num_tcs, num_lines, seed=0):
+    rng = random.Random(seed)
+    tcIdx2tcInfo = {-1: {
+        "tc_result": "pass", "relevant_tcs": False, "execution_time_ms": 7,
+        "bit_sequence_length": num_lines, "line_coverage_bit_sequence": "1" * num_lines,
+    }}
+    for tc_idx in range(num_tcs):
+        tcIdx2tcInfo[tc_idx] = {
+            "tc_result": "fail" if tc_idx % 7 == 0 else "pass",
+            "relevant_tcs": rng.random() < 0.8,
+            "execution_time_ms": rng.randint(1, 100),
+            "bit_sequence_length": num_lines,
+            "line_coverage_bit_sequence": "".join(rng.choice("01") for _ in range(num_lines)),
+        }
+    return tcIdx2tcInfo
+
+def make_lineIdx2mutation(num_tcs, num_lines, seed=0):
+    rng = random.Random(seed)
+    lineIdx2mutation = {}
+    for line_idx in range(num_lines):
+        lineIdx2mutation[line_idx] = [
+            {
+                "mutant_idx": line_idx * 10 + mut_idx,
+                "build_result": rng.random() < 0.9,
+                "result_transition": "".join(rng.choice("0112") for _ in range(num_tcs)),
+            }
+            for mut_idx in range(rng.randint(0, 4))
+        ]
+    return lineIdx2mutation
+
+def test_transition_counts_match_reference():
+    num_tcs, num_lines = 45, 12
+    tcIdx2tcInfo = make_tcIdx2tcInfo(num_tcs, num_lines)
+
+    for tcs_reduction in ["All", "Reduced"]:
+        lineIdx2mutation = make_lineIdx2mutation(num_tcs, num_lines)
+        expected = copy.deepcopy(lineIdx2mutation)
+        measure_transition_counts(lineIdx2mutation, tcIdx2tcInfo, tcs_reduction)
+
+        for line_idx, mutation_list in expected.items():
+            for mut_pos, mutation_data in enumerate(mutation_list):
+                result = lineIdx2mutation[line_idx][mut_pos]["result_transition"]
+                if mutation_data["build_result"] == False:
+                    assert result == mutation_data["result_transition"]
+                    continue
+                f2p, p2f, f2f, p2p, execution_time_ms = reference_transition_counts(
+                    mutation_data["result_transition"], tcIdx2tcInfo, line_idx, tcs_reduction
+                )
+                assert result == {
+                    "f2p": f2p, "p2f": p2f, "f2f": f2f, "p2p": p2p,
+                    "execution_time_ms": execution_time_ms
+                }
+
+def test_transition_count_matrix_short_sequence():
+    tcIdx2tcInfo = make_tcIdx2tcInfo(10, 3, seed=1)
+    tc_masks = get_tc_masks(tcIdx2tcInfo, "All")
+    counts = get_transition_count_matrix(["1111", "0000000000"], [0, 1], tc_masks)
+    assert counts[0].tolist() == list(reference_transition_counts("1111", tcIdx2tcInfo, 0, "All"))
+    assert counts[1].tolist() == list(reference_transition_counts("0000000000", tcIdx2tcInfo, 1, "All"))
+
+def test_tc_masks_from_packed_coverage():
+    tcIdx2tcInfo = make_tcIdx2tcInfo(45, 12, seed=2)
+    expected = get_tc_masks(tcIdx2tcInfo, "Reduced")["line_coverage"]
+    for tcInfo in tcIdx2tcInfo.values():
+        tcInfo["line_coverage_bits"] = CoverageMatrix.from_bit_strings([tcInfo["line_coverage_bit_sequence"]]).row_to_bytes(0)
+        # stage03 no longer stores the bit strings
+        tcInfo["line_coverage_bit_sequence"] = None
+    line_coverage = get_tc_masks(tcIdx2tcInfo, "Reduced")["line_coverage"]
+    assert line_coverage.shape == (12, 6)
+    assert np.array_equal(line_coverage, expected)
+
+def test_prefix_mbfl_scores_match_per_mut_cnt():
+    num_tcs, num_lines = 30, 10
+    tcIdx2tcInfo = make_tcIdx2tcInfo(num_tcs, num_lines, seed=3)
+    lineIdx2mutation = make_lineIdx2mutation(num_tcs, num_lines, seed=3)
+    measure_transition_counts(lineIdx2mutation, tcIdx2tcInfo, "All")
+    total_failing_tcs = sum(1 for tcInfo in tcIdx2tcInfo.values() if tcInfo["tc_result"] == "fail")
+    selected_lineIdx = [(line_idx, line_idx + 1) for line_idx in range(7)]
+    mut_cnts = [1, 2, 3, 5]
+
+    expected = {line_idx: {"lineno": line_idx} for line_idx in range(num_lines)}
+    for mut_cnt in mut_cnts:
+        # the prefix of the fixed mutant order is the subset used for each count
+        using_mutants = {
+            line_idx: lineIdx2mutation[line_idx][:mut_cnt] for line_idx, rank in selected_lineIdx
+        }
+        overall_data = reference_overall_data(using_mutants, total_failing_tcs, 100, mut_cnt, "All")
+        reference_mbfl_susp_scores(expected, using_mutants, 100, mut_cnt, "All", overall_data)
+
+    result = {line_idx: {"lineno": line_idx} for line_idx in range(num_lines)}
+    measure_mbfl_susp_scores_for_mut_cnts(
+        result, lineIdx2mutation, selected_lineIdx, 100, mut_cnts, "All", total_failing_tcs
+    )
+
+    for line_idx in range(num_lines):
+        assert list(result[line_idx].keys()) == list(expected[line_idx].keys())
+        for key, value in expected[line_idx].items():
+            assert math.isclose(result[line_idx][key], value, rel_tol=1e-12)
@@ -0,0 +1,74 @@
+import os
+import time
+import pytest
+
+pytest.importorskip("psycopg2")  # lib.mutant imports the database layer
+
+from lib.mutant import Mutant
+from utils.mbfl_utils import measure_transition_counts
+
+def make_script(tc_dir, name, body):
+    path = os.path.join(tc_dir, name)
+    with open(path, "w") as f:
+        f.write("#!/bin/bash\n" + body + "\n")
+    os.chmod(path, 0o755)
+    return path
+
+def test_run_tests_with_testScripts(tmp_path):
+    tc_dir = str(tmp_path)
+    tc_scripts = [
+        make_script(tc_dir, "TC1.sh", "sleep 0.5; exit 0"),
+        make_script(tc_dir, "TC2.sh", "sleep 0.5; exit 1"),
+        make_script(tc_dir, "TC3.sh", "sleep 0.5; exit 3"),
+    ]
+    MUTANT = Mutant(mutant_file="mutant.cpp", repo_dir=os.path.join(tc_dir, "repo"))
+
+    start_time = time.time()
+    results = MUTANT.run_tests_with_testScripts(
+        tc_scripts, width=3,
+        after_test=lambda tc_script, res: os.path.basename(tc_script)
+    )
+    assert time.time() - start_time < 1.4
+
+    assert [res for res, _, _ in results] == [0, 1, 3]
+    assert [after for _, _, after in results] == ["TC1.sh", "TC2.sh", "TC3.sh"]
+    # timings of concurrent tests are inflated and not recorded
+    assert all(time_duration_ms is None for _, time_duration_ms, _ in results)
+
+    results = MUTANT.run_tests_with_testScripts(tc_scripts[:1], width=3)
+    assert results[0][0] == 0 and results[0][1] >= 400
+
+def test_same_output_tests_are_not_concurrent(tmp_path):
+    tc_dir = str(tmp_path)
+    # both scripts would write TC1.bbcd
+    tc_scripts = [
+        make_script(tc_dir, "TC1.sh", "echo start1 >> order.txt; sleep 0.3; echo end1 >> order.txt"),
+        make_script(tc_dir, "TC1.alt.sh", "echo start2 >> order.txt; sleep 0.3; echo end2 >> order.txt"),
+    ]
+    MUTANT = Mutant(mutant_file="mutant.cpp", repo_dir=os.path.join(tc_dir, "repo"))
+    MUTANT.run_tests_with_testScripts(tc_scripts, width=2)
+
+    with open(os.path.join(tc_dir, "order.txt")) as f:
+        assert f.read().split() == ["start1", "end1", "start2", "end2"]
+
+def test_concurrent_timings_reach_transition_counts(tmp_path):
+    tc_dir = str(tmp_path)
+    tc_scripts = [make_script(tc_dir, f"TC{idx}.sh", f"exit {idx % 2}") for idx in range(4)]
+    MUTANT = Mutant(mutant_file="mutant.cpp", repo_dir=os.path.join(tc_dir, "repo"))
+    results = MUTANT.run_tests_with_testScripts(tc_scripts, width=2)
+
+    # stage06 reads the NULL execution_time_ms of the concurrent runs
+    tcIdx2tcInfo = {
+        tc_idx: {
+            "tc_result": "pass" if res == 0 else "fail",
+            "relevant_tcs": True,
+            "execution_time_ms": time_duration_ms,
+        }
+        for tc_idx, (res, time_duration_ms, _) in enumerate(results)
+    }
+    tcIdx2tcInfo[0]["execution_time_ms"] = 5.0
+    lineIdx2mutation = {0: [{"build_result": True, "result_transition": "1010"}]}
+    measure_transition_counts(lineIdx2mutation, tcIdx2tcInfo, "All")
+    assert lineIdx2mutation[0][0]["result_transition"] == {
+        "f2p": 0, "p2f": 2, "f2f": 2, "p2p": 0, "execution_time_ms": 5.0
+    }
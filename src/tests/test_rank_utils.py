@@ -0,0 +1,34 @@
+import random
+
+from utils.rank_utils import *
+
+def reference_ranks(score_pairs):
+    score_pairs = sorted(score_pairs, key=lambda x: x[1], reverse=True)
+    score_to_rank = {}
+    for idx, (_, score) in enumerate(score_pairs):
+        score_to_rank[score] = idx + 1
+    return {item_id: score_to_rank[score] for item_id, score in score_pairs}
+
+def test_calculate_ranks_docstring_example():
+    score_pairs = [(23, 0.90), (12, 0.38), (31, 0.38), (21, 0.38), (7, 0.21)]
+    assert calculate_ranks(score_pairs) == {23: 1, 12: 4, 31: 4, 21: 4, 7: 5}
+
+def test_rank_matrix_matches_reference():
+    rng = random.Random(0)
+    columns = [
+        [rng.choice([0, 1, 2, 0.5, -1]) for _ in range(200)],
+        [rng.random() for _ in range(200)],
+        [rng.choice([float('-inf'), -10.0, 0.25]) for _ in range(200)],
+    ]
+    ranks = calculate_rank_matrix(list(zip(*columns)))
+    for col_idx, column in enumerate(columns):
+        expected = reference_ranks(list(enumerate(column)))
+        assert ranks[:, col_idx].tolist() == [expected[idx] for idx in range(200)]
+
+def test_add_mbfl_ranks_missing_keys():
+    key = "lineCnt100_mutCnt1_tcsAll_result_transition_final_muse_score"
+    lineIdx2lineData = {0: {key: 0.5}, 1: {}, 2: {key: 0.5}, 3: {key: 1.0}}
+    add_mbfl_ranks(lineIdx2lineData, {"tcs_reduction": "All", "target_lines": [100], "mutation_cnt": [1]})
+    assert [data[f"{key}_rank"] for data in lineIdx2lineData.values()] == [3, 4, 3, 1]
+    assert all("lineCnt100_mutCnt1_tcsAll_result_transition_final_metal_score_rank" not in data
+               for data in lineIdx2lineData.values())
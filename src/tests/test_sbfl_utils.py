@@ -0,0 +1,81 @@
+import math
+import random
+
+from utils.sbfl_utils import *
+
+def reference_spectrum(tcIdx2tcInfo, num_lines):
+    spectrum = {line_idx: {"ep": 0, "ef": 0, "np": 0, "nf": 0} for line_idx in range(num_lines)}
+    for tcInfo in tcIdx2tcInfo.values():
+        if tcInfo["relevant_tcs"] == False: continue
+        failed = tcInfo["tc_result"] == "fail"
+        for line_idx, coverage in enumerate(tcInfo["line_coverage_bit_sequence"]):
+            if coverage == "1":
+                spectrum[line_idx]["ef" if failed else "ep"] += 1
+            else:
+                spectrum[line_idx]["nf" if failed else "np"] += 1
+    return spectrum
+
+def reference_scores(ep, ef, n_p, nf):
+    numerator = ef / (ef + nf)
+    left = numerator / (ep + n_p) if (ep + n_p) != 0 else 0
+    right = ef / (ef + nf) if (ef + nf) != 0 else 0
+    denominator = math.sqrt((ef + nf) * (ef + ep))
+    return {
+        "tarantula": numerator / (left + right) if (left + right) != 0 else 0,
+        "ochiai": ef / denominator if denominator != 0 else 0,
+        "dstar": ef**2 / (ef + nf) if (ef + nf) != 0 else 0,
+        "naish1": -1 if nf > 0 else n_p,
+        "naish2": ef - (ep / (ep + n_p + 1)),
+        "gp13": ef * (1 + (1 / (2*ep + ef))),
+    }
+
+def make_tcIdx2tcInfo(num_tcs, num_lines, seed=0):
+    rng = random.Random(seed)
+    tcIdx2tcInfo = {}
+    for tc_idx in range(num_tcs):
+        tcIdx2tcInfo[tc_idx] = {
+            "tc_result": "fail" if tc_idx < 3 else "pass",
+            "relevant_tcs": rng.random() < 0.8 or tc_idx < 3,
+            "bit_sequence_length": num_lines,
+            "line_coverage_bit_sequence": "".join(rng.choice("01") for _ in range(num_lines)),
+        }
+    # every line is executed by a failing test, as for candidate lines
+    tcIdx2tcInfo[0]["line_coverage_bit_sequence"] = "1" * num_lines
+    return tcIdx2tcInfo
+
+def test_spectrum_matches_reference():
+    tcIdx2tcInfo = make_tcIdx2tcInfo(50, 21)
+    lineIdx2lineData = {line_idx: {} for line_idx in range(21)}
+    measure_spectrum(tcIdx2tcInfo, lineIdx2lineData)
+    assert lineIdx2lineData == reference_spectrum(tcIdx2tcInfo, 21)
+
+def test_spectrum_from_packed_coverage():
+    tcIdx2tcInfo = make_tcIdx2tcInfo(20, 13, seed=1)
+    expected = reference_spectrum(tcIdx2tcInfo, 13)
+    for tcInfo in tcIdx2tcInfo.values():
+        covMatrix = CoverageMatrix.from_bit_strings([tcInfo["line_coverage_bit_sequence"]])
+        tcInfo["line_coverage_bits"] = covMatrix.row_to_bytes(0)
+        # stage03 no longer stores the bit strings
+        tcInfo["line_coverage_bit_sequence"] = None
+    lineIdx2lineData = {line_idx: {} for line_idx in range(13)}
+    measure_spectrum(tcIdx2tcInfo, lineIdx2lineData)
+    assert lineIdx2lineData == expected
+
+def test_legacy_coverage_without_candidate_lines():
+    tcIdx2tcInfo = make_tcIdx2tcInfo(5, 0)
+    for tcInfo in tcIdx2tcInfo.values():
+        tcInfo["line_coverage_bit_sequence"] = "0"
+    relevant_tcIdxs, covMatrix, failing = get_relevant_coverage(tcIdx2tcInfo)
+    assert covMatrix.shape == (len(relevant_tcIdxs), 0)
+
+def test_susp_scores_match_reference():
+    tcIdx2tcInfo = make_tcIdx2tcInfo(40, 17, seed=2)
+    lineIdx2lineData = {line_idx: {} for line_idx in range(17)}
+    measure_spectrum(tcIdx2tcInfo, lineIdx2lineData)
+    lineIdx2lineData[5].update({"ep": 0, "np": 0})  # zero-division guards
+    measure_sbfl_susp_scores(lineIdx2lineData)
+
+    for data in lineIdx2lineData.values():
+        expected = reference_scores(data["ep"], data["ef"], data["np"], data["nf"])
+        for formula in SUSP_FORMULA:
+            assert math.isclose(data[formula], expected[formula], rel_tol=1e-12)
@@ -0,0 +1,122 @@
+import os
+
+from lib.source_swapper import *
+
+
+def write(path, content):
+    with open(path, "w") as f:
+        f.write(content)
+
+def read(path):
+    with open(path) as f:
+        return f.read()
+
+
+def test_apply_and_revert_nested_mutants(tmp_path):
+    target = str(tmp_path / "a.c")
+    origin_mutant = str(tmp_path / "a.origin.c")
+    mutant = str(tmp_path / "a.mutant.c")
+    write(target, "int a = 0;\n")
+    write(origin_mutant, "int a = 1;\n")
+    write(mutant, "int a = 2;\n")
+    os.chmod(target, 0o640)
+
+    SWAPPER = SourceSwapper()
+    mtimes = [os.stat(target).st_mtime_ns]
+
+    # stage05 order: origin mutant, mutant of the origin mutant, then both reverted
+    assert SWAPPER.apply(target, origin_mutant)
+    assert read(target) == "int a = 1;\n"
+    mtimes.append(os.stat(target).st_mtime_ns)
+    assert SWAPPER.apply(target, mutant)
+    assert read(target) == "int a = 2;\n"
+    mtimes.append(os.stat(target).st_mtime_ns)
+    assert SWAPPER.revert(target)
+    assert read(target) == "int a = 1;\n"
+    mtimes.append(os.stat(target).st_mtime_ns)
+    assert SWAPPER.revert(target)
+    assert read(target) == "int a = 0;\n"
+    mtimes.append(os.stat(target).st_mtime_ns)
+
+    # every swap is seen as a change by incremental builds
+    assert all(prev < curr for prev, curr in zip(mtimes, mtimes[1:]))
+    assert os.stat(target).st_mode & 0o777 == 0o640
+    assert sorted(os.listdir(tmp_path)) == ["a.c", "a.mutant.c", "a.origin.c"]
+
+
+def test_revert_restores_snapshot_once_taken(tmp_path):
+    target = str(tmp_path / "a.c")
+    mutant = str(tmp_path / "a.mutant.c")
+    write(target, "int a = 0;\n")
+    write(mutant, "int a = 2;\n")
+
+    SWAPPER = SourceSwapper()
+    assert SWAPPER.apply(target, mutant)
+    assert SWAPPER.revert(target)
+    # a second revert (e.g. after a failed build) keeps the original content
+    assert SWAPPER.revert(target)
+    assert read(target) == "int a = 0;\n"
+
+    # the snapshot is not re-read from disk
+    write(target, "changed outside\n")
+    assert SWAPPER.snapshot(target) == b"int a = 0;\n"
+    assert not SWAPPER.apply(target, str(tmp_path / "missing.c"))
+
+
+def test_restore_all_uses_pristine_copy_and_journal(tmp_path):
+    pristine_dir = tmp_path / "pristine"
+    core_dir = tmp_path / "core0"
+    pristine_dir.mkdir()
+    core_dir.mkdir()
+    for name in ["a.c", "b.c"]:
+        write(str(pristine_dir / name), f"// {name}\n")
+        write(str(core_dir / name), f"// {name}\n")
+    write(str(tmp_path / "b.mutant.c"), "// mutant\n")
+
+    def resolver(path):
+        return str(pristine_dir / os.path.basename(path))
+    journal = str(core_dir / "swapped_files.journal")
+
+    # a worker dies with a mutant applied
+    SWAPPER = SourceSwapper(pristine_resolver=resolver, journal_file=journal)
+    assert SWAPPER.apply(str(core_dir / "b.c"), str(tmp_path / "b.mutant.c"))
+
+    # the next worker process restores it before its first task
+    SWAPPER = SourceSwapper(pristine_resolver=resolver, journal_file=journal)
+    assert SWAPPER.restore_all() == [str(core_dir / "b.c")]
+    assert read(str(core_dir / "b.c")) == "// b.c\n"
+    assert not os.path.exists(journal)
+    assert SWAPPER.restore_all() == []
+
+    # a target left modified is not taken as the original
+    write(str(core_dir / "a.c"), "// leftover\n")
+    assert SWAPPER.snapshot(str(core_dir / "a.c")) == b"// a.c\n"
+    assert read(str(core_dir / "a.c")) == "// a.c\n"
+
+
+def test_restore_all_keeps_retained_origin_mutant(tmp_path):
+    target = str(tmp_path / "a.c")
+    write(target, "int a = 0;\n")
+    write(str(tmp_path / "a.origin.c"), "int a = 1;\n")
+    write(str(tmp_path / "a.mutant.c"), "int a = 2;\n")
+    journal = str(tmp_path / "swapped_files.journal")
+
+    SWAPPER = SourceSwapper(journal_file=journal)
+    assert SWAPPER.apply(target, str(tmp_path / "a.origin.c"))
+    assert SWAPPER.apply(target, str(tmp_path / "a.mutant.c"))
+
+    # a task of the same origin bug only drops the mutant left on top of the origin mutant
+    assert SWAPPER.restore_all(keep=[target]) == [target]
+    assert read(target) == "int a = 1;\n"
+    assert read(journal) == target + "\n"
+    # the journal lists the applied targets once, however many tasks ran
+    for _ in range(3):
+        assert SWAPPER.apply(target, str(tmp_path / "a.mutant.c"))
+        assert SWAPPER.restore_all(keep=[target]) == [target]
+    assert read(journal) == target + "\n"
+    assert SWAPPER.restore_all(keep=[target]) == []
+
+    assert SWAPPER.revert(target)
+    assert SWAPPER.restore_all() == []
+    assert read(target) == "int a = 0;\n"
+    assert not os.path.exists(journal)
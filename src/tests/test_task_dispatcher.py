@@ -0,0 +1,130 @@
+import threading
+from types import SimpleNamespace
+
+from lib.executor.task_dispatcher import *
+
+
+class FakeDaemon:
+    def __init__(self, name, fail=False):
+        self.name = name
+        self.fail = fail
+        self.task_args = []
+        self.kill_cnt = 0
+
+    def run(self, task_args):
+        if self.fail:
+            raise RuntimeError(f"Worker daemon {self.name} failed to start")
+        self.task_args.append(task_args)
+        return True
+
+    def stop(self):
+        pass
+
+    def kill(self):
+        self.kill_cnt += 1
+
+
+class FakeExecutor:
+    def __init__(self, failing_cores=()):
+        self.failing_cores = failing_cores
+        self.daemons = {}
+
+    def _create_worker_daemon(self, CONTEXT, machine_name, core_idx, worker_type):
+        name = f"{machine_name}::core{core_idx}"
+        self.daemons[name] = FakeDaemon(name, fail=name in self.failing_cores)
+        return self.daemons[name]
+
+    def _run_worker_task(self, daemon, task_args):
+        return daemon.run(task_args)
+
+
+def make_context(**ENV):
+    return SimpleNamespace(CONFIG=SimpleNamespace(ENV=ENV))
+
+
+def build_task_args(task, needs_configuration):
+    return {"mutant": task, "target_file": "a.c", "needs_configuration": needs_configuration}
+
+
+CORES = [("faster0", 0, "/home"), ("faster0", 1, "/home"), ("faster1", 0, "/home")]
+
+
+def test_every_task_runs_once():
+    EXECUTOR = FakeExecutor()
+    tasks = [f"m{idx}" for idx in range(20)]
+    results = TaskDispatcher(EXECUTOR, make_context(), "mutant_bug_tester", build_task_args, make_task_source(tasks)).run(CORES)
+
+    assert sorted(result["task"] for result in results) == sorted(tasks)
+    assert all(result["status"] == "done" for result in results)
+    for daemon in EXECUTOR.daemons.values():
+        # only the first task of a core configures the build
+        assert [task_args["needs_configuration"] for task_args in daemon.task_args][:1] in ([], [True])
+        assert not any(task_args["needs_configuration"] for task_args in daemon.task_args[1:])
+
+
+def test_unreachable_core_hands_its_tasks_to_its_machine():
+    EXECUTOR = FakeExecutor(failing_cores=["faster0::core0"])
+    tasks = [f"m{idx}" for idx in range(10)]
+    results = TaskDispatcher(EXECUTOR, make_context(), "mutant_bug_tester", build_task_args, make_task_source(tasks)).run(CORES[:2])
+
+    assert sorted(result["task"] for result in results) == sorted(tasks)
+    assert {(result["core_idx"], result["status"]) for result in results} == {(1, "done")}
+    # the core is retired after DISPATCH_CORE_RESTARTS consecutive failures
+    assert EXECUTOR.daemons["faster0::core0"].kill_cnt == DEFAULT_CORE_RESTARTS
+
+
+def test_idle_core_waits_for_handed_back_task():
+    EXECUTOR = FakeExecutor()
+    source_empty = threading.Event()
+    handed_out = []
+
+    def get_task(core):
+        # the only task goes to core0, core1 finds the source empty
+        if core[1] == 0 and not handed_out:
+            handed_out.append("m0")
+            return "m0"
+        source_empty.set()
+        return None
+
+    def prepare_task(core, task):
+        if core[1] == 0:
+            source_empty.wait(timeout=5)
+            raise RuntimeError("connection lost")
+
+    dispatcher = TaskDispatcher(
+        EXECUTOR, make_context(DISPATCH_CORE_RESTARTS="1"), "mutant_bug_tester",
+        build_task_args, get_task, prepare_task=prepare_task
+    )
+    results = dispatcher.run(CORES[:2])
+    assert [(result["task"], result["core_idx"], result["status"]) for result in results] == [("m0", 1, "done")]
+
+
+def test_tasks_of_retired_machine_are_abandoned():
+    EXECUTOR = FakeExecutor(failing_cores=["faster1::core0"])
+    sources = {"faster0": make_task_source([]), "faster1": make_task_source(["m0"])}
+    results = TaskDispatcher(
+        EXECUTOR, make_context(DISPATCH_CORE_RESTARTS="2"), "mutant_bug_tester",
+        build_task_args, lambda core: sources[core[0]](core)
+    ).run(CORES)
+    assert [(result["machine"], result["status"]) for result in results] == [("faster1", "abandoned")]
+
+
+def test_cancel_stops_handing_out_tasks():
+    EXECUTOR = FakeExecutor()
+    dispatcher = TaskDispatcher(
+        EXECUTOR, make_context(), "mutant_bug_tester", build_task_args,
+        make_task_source([f"m{idx}" for idx in range(10)]),
+        after_task=lambda core, task, succeeded: dispatcher.cancel()
+    )
+    results = dispatcher.run(CORES[:1])
+    assert [result["task"] for result in results] == ["m0"]
+
+
+def test_cores_per_machine_are_limited():
+    EXECUTOR = FakeExecutor()
+    results = TaskDispatcher(
+        EXECUTOR, make_context(DISPATCH_MAX_CORES_PER_MACHINE="1"), "mutant_bug_tester",
+        build_task_args, make_task_source([f"m{idx}" for idx in range(6)])
+    ).run(CORES)
+    assert len(results) == 6
+    assert sorted(EXECUTOR.daemons) == ["faster0::core0", "faster1::core0"]
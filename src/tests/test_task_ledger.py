@@ -0,0 +1,68 @@
+import json
+import pytest
+
+pytest.importorskip("psycopg2")  # lib.task_ledger imports the database layer
+
+from lib.task_ledger import *
+
+def test_task_key_ignores_core_history():
+    args = {"target_file": "src/a.c", "mutant": "a.MUT1.c", "origin_mutant": None, "needs_configuration": True}
+    key = make_task_key(args)
+    assert key == make_task_key({"mutant": "a.MUT1.c", "target_file": "src/a.c", "needs_configuration": False})
+    assert json.loads(key) == {"mutant": "a.MUT1.c", "target_file": "src/a.c"}
+    assert key != make_task_key({"target_file": "src/a.c", "mutant": "a.MUT2.c"})
+
+def test_retry_policy():
+    ENV = {"TASK_LEDGER": "True", "TASK_LEDGER_MAX_ATTEMPTS": "4", "TASK_LEDGER_RETRY_BACKOFF_SEC": "10"}
+    assert is_ledger_enabled(ENV)
+    assert not is_ledger_enabled({})
+    assert get_max_attempts(ENV) == 4
+    assert [get_retry_delay(get_retry_backoff(ENV), attempts) for attempts in [1, 2, 3]] == [10.0, 20.0, 40.0]
+
+class FakeLedgerDB:
+    """Keeps the ledger rows in memory, keyed by (subject, experiment_label, stage, task_key)"""
+    def __init__(self):
+        self.rows = {}
+
+    def table_exists(self, table_name):
+        return True
+
+    def commit(self):
+        pass
+
+    def safe_execute(self, query, args):
+        self.execute(query, args)
+
+    def execute(self, query, args):
+        if query.startswith("INSERT"):
+            self.rows.setdefault(tuple(args), {"status": "queued", "attempts": 0})
+            return []
+        if "SET status = 'running'" in query:
+            row = self.rows[tuple(args[3:7])]
+            if row["status"] in ("queued", "failed") and row["attempts"] < args[7]:
+                row["status"], row["attempts"] = "running", row["attempts"] + 1
+                return [(row["attempts"],)]
+            return []
+        if "SET status = 'done'" in query:
+            self.rows[tuple(args[-4:])]["status"] = "done"
+        return []
+
+    def read(self, table_name, columns, conditions):
+        row = self.rows.get(tuple(conditions.values()))
+        return [(row["status"], row["attempts"])] if row else []
+
+def test_same_mutant_is_tracked_per_experiment_label():
+    DB = FakeLedgerDB()
+    task_key = make_task_key({"target_file": "src/x.cpp", "mutant": "x.MUT12.cpp"})
+    first = TaskLedger(DB, "stage02", "libxml2", "exp1")
+    second = TaskLedger(DB, "stage02", "libxml2", "exp2")
+
+    assert first.claim(task_key, "faster0", 0)
+    first.complete(task_key)
+    assert not first.claim(task_key, "faster0", 0)
+
+    # the task done under exp1 still runs under exp2
+    assert second.get_state(task_key) is None
+    assert second.claim(task_key, "faster0", 1)
+    assert first.get_state(task_key) == ("done", 1)
+    assert second.get_state(task_key) == ("running", 1)
@@ -0,0 +1,29 @@
+import pytest
+
+pytest.importorskip("psycopg2")  # lib.tc_prioritizer imports the database layer
+
+from lib.tc_prioritizer import TcPrioritizer
+
+class FakeDB:
+    def __init__(self, tc_info, mutation_info):
+        self.tables = {"cpp_tc_info": tc_info, "cpp_mutation_info": mutation_info}
+
+    def read(self, table_name, columns="*", conditions={}, special=""):
+        return self.tables[table_name]
+
+def test_cheap_tests_first_without_history():
+    DB = FakeDB([(0, 300.0), (1, 10.0), (2, None), (3, 10.0)], [])
+    PRIORITIZER = TcPrioritizer(DB, bug_idx=1)
+    PRIORITIZER.load_kill_history(line_idx=5)
+
+    tcs = [(0, "TC1.sh"), (1, "TC2.sh"), (2, "TC3.sh"), (3, "TC4.sh")]
+    assert [tc[0] for tc in PRIORITIZER.order(tcs)] == [1, 3, 0, 2]
+
+def test_kill_history_raises_priority():
+    # tc 3 killed every mutant of the line, tc 1 none; skipped ("2") results are not counted
+    DB = FakeDB([(0, 300.0), (1, 10.0), (3, 10.0)], [("0121",), ("0021",), ("0001",)])
+    PRIORITIZER = TcPrioritizer(DB, bug_idx=1)
+    PRIORITIZER.load_kill_history(line_idx=5)
+
+    assert PRIORITIZER.tcIdx2executions == {0: 3, 1: 3, 2: 1, 3: 3}
+    assert [tc[0] for tc in PRIORITIZER.order([(0,), (1,), (3,)])] == [3, 1, 0]
@@ -0,0 +1,123 @@
+import os
+import pytest
+from types import SimpleNamespace
+
+from lib.factories.transport_factory import TransportFactory
+from lib.fileManager.remote_file_manager import RemoteFileManager
+from lib.transport.ssh_transport import SSHTransport
+
+def test_remote_file_manager_over_local_transport(tmp_path):
+    FILE_MANAGER = RemoteFileManager(TRANSPORT=TransportFactory.create_transport("local"))
+    core_dir = str(tmp_path / "machine" / "core0")
+    assigned_works_dir = os.path.join(core_dir, "stage01-assigned_works")
+
+    FILE_MANAGER.make_specific_directory(assigned_works_dir, machine="faster0")
+    assert os.path.isdir(assigned_works_dir)
+
+    mutant = tmp_path / "a.MUT1.c"
+    mutant.write_text("int a = 1;\n")
+    FILE_MANAGER.copy_specific_file(str(mutant), assigned_works_dir, machine="faster0")
+    assert open(os.path.join(assigned_works_dir, "a.MUT1.c")).read() == "int a = 1;\n"
+
+    # arguments are joined into one shell command line, as over ssh
+    FILE_MANAGER.TRANSPORT.run("faster0", ["cd", core_dir, "&&", "touch", "built"])
+    assert os.path.exists(os.path.join(core_dir, "built"))
+
+    FILE_MANAGER.remove_specific_directory(core_dir, machine="faster0")
+    assert not os.path.exists(core_dir)
+
+def test_ssh_transport_reuses_control_socket(tmp_path):
+    TRANSPORT = SSHTransport(control_dir=str(tmp_path))
+    options = TRANSPORT.ssh_options()
+    assert f"ControlPath={os.path.join(str(tmp_path), '%C')}" in options
+    assert TRANSPORT._rsync_shell() == " ".join(["ssh"] + options)
+
+def test_push_files_ships_batch_into_one_directory(tmp_path):
+    FILE_MANAGER = RemoteFileManager(TRANSPORT=TransportFactory.create_transport("local"))
+    files = []
+    for target in ["a", "b"]:
+        (tmp_path / target).mkdir()
+        mutant = tmp_path / target / f"{target}.MUT1.c"
+        mutant.write_text(f"// {target}\n")
+        files.append(mutant)
+
+    staging_dir = str(tmp_path / "machine" / "stage01-assigned_works")
+    assert FILE_MANAGER.copy_specific_files(files, staging_dir, machine="faster0")
+    assert sorted(os.listdir(staging_dir)) == ["a.MUT1.c", "b.MUT1.c"]
+
+    # an empty batch does not connect
+    assert SSHTransport(control_dir=str(tmp_path / "ctl")).push_files([], staging_dir, "faster0") == 0
+
+def test_pre_stage_tasks_partitions_by_machine(tmp_path):
+    pytest.importorskip("psycopg2")
+    from lib.executor.remote_executor import RemoteExecutor
+
+    TRANSPORT = TransportFactory.create_transport("local")
+    working_env_dir = str(tmp_path / "working_env")
+    CONTEXT = SimpleNamespace(
+        working_env_dir=working_env_dir,
+        FILE_MANAGER=RemoteFileManager(TRANSPORT=TRANSPORT),
+        TASK_COST=None,
+        CONFIG=SimpleNamespace(
+            STAGE="stage05",
+            MACHINE_CORE_LIST=[("faster0", 0, "~"), ("faster0", 1, "~"), ("faster1", 0, "~")],
+            MACHINE_SPEED={},
+        ),
+    )
+    origin = tmp_path / "origin.MUT1.c"
+    origin.write_text("// origin\n")
+    tasks = []
+    for idx in range(6):
+        mutant = tmp_path / f"a.MUT{idx}.c"
+        mutant.write_text(f"// {idx}\n")
+        tasks.append(("a.c", "a.c", origin, mutant, 1, idx))
+
+    partitions = RemoteExecutor(TRANSPORT=TRANSPORT)._pre_stage_tasks(CONTEXT, tasks, {
+        "stage05-assigned_works": 3,
+        "stage05-mutant_origin": 2,
+    })
+    # two cores on faster0 take twice the tasks of faster1
+    assert len(partitions["faster0"]) == 4
+    assert len(partitions["faster1"]) == 2
+
+    assigned_works_dir = os.path.join(working_env_dir, "faster1/core0/stage05-assigned_works")
+    assert sorted(os.listdir(assigned_works_dir)) == sorted(task[3].name for task in partitions["faster1"])
+    for core in ["faster0/core0", "faster0/core1", "faster1/core0"]:
+        assert os.listdir(os.path.join(working_env_dir, core, "stage05-mutant_origin")) == ["origin.MUT1.c"]
+
+    # grouped by origin bug, all mutant mutants of a bug stay on one machine
+    partitions = RemoteExecutor(TRANSPORT=TRANSPORT)._pre_stage_tasks(CONTEXT, tasks, {}, group_idx=2)
+    assert partitions == {"faster0": tasks, "faster1": []}
+
+def test_pre_stage_tasks_skips_machine_failing_the_copy(tmp_path):
+    pytest.importorskip("psycopg2")
+    from lib.executor.remote_executor import RemoteExecutor
+
+    class FailingFileManager(RemoteFileManager):
+        def copy_specific_files(self, files, dest, machine=None):
+            return machine != "faster1" and super().copy_specific_files(files, dest, machine)
+
+    TRANSPORT = TransportFactory.create_transport("local")
+    working_env_dir = str(tmp_path / "working_env")
+    CONTEXT = SimpleNamespace(
+        working_env_dir=working_env_dir,
+        FILE_MANAGER=FailingFileManager(TRANSPORT=TRANSPORT),
+        CONFIG=SimpleNamespace(
+            MACHINE_CORE_LIST=[("faster0", 0, "~"), ("faster1", 0, "~")],
+            MACHINE_SPEED={},
+        ),
+    )
+    # left over by a previous run
+    staging_dir = os.path.join(working_env_dir, "faster0", "stage01-assigned_works")
+    os.makedirs(staging_dir)
+    open(os.path.join(staging_dir, "old.MUT9.c"), "w").close()
+
+    tasks = []
+    for idx in range(4):
+        mutant = tmp_path / f"a.MUT{idx}.c"
+        mutant.write_text(f"// {idx}\n")
+        tasks.append(("a.c", mutant))
+
+    partitions = RemoteExecutor(TRANSPORT=TRANSPORT)._pre_stage_tasks(CONTEXT, tasks, {"stage01-assigned_works": 1})
+    assert partitions["faster1"] == []
+    assert sorted(os.listdir(staging_dir)) == sorted(task[1].name for task in partitions["faster0"])
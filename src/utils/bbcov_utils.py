@@ -1,4 +1,102 @@
-import re
+import os
+import logging
+import tempfile
+import threading
+import importlib.util
+import subprocess as sp
+
+LOGGER = logging.getLogger(__name__)
+
+# function of the $BBCOV_LINE_COV script yielding the line coverage output of a .bbcd file
+DEFAULT_DECODER = "iter_line_cov"
+
+# decoders of the loaded $BBCOV_LINE_COV scripts, keyed by path, modification time and name
+_DECODERS = {}
+_DECODERS_LOCK = threading.Lock()
+
+
+class TargetFileMatcher:
+    """
+    Maps a coverage file path to the first target file it ends with,
+    using a per-suffix-length lookup table and a memo of already seen paths.
+    """
+    def __init__(self, target_files: list):
+        self.target_files = list(target_files)
+        self.suffix_map = {}
+        for order, tf in enumerate(self.target_files):
+            self.suffix_map.setdefault(len(tf), {}).setdefault(tf, order)
+        self.memo = {}
+
+    def match(self, curr_file: str):
+        if curr_file in self.memo:
+            return self.memo[curr_file]
+
+        matched_order, matched_tf = None, None
+        for length, suffixes in self.suffix_map.items():
+            if length > len(curr_file):
+                continue
+            order = suffixes.get(curr_file[len(curr_file) - length:]) if length else suffixes.get("")
+            if order is not None and (matched_order is None or order < matched_order):
+                matched_order, matched_tf = order, self.target_files[order]
+
+        self.memo[curr_file] = matched_tf
+        return matched_tf
+
+
+class BbcovLineCovParser:
+    """
+    Streaming parser of the bbcov line coverage output.
+    Lines are fed one at a time, records of target files are stored into
+    lineCovDict as {target_file: {line: {"covered", "function"}}}.
+    """
+    def __init__(self, target_files: list):
+        self.matcher = TargetFileMatcher(target_files)
+        self.lineCovDict = {}
+        self.file_cov = None
+        self.file_key = None
+        self.func_key = ""
+
+    def feed(self, line: str):
+        """Parse one output line, returning its (file, function, line, count) record if any"""
+        line = line.strip()
+        if not line:
+            return None
+
+        # File <path>
+        if line.startswith("File") and len(line) > 5 and line[4].isspace():
+            self.file_key = self.matcher.match(line[5:].lstrip())
+            if self.file_key is not None:
+                self.file_cov = self.lineCovDict.setdefault(self.file_key, {})
+            return None
+
+        if self.file_key is None:
+            return None
+
+        head = line[0]
+        if head == "F" and len(line) > 2 and line[1].isspace():
+            # F <function>
+            self.func_key = line[2:].lstrip()
+        elif head == "L":
+            # L <line> <count>
+            parts = line.split()
+            if len(parts) == 3 and parts[0] == "L" and parts[1].isdecimal() and parts[2].isdecimal():
+                line_num, covered = int(parts[1]), int(parts[2])
+                self.file_cov[line_num] = {
+                    "covered": covered,
+                    "function": self.func_key
+                }
+                return self.file_key, self.func_key, line_num, covered
+        return None
+
+
+def iter_bbcov_line_records(target_files: list, output_lines):
+    """Yield (file, function, line, count) records of the target files"""
+    parser = BbcovLineCovParser(target_files)
+    for line in output_lines:
+        record = parser.feed(line)
+        if record is not None:
+            yield record
+
 
 def parse_bbcov_line_cov_output(target_files: list, output_lines: list) -> dict:
     """
@@ -11,55 +109,76 @@ def parse_bbcov_line_cov_output(target_files: list, output_lines: list) -> dict:
     Returns:
         dict: A dictionary mapping line keys to their coverage bit values.
     """
-    lineCovDict = {}
-    save = False
-    file_key = ""
-    func_key = ""
-    
-    # Compile regex patterns for better performance
-    file_pattern = re.compile(r'^File\s+(.+)$')
-    func_pattern = re.compile(r'^F\s+(.+)$')
-    line_pattern = re.compile(r'^L\s+(\d+)\s+(\d+)$')
-    
+    parser = BbcovLineCovParser(target_files)
     for line in output_lines:
-        line = line.strip()
+        parser.feed(line)
+    return parser.lineCovDict
 
-        # Match file line
-        file_match = file_pattern.match(line)
-        if file_match:
-            curr_file = file_match.group(1)
-            # Find which target file matches
-            matched_tf = None
-            for tf in target_files:
-                if curr_file.endswith(tf):
-                    matched_tf = tf
-                    break
-            
-            if matched_tf:
-                save = True
-                file_key = matched_tf
-                if file_key not in lineCovDict:
-                    lineCovDict[file_key] = {}
-            else:
-                save = False
-                file_key = ""
-            continue
-        
-        if save:
-            # Match function line
-            func_match = func_pattern.match(line)
-            if func_match:
-                func_key = func_match.group(1)
-                continue
-            
-            # Match line coverage
-            line_match = line_pattern.match(line)
-            if line_match:
-                line_num = int(line_match.group(1))
-                covered = int(line_match.group(2))
-                lineCovDict[file_key][line_num] = {
-                    "covered": covered,
-                    "function": func_key
-                }
-    
-    return lineCovDict
+
+def load_bbcov_line_cov_decoder(script_path: str, decoder_name: str = None):
+    """
+    Load the $BBCOV_LINE_COV script once as a module (its command line entry point does not run)
+    and return its decoder, decoder(bbcov_file) -> iterable of output lines, or None if it has none.
+    """
+    if decoder_name is None:
+        decoder_name = os.environ.get("BBCOV_LINE_COV_DECODER", DEFAULT_DECODER)
+    key = (script_path, os.path.getmtime(script_path), decoder_name)
+
+    with _DECODERS_LOCK:
+        if key not in _DECODERS:
+            decoder = None
+            try:
+                spec = importlib.util.spec_from_file_location(f"bbcov_line_cov_{len(_DECODERS)}", script_path)
+                module = importlib.util.module_from_spec(spec)
+                spec.loader.exec_module(module)
+                decoder = getattr(module, decoder_name, None)
+            except Exception as e:
+                LOGGER.warning(f"Failed to load {script_path}: {e}")
+            if decoder is None:
+                LOGGER.warning(f"{script_path} has no {decoder_name}(), running it with python3 for each test")
+            _DECODERS[key] = decoder
+        return _DECODERS[key]
+
+
+def read_bbcov_line_cov(target_files: list, bbcov_file: str, script_path: str = None) -> dict:
+    """
+    Read the line coverage of a .bbcd file into {target_file: {line: {"covered", "function"}}}.
+    The decoder of the $BBCOV_LINE_COV script runs in-process and its output is parsed line by
+    line as it is yielded. Scripts without a decoder are run with python3 instead.
+    """
+    if script_path is None:
+        script_path = os.environ["BBCOV_LINE_COV"]
+
+    decoder = load_bbcov_line_cov_decoder(script_path)
+    if decoder is None:
+        return _run_bbcov_line_cov_script(target_files, bbcov_file, script_path)
+
+    parser = BbcovLineCovParser(target_files)
+    try:
+        for line in decoder(bbcov_file):
+            parser.feed(line)
+    except Exception as e:
+        LOGGER.error(f"Error generating bbcov line output for {bbcov_file}: {e}")
+        return {}
+    return parser.lineCovDict
+
+
+def _run_bbcov_line_cov_script(target_files: list, bbcov_file: str, script_path: str) -> dict:
+    """Run the script on the .bbcd file and parse its stdout while it is produced"""
+    parser = BbcovLineCovParser(target_files)
+    # stderr goes to a file, a full stderr pipe would block the script while stdout is read
+    with tempfile.TemporaryFile(mode="w+") as stderr_file:
+        proc = sp.Popen(
+            ["python3", script_path, bbcov_file],
+            stdout=sp.PIPE, stderr=stderr_file, text=True
+        )
+        for line in proc.stdout:
+            parser.feed(line)
+        proc.wait()
+
+        if proc.returncode != 0:
+            stderr_file.seek(0)
+            LOGGER.error(f"Error generating bbcov line output for {bbcov_file}")
+            LOGGER.error(f"Error output: {stderr_file.read().strip()}")
+            return {}
+    return parser.lineCovDict
@@ -137,6 +137,10 @@ def get_tcIdx2tcInfo(DB, bug_idx):
         "bit_sequence_length", "line_coverage_bit_sequence",
         "stacktrace", "relevant_tcs"
     ]
+    # stage03 stores the packed coverage, the bit strings only remain in rows written before it
+    has_packed_coverage = DB.column_exists("cpp_tc_info", "line_coverage_bits")
+    if has_packed_coverage:
+        col.append("line_coverage_bits")
     col_str = ", ".join(col)
     tc_info = DB.read(
         "cpp_tc_info",
@@ -148,8 +152,8 @@ def get_tcIdx2tcInfo(DB, bug_idx):
     for tc_data in tc_info:
         tc_idx, tc_name, tc_result, \
             execution_time_ms, bit_sequence_length, \
-            line_coverage_bit_sequence, stacktrace, relevant_tcs = tc_data
-        
+            line_coverage_bit_sequence, stacktrace, relevant_tcs = tc_data[:8]
+
         tcIdx2tcInfo[tc_idx] = {
             "tc_name": tc_name,
             "tc_result": tc_result,
@@ -157,7 +161,8 @@ def get_tcIdx2tcInfo(DB, bug_idx):
             "bit_sequence_length": bit_sequence_length,
             "line_coverage_bit_sequence": line_coverage_bit_sequence,
             "stack_trace": stacktrace,
-            "relevant_tcs": relevant_tcs
+            "relevant_tcs": relevant_tcs,
+            "line_coverage_bits": tc_data[8] if has_packed_coverage else None
         }
 
     return tcIdx2tcInfo
@@ -321,29 +326,25 @@ def measure_scores(
 
         LOGGER.info(f"Selected {len(selected_lineIdx)} lines for target line percentage {target_line_perc:.2%}.")
 
+        pending_mut_cnts = []
         for mut_cnt in CONTEXT.CONFIG.ENV["mutation_cnt"]:
             first_key = next(iter(lineIdx2mutation))
             target_key = f"lineCnt{line_cnt}_mutCnt{mut_cnt}_tcs{CONTEXT.CONFIG.ENV['tcs_reduction']}_all_types_transition_final_metal_score_rank"
             if target_key in lineIdx2lineData[first_key]:
                 LOGGER.debug(f"Skipping line count {line_cnt} and mutation count {mut_cnt} as scores already calculated.")
                 continue
-
-            get_using_mutants_start_time = time.time()
-            using_mutants = get_using_mutants(lineIdx2mutation, selected_lineIdx, mut_cnt)
-            get_using_mutants_time = time.time() - get_using_mutants_start_time
-            LOGGER.debug(f"[rid{rid}-{bug_idx}b] get_using_mutants took {get_using_mutants_time:.2f} seconds.")
-
-            get_overall_data_start_time = time.time()
-            overall_data = get_overall_data(using_mutants, total_failing_tcs, line_cnt, mut_cnt, CONTEXT.CONFIG.ENV["tcs_reduction"])
-            get_overall_data_time = time.time() - get_overall_data_start_time
-            LOGGER.debug(f"[rid{rid}-{bug_idx}b] get_overall_data took {get_overall_data_time:.2f} seconds.")
-
-            measure_mbfl_score_time = time.time()
-            measure_mbfl_susp_scores(
-                lineIdx2lineData, using_mutants, line_cnt, mut_cnt, CONTEXT.CONFIG.ENV["tcs_reduction"], overall_data
-            )
-            measure_mbfl_score_time = time.time() - measure_mbfl_score_time
-            LOGGER.debug(f"[rid{rid}-{bug_idx}b] measure_mbfl_susp_scores took {measure_mbfl_score_time:.2f} seconds.")
+            pending_mut_cnts.append(mut_cnt)
+
+        if not pending_mut_cnts:
+            continue
+
+        measure_mbfl_score_time = time.time()
+        measure_mbfl_susp_scores_for_mut_cnts(
+            lineIdx2lineData, lineIdx2mutation, selected_lineIdx,
+            line_cnt, pending_mut_cnts, CONTEXT.CONFIG.ENV["tcs_reduction"], total_failing_tcs
+        )
+        measure_mbfl_score_time = time.time() - measure_mbfl_score_time
+        LOGGER.debug(f"[rid{rid}-{bug_idx}b] measure_mbfl_susp_scores_for_mut_cnts took {measure_mbfl_score_time:.2f} seconds.")
 
     # Calculate ranks for MBFL formulas
     add_mbfl_ranks(lineIdx2lineData, CONTEXT.CONFIG.ENV)
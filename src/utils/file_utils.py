@@ -4,6 +4,9 @@ import logging
 
 LOGGER = logging.getLogger(__name__)
 
+# ioctl request cloning a whole file (copy-on-write) on btrfs, xfs, ...
+FICLONE = 0x40049409
+
 def make_directory(path: str):
     """Create a directory if it does not exist."""
     if not os.path.exists(path):
@@ -67,4 +70,79 @@ def unzip_directory(zip_path: str, extract_to: str):
         LOGGER.info(f"Unzipped {zip_path}.zip to {extract_to}")
         return True
     LOGGER.warning(f"Zip file does not exist for unzipping: {zip_path}.zip")
-    return False
\ No newline at end of file
+    return False
+
+def reflink_file(src: str, dest: str) -> bool:
+    """Clone src into dest sharing its data blocks, False if the filesystem does not support it."""
+    try:
+        import fcntl
+    except ImportError:
+        return False
+    try:
+        with open(src, 'rb') as fsrc, open(dest, 'wb') as fdest:
+            fcntl.ioctl(fdest.fileno(), FICLONE, fsrc.fileno())
+    except OSError:
+        if os.path.exists(dest):
+            os.remove(dest)
+        return False
+    shutil.copystat(src, dest)
+    return True
+
+def _is_read_only_path(rel_path: str, read_only_paths: list) -> bool:
+    return any(rel_path == path or rel_path.startswith(path + os.sep) for path in read_only_paths)
+
+def provision_directory(src: str, dest: str, read_only_paths: list = None) -> dict:
+    """
+    Populate dest with the files of src as cheaply as the filesystem allows.
+    Files are reflinked (copy-on-write), files under read_only_paths (relative to src,
+    never modified in place, e.g. test cases) are hardlinked when reflinks are not
+    supported, and the remaining files are copied. Returns the number of files per method.
+    """
+    counts = {"reflink": 0, "hardlink": 0, "copy": 0}
+    if not os.path.exists(src):
+        LOGGER.warning(f"Source directory does not exist: {src}")
+        return counts
+
+    read_only_paths = [os.path.normpath(path) for path in (read_only_paths or [])]
+    use_reflink = True
+    # symbolic links are followed, as with copy_directory
+    for root, dirs, files in os.walk(src, followlinks=True):
+        rel_root = os.path.relpath(root, src)
+        dest_root = os.path.normpath(os.path.join(dest, rel_root))
+        os.makedirs(dest_root, exist_ok=True)
+
+        for name in files:
+            src_path = os.path.join(root, name)
+            dest_path = os.path.join(dest_root, name)
+            if not os.path.exists(src_path):
+                LOGGER.warning(f"Skipping broken link: {src_path}")
+                continue
+
+            rel_path = os.path.normpath(os.path.join(rel_root, name))
+            read_only = _is_read_only_path(rel_path, read_only_paths)
+            if os.path.lexists(dest_path):
+                if read_only and os.path.samefile(src_path, dest_path):
+                    counts["hardlink"] += 1
+                    continue
+                # never write through a previous hardlink into src
+                os.remove(dest_path)
+
+            if use_reflink:
+                if reflink_file(src_path, dest_path):
+                    counts["reflink"] += 1
+                    continue
+                use_reflink = False
+                LOGGER.debug(f"Reflinks are not supported from {src} to {dest}")
+
+            if read_only:
+                try:
+                    os.link(src_path, dest_path)
+                    counts["hardlink"] += 1
+                    continue
+                except OSError:
+                    pass
+            shutil.copy2(src_path, dest_path)
+            counts["copy"] += 1
+
+    LOGGER.info(f"Provisioned {dest} from {src}: {counts}")
+    return counts
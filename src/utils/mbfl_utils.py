@@ -1,215 +1,218 @@
 import logging
-import random
 import math
+import numpy as np
+
+from lib.coverage_matrix import POPCOUNT_TABLE, CoverageMatrix
+from utils.sbfl_utils import get_packed_coverage
 
 LOGGER = logging.getLogger(__name__)
 
 TRANSITION_TYPES = {"type1": "result_transition"}
 
+# result_transition symbol of a test that stage05 did not execute (early exit or budget)
+SKIPPED_TRANSITION = "2"
+
 
-def get_using_mutants(lineIdx2mutation, selected_lineIdx, mut_cnt):
+def get_tc_masks(tcIdx2tcInfo, tcs_reduction):
     """
-    Get the mutants that are being used for the current mutation count.
-    :param lineIdx2mutation: Mapping of line indices to mutation data.
-    :param selected_lineIdx: List of line indices that are selected for mutation.
-    :param mut_cnt: Current mutation count.
-    :return: Dictionary of using mutants.
+    Precompute the per-test bit masks used for transition counting.
+    Test cases are indexed by tc_idx (0..num_tcs-1), the initialization test case (-1) is not part of the transitions.
+    :param tcIdx2tcInfo: Mapping of test case indices to test case information.
+    :param tcs_reduction: "All" or "Reduced" (adds the per-line coverage masks).
+    :return: Dictionary of masks (relevant, failing, passing, line_coverage) and the execution time vector.
     """
-    using_mutants = {}
-    for line_idx, rank in selected_lineIdx:
-        mutation_list = lineIdx2mutation[line_idx]
-        random.shuffle(mutation_list)
-        if len(mutation_list) >= mut_cnt:
-            using_mutants[line_idx] = mutation_list[:mut_cnt]
-        else:
-            using_mutants[line_idx] = mutation_list
-    return using_mutants
-
-def get_transition_counts(transition_bit_seq, tcIdx2tcInfo, line_idx, tcs_reduction):
-    f2p, p2f, f2f, p2p = 0, 0, 0, 0
-    execution_time_ms = 0
-
-    for tcIdx, bit_val in enumerate(transition_bit_seq):
-
-        if tcIdx2tcInfo[tcIdx]["relevant_tcs"] == False:
-            continue
-
-        # Exclude test cases that does not execute the line of the mutant
-        if tcs_reduction == "Reduced" \
-            and tcIdx2tcInfo[tcIdx]["line_coverage_bit_sequence"][line_idx] == '0':
+    num_tcs = max(tcIdx2tcInfo.keys()) + 1
+    relevant = np.zeros(num_tcs, dtype=bool)
+    failing = np.zeros(num_tcs, dtype=bool)
+    execution_times = [0] * num_tcs
+
+    for tcIdx in range(num_tcs):
+        tcInfo = tcIdx2tcInfo.get(tcIdx)
+        if tcInfo is None:
             continue
+        relevant[tcIdx] = tcInfo["relevant_tcs"] != False
+        failing[tcIdx] = tcInfo["tc_result"] == "fail"
+        # NULL for tests whose time was not measured (e.g., run concurrently), counted as 0
+        execution_times[tcIdx] = tcInfo["execution_time_ms"] or 0
+
+    tc_masks = {
+        "num_tcs": num_tcs,
+        "relevant": np.packbits(relevant),
+        "failing": np.packbits(failing),
+        "passing": np.packbits(~failing),
+        "execution_time_ms": np.asarray(execution_times),
+        "line_coverage": None,
+    }
 
-        baseline_outcome = 1 if tcIdx2tcInfo[tcIdx]['tc_result'] == 'fail' else 0
+    if tcs_reduction == "Reduced":
+        # line-by-test masks: row line_idx marks the test cases executing the line
+        relevant_tcInfos = [tcIdx2tcInfo[tcIdx] if relevant[tcIdx] else None for tcIdx in range(num_tcs)]
+        num_lines = max((tcInfo["bit_sequence_length"] or 0 for tcInfo in relevant_tcInfos if tcInfo), default=0)
+        covMatrix = CoverageMatrix.from_rows([get_packed_coverage(tcInfo) for tcInfo in relevant_tcInfos], num_lines)
+        tc_masks["line_coverage"] = covMatrix.transpose().packed
 
-        if baseline_outcome == 1: # failing
-            if bit_val == '1':
-                f2p += 1
-            else:
-                f2f += 1
-        else: # passing
-            if bit_val == '1':
-                p2f += 1
-            else:
-                p2p += 1
-        
-        # increment time
-        execution_time_ms += tcIdx2tcInfo[tcIdx]['execution_time_ms']
+    return tc_masks
 
-    return f2p, p2f, f2f, p2p, execution_time_ms
+def get_transition_count_matrix(transition_bit_seqs, line_idxs, tc_masks):
+    """
+    Count the transitions of many mutants in one vectorized call.
+    :param transition_bit_seqs: List of '0'/'1'/SKIPPED_TRANSITION strings indexed by tc_idx (one per mutant).
+    :param line_idxs: Line index of each mutant (used for the "Reduced" test case selection).
+    :param tc_masks: Masks returned by get_tc_masks().
+    :return: (num_mutants, 5) array with the f2p, p2f, f2f, p2p and execution_time_ms columns.
+    """
+    num_mutants = len(transition_bit_seqs)
+    num_tcs = tc_masks["num_tcs"]
+    counts = np.zeros((num_mutants, 5), dtype=np.result_type(tc_masks["execution_time_ms"].dtype, np.int64))
+    if num_mutants == 0:
+        return counts
+
+    # mutant-by-test transition matrix, skipped tests and tests beyond a transition string are not counted
+    lengths = np.array([len(seq) for seq in transition_bit_seqs])
+    transitions = np.zeros((num_mutants, num_tcs), dtype=bool)
+    executed = np.arange(num_tcs)[None, :] < lengths[:, None]
+    for row_idx, seq in enumerate(transition_bit_seqs):
+        symbols = np.frombuffer(seq[:num_tcs].encode("ascii"), dtype=np.uint8)
+        transitions[row_idx, :len(symbols)] = symbols == ord("1")
+        executed[row_idx, :len(symbols)] &= symbols != ord(SKIPPED_TRANSITION)
+    transitions = np.packbits(transitions, axis=1)
+
+    used = np.packbits(executed, axis=1) & tc_masks["relevant"]
+    if tc_masks["line_coverage"] is not None:
+        used &= tc_masks["line_coverage"][np.asarray(line_idxs, dtype=np.int64)]
+
+    failing_used = used & tc_masks["failing"]
+    passing_used = used & tc_masks["passing"]
+    counts[:, 0] = POPCOUNT_TABLE[transitions & failing_used].sum(axis=1)
+    counts[:, 1] = POPCOUNT_TABLE[transitions & passing_used].sum(axis=1)
+    counts[:, 2] = POPCOUNT_TABLE[~transitions & failing_used].sum(axis=1)
+    counts[:, 3] = POPCOUNT_TABLE[~transitions & passing_used].sum(axis=1)
+    counts[:, 4] = np.unpackbits(used, axis=1, count=num_tcs) @ tc_masks["execution_time_ms"]
+    return counts
 
 def measure_transition_counts(lineIdx2mutation, tcIdx2tcInfo, tcs_reduction):
     """
     Measure the transition counts for each mutant.
     :param lineIdx2mutation: Mapping of line indices to mutation data.
     """
-    for line_idx, mutation_list in lineIdx2mutation.items():
-        for mutation_data in mutation_list:
-            mutation_idx = mutation_data['mutant_idx']
-            
-            for transition_type, transition_key in TRANSITION_TYPES.items():                
-                if mutation_data["build_result"] == False:
-                    continue
-                f2p, p2f, f2f, p2p, execution_time_ms = get_transition_counts(mutation_data[transition_key], tcIdx2tcInfo, line_idx, tcs_reduction)
-
-                mutation_data[transition_key] = {
-                    "f2p": f2p,
-                    "p2f": p2f,
-                    "f2f": f2f,
-                    "p2p": p2p,
-                    "execution_time_ms": execution_time_ms
-                }
-
-def get_overall_data(using_mutants, total_failing_tcs, line_cnt, mut_cnt, tcs_reduction):
-    overall_data = {
-        "total_failing_tcs": total_failing_tcs,
-        "total_mutants": 0,
-    }
+    tc_masks = get_tc_masks(tcIdx2tcInfo, tcs_reduction)
 
     for transition_type, transition_key in TRANSITION_TYPES.items():
-        overall_data[f"lineCnt{line_cnt}_mutCnt{mut_cnt}_tcs{tcs_reduction}_{transition_type}_total_f2p"] = 0
-        overall_data[f"lineCnt{line_cnt}_mutCnt{mut_cnt}_tcs{tcs_reduction}_{transition_type}_total_p2f"] = 0
-        overall_data[f"lineCnt{line_cnt}_mutCnt{mut_cnt}_tcs{tcs_reduction}_{transition_type}_total_f2f"] = 0
-        overall_data[f"lineCnt{line_cnt}_mutCnt{mut_cnt}_tcs{tcs_reduction}_{transition_type}_total_p2p"] = 0
-        overall_data[f"lineCnt{line_cnt}_mutCnt{mut_cnt}_tcs{tcs_reduction}_{transition_type}_total_execution_time_ms"] = 0
-
-    for line_idx, mutation_list in using_mutants.items():
-
-        for mutation_data in mutation_list:
-            if mutation_data["build_result"] == False:
-                continue
-            overall_data["total_mutants"] += 1
-            for transition_type, transition_key in TRANSITION_TYPES.items():
-                f2p = mutation_data[transition_key]["f2p"]
-                p2f = mutation_data[transition_key]["p2f"]
-                f2f = mutation_data[transition_key]["f2f"]
-                p2p = mutation_data[transition_key]["p2p"]
-                execution_time_ms = mutation_data[transition_key]["execution_time_ms"]
-
-                overall_data[f"lineCnt{line_cnt}_mutCnt{mut_cnt}_tcs{tcs_reduction}_{transition_type}_total_f2p"] += f2p
-                overall_data[f"lineCnt{line_cnt}_mutCnt{mut_cnt}_tcs{tcs_reduction}_{transition_type}_total_p2f"] += p2f
-                overall_data[f"lineCnt{line_cnt}_mutCnt{mut_cnt}_tcs{tcs_reduction}_{transition_type}_total_f2f"] += f2f
-                overall_data[f"lineCnt{line_cnt}_mutCnt{mut_cnt}_tcs{tcs_reduction}_{transition_type}_total_p2p"] += p2p
-                overall_data[f"lineCnt{line_cnt}_mutCnt{mut_cnt}_tcs{tcs_reduction}_{transition_type}_total_execution_time_ms"] += execution_time_ms
-
-    return overall_data
-
-def measure_muse_on_line(using_mutants, overall_f2p, overall_p2f, transition_key, line_cnt, mut_cnt, tcs_reduction):
-    abs_muts = len(using_mutants)
-
-    line_total_f2p = 0
-    line_total_p2f = 0
-
-    for mutant in using_mutants:
-        if mutant["build_result"] == False:
-            continue
-        f2p = mutant[transition_key]["f2p"]
-        p2f = mutant[transition_key]["p2f"]
-
-        line_total_f2p += f2p
-        line_total_p2f += p2f
-
-    muse_1 = (1 / ((abs_muts + 1) * (overall_f2p + 1)))
-    muse_2 = (1 / ((abs_muts + 1) * (overall_p2f + 1)))
-
-    muse_3 = muse_1 * line_total_f2p
-    muse_4 = muse_2 * line_total_p2f
-
-    final_muse_score = muse_3 - muse_4
-
-    muse_data = {
-        f"lineCnt{line_cnt}_mutCnt{mut_cnt}_tcs{tcs_reduction}_{transition_key}_abs_muts": abs_muts,
-        f"lineCnt{line_cnt}_mutCnt{mut_cnt}_tcs{tcs_reduction}_{transition_key}_line_total_f2p": line_total_f2p,
-        f"lineCnt{line_cnt}_mutCnt{mut_cnt}_tcs{tcs_reduction}_{transition_key}_line_total_p2f": line_total_p2f,
-        f"lineCnt{line_cnt}_mutCnt{mut_cnt}_tcs{tcs_reduction}_{transition_key}_muse_1": muse_1,
-        f"lineCnt{line_cnt}_mutCnt{mut_cnt}_tcs{tcs_reduction}_{transition_key}_muse_2": muse_2,
-        f"lineCnt{line_cnt}_mutCnt{mut_cnt}_tcs{tcs_reduction}_{transition_key}_muse_3": muse_3,
-        f"lineCnt{line_cnt}_mutCnt{mut_cnt}_tcs{tcs_reduction}_{transition_key}_muse_4": muse_4,
-        f"lineCnt{line_cnt}_mutCnt{mut_cnt}_tcs{tcs_reduction}_{transition_key}_final_muse_score": final_muse_score,
-    }
-
-    return muse_data
-
-def measure_metal_on_line(using_mutants, total_failing_tcs, transition_key, line_cnt, mut_cnt, tcs_reduction):
-    metal_scores = []
-
-    for mutant in using_mutants:
-        if mutant["build_result"] == False:
-            continue
-        f2p = mutant[transition_key]["f2p"]
-        p2f = mutant[transition_key]["p2f"]
-
-        score = 0.0
-        if f2p + p2f == 0:
-            score = 0.0
-        else:
-            score = ((f2p) / math.sqrt(total_failing_tcs * (f2p + p2f)))
-
-        metal_scores.append(score)
-
-    if len(metal_scores) == 0:
-        metal_score = 0.0
-    else:
-        metal_score = max(metal_scores)
-
-    metal_data = {
-        f"lineCnt{line_cnt}_mutCnt{mut_cnt}_tcs{tcs_reduction}_{transition_key}_final_metal_score": metal_score
-    }
+        mutation_datas, transition_bit_seqs, line_idxs = [], [], []
+        for line_idx, mutation_list in lineIdx2mutation.items():
+            for mutation_data in mutation_list:
+                if mutation_data["build_result"] == False:
+                    continue
+                mutation_datas.append(mutation_data)
+                transition_bit_seqs.append(mutation_data[transition_key])
+                line_idxs.append(line_idx)
+
+        counts = get_transition_count_matrix(transition_bit_seqs, line_idxs, tc_masks).tolist()
+        for mutation_data, (f2p, p2f, f2f, p2p, execution_time_ms) in zip(mutation_datas, counts):
+            mutation_data[transition_key] = {
+                "f2p": f2p,
+                "p2f": p2f,
+                "f2f": f2f,
+                "p2p": p2p,
+                "execution_time_ms": execution_time_ms
+            }
 
-    return metal_data
+def measure_mbfl_susp_scores_for_mut_cnts(lineIdx2lineData, lineIdx2mutation, selected_lineIdx,
+                                          line_cnt, mut_cnts, tcs_reduction, total_failing_tcs):
+    """
+    Measure MUSE and METAL scores for every mutation count in one sweep.
+    The k mutants used for a line are the first k of its (already shuffled) mutation list,
+    so all mutation counts are read from prefix sums (and a prefix max for METAL) over the
+    same per-line arrays instead of re-shuffling and re-aggregating for each count.
+    Each k-subset is still a uniformly random subset of the line's mutants.
+    :param lineIdx2lineData: Mapping of line indices to line data.
+    :param lineIdx2mutation: Mapping of line indices to mutation data (transition counts measured).
+    :param selected_lineIdx: List of (line index, rank) pairs selected for mutation.
+    :param mut_cnts: Mutation counts to evaluate.
+    """
+    selected_lines = [line_idx for line_idx, rank in selected_lineIdx]
+    max_len = max((len(lineIdx2mutation[line_idx]) for line_idx in selected_lines), default=0)
+    num_lines = len(selected_lines)
+    selected_set = set(selected_lines)
 
-def measure_mbfl_susp_scores(lineIdx2lineData, using_mutants, line_cnt, mut_cnt, tcs_reduction, overall_data):
-    default_values = {}
     for transition_type, transition_key in TRANSITION_TYPES.items():
-        default_values[f"lineCnt{line_cnt}_mutCnt{mut_cnt}_tcs{tcs_reduction}_{transition_key}_total_execution_time_ms"] = \
-            overall_data[f"lineCnt{line_cnt}_mutCnt{mut_cnt}_tcs{tcs_reduction}_{transition_type}_total_execution_time_ms"]
-        default_values[f"lineCnt{line_cnt}_mutCnt{mut_cnt}_tcs{tcs_reduction}_{transition_key}_abs_muts"] = 0
-        default_values[f"lineCnt{line_cnt}_mutCnt{mut_cnt}_tcs{tcs_reduction}_{transition_key}_line_total_f2p"] = -10.0
-        default_values[f"lineCnt{line_cnt}_mutCnt{mut_cnt}_tcs{tcs_reduction}_{transition_key}_line_total_p2f"] = -10.0
-        default_values[f"lineCnt{line_cnt}_mutCnt{mut_cnt}_tcs{tcs_reduction}_{transition_key}_muse_1"] = -10.0
-        default_values[f"lineCnt{line_cnt}_mutCnt{mut_cnt}_tcs{tcs_reduction}_{transition_key}_muse_2"] = -10.0
-        default_values[f"lineCnt{line_cnt}_mutCnt{mut_cnt}_tcs{tcs_reduction}_{transition_key}_muse_3"] = -10.0
-        default_values[f"lineCnt{line_cnt}_mutCnt{mut_cnt}_tcs{tcs_reduction}_{transition_key}_muse_4"] = -10.0
-        default_values[f"lineCnt{line_cnt}_mutCnt{mut_cnt}_tcs{tcs_reduction}_{transition_key}_final_muse_score"] = -10.0
-        default_values[f"lineCnt{line_cnt}_mutCnt{mut_cnt}_tcs{tcs_reduction}_{transition_key}_final_metal_score"] = -10.0
-    
-
-    for lineIdx in lineIdx2lineData.keys():
-        if lineIdx not in using_mutants:
-            lineIdx2lineData[lineIdx] = {**lineIdx2lineData[lineIdx], **default_values}
-            continue
-        
-        for transition_type, transition_key in TRANSITION_TYPES.items():
-            overall_f2p = overall_data[f"lineCnt{line_cnt}_mutCnt{mut_cnt}_tcs{tcs_reduction}_{transition_type}_total_f2p"]
-            overall_p2f = overall_data[f"lineCnt{line_cnt}_mutCnt{mut_cnt}_tcs{tcs_reduction}_{transition_type}_total_p2f"]
-            total_failing_tcs = overall_data["total_failing_tcs"]
-            total_execution_time_ms = overall_data[f"lineCnt{line_cnt}_mutCnt{mut_cnt}_tcs{tcs_reduction}_{transition_type}_total_execution_time_ms"]
-
-            muse_data = measure_muse_on_line(using_mutants[lineIdx], overall_f2p, overall_p2f, transition_key, line_cnt, mut_cnt, tcs_reduction)
-            metal_data = measure_metal_on_line(using_mutants[lineIdx], total_failing_tcs, transition_key, line_cnt, mut_cnt, tcs_reduction)
-
-            lineIdx2lineData[lineIdx] = {
-                f"lineCnt{line_cnt}_mutCnt{mut_cnt}_tcs{tcs_reduction}_{transition_key}_total_execution_time_ms": total_execution_time_ms,
-                **lineIdx2lineData[lineIdx], 
-                **muse_data, 
-                **metal_data
+        # line-by-mutant arrays, padded with non-built (all zero) entries
+        built = np.zeros((num_lines, max_len), dtype=np.int64)
+        counts = np.zeros((num_lines, max_len, 5), dtype=np.int64)
+        metal = np.zeros((num_lines, max_len), dtype=np.float64)
+        exec_times = []
+        for row_idx, line_idx in enumerate(selected_lines):
+            for mut_pos, mutant in enumerate(lineIdx2mutation[line_idx]):
+                if mutant["build_result"] == False:
+                    continue
+                transition = mutant[transition_key]
+                f2p, p2f = transition["f2p"], transition["p2f"]
+                built[row_idx, mut_pos] = 1
+                counts[row_idx, mut_pos, :4] = [f2p, p2f, transition["f2f"], transition["p2p"]]
+                exec_times.append((row_idx, mut_pos, transition["execution_time_ms"]))
+                if f2p + p2f != 0:
+                    metal[row_idx, mut_pos] = ((f2p) / math.sqrt(total_failing_tcs * (f2p + p2f)))
+
+        exec_dtype = np.asarray([t for _, _, t in exec_times]).dtype if exec_times else np.int64
+        exec_matrix = np.zeros((num_lines, max_len), dtype=exec_dtype)
+        for row_idx, mut_pos, execution_time_ms in exec_times:
+            exec_matrix[row_idx, mut_pos] = execution_time_ms
+
+        # prefix[:, k] aggregates the first k mutants of each line
+        pad = [(0, 0), (1, 0)]
+        cum_built = np.pad(np.cumsum(built, axis=1), pad)
+        cum_counts = np.pad(np.cumsum(counts, axis=1), pad + [(0, 0)])
+        cum_exec = np.pad(np.cumsum(exec_matrix, axis=1), pad)
+        cum_metal = np.pad(np.maximum.accumulate(metal, axis=1), pad)
+        line_lengths = np.array([len(lineIdx2mutation[line_idx]) for line_idx in selected_lines], dtype=np.int64)
+
+        for mut_cnt in mut_cnts:
+            prefix = min(mut_cnt, max_len)
+            line_counts = cum_counts[:, prefix].tolist()
+            abs_muts_list = np.minimum(line_lengths, mut_cnt).tolist()
+            metal_scores = cum_metal[:, prefix].tolist()
+
+            key_prefix = f"lineCnt{line_cnt}_mutCnt{mut_cnt}_tcs{tcs_reduction}"
+            overall_f2p = int(cum_counts[:, prefix, 0].sum())
+            overall_p2f = int(cum_counts[:, prefix, 1].sum())
+            total_execution_time_ms = cum_exec[:, prefix].sum().item()
+
+            default_values = {
+                f"{key_prefix}_{transition_key}_total_execution_time_ms": total_execution_time_ms,
+                f"{key_prefix}_{transition_key}_abs_muts": 0,
+                f"{key_prefix}_{transition_key}_line_total_f2p": -10.0,
+                f"{key_prefix}_{transition_key}_line_total_p2f": -10.0,
+                f"{key_prefix}_{transition_key}_muse_1": -10.0,
+                f"{key_prefix}_{transition_key}_muse_2": -10.0,
+                f"{key_prefix}_{transition_key}_muse_3": -10.0,
+                f"{key_prefix}_{transition_key}_muse_4": -10.0,
+                f"{key_prefix}_{transition_key}_final_muse_score": -10.0,
+                f"{key_prefix}_{transition_key}_final_metal_score": -10.0,
             }
+
+            for lineIdx in lineIdx2lineData.keys():
+                if lineIdx not in selected_set:
+                    lineIdx2lineData[lineIdx] = {**lineIdx2lineData[lineIdx], **default_values}
+
+            for row_idx, lineIdx in enumerate(selected_lines):
+                abs_muts = abs_muts_list[row_idx]
+                line_total_f2p, line_total_p2f = line_counts[row_idx][0], line_counts[row_idx][1]
+
+                muse_1 = (1 / ((abs_muts + 1) * (overall_f2p + 1)))
+                muse_2 = (1 / ((abs_muts + 1) * (overall_p2f + 1)))
+                muse_3 = muse_1 * line_total_f2p
+                muse_4 = muse_2 * line_total_p2f
+
+                lineIdx2lineData[lineIdx] = {
+                    f"{key_prefix}_{transition_key}_total_execution_time_ms": total_execution_time_ms,
+                    **lineIdx2lineData[lineIdx],
+                    f"{key_prefix}_{transition_key}_abs_muts": abs_muts,
+                    f"{key_prefix}_{transition_key}_line_total_f2p": line_total_f2p,
+                    f"{key_prefix}_{transition_key}_line_total_p2f": line_total_p2f,
+                    f"{key_prefix}_{transition_key}_muse_1": muse_1,
+                    f"{key_prefix}_{transition_key}_muse_2": muse_2,
+                    f"{key_prefix}_{transition_key}_muse_3": muse_3,
+                    f"{key_prefix}_{transition_key}_muse_4": muse_4,
+                    f"{key_prefix}_{transition_key}_final_muse_score": muse_3 - muse_4,
+                    f"{key_prefix}_{transition_key}_final_metal_score": metal_scores[row_idx],
+                }
@@ -1,6 +1,10 @@
+import os
 import pickle
 import logging
 import json
+import numpy as np
+
+from lib.feature_store import FeatureStore, SCHEMA_SUFFIX
 
 LOGGER = logging.getLogger(__name__)
 
@@ -13,11 +17,74 @@ MBFL_FORMULA = ["muse", "metal"]
 
 TRANSITION_TYPES = {"type1": "result_transition"}
 
-def normalize_data(pkl_file, ENV):
+def get_bid_data_files(rid_dir):
+    """
+    List the per-bug data files of a repeat directory.
+    Feature stores are listed by their schema (.json) file, legacy lineIdx2lineData
+    pickles are listed only when no feature store exists for the same bug.
+    """
+    file_names = sorted(os.listdir(rid_dir))
+    store_names = {
+        file_name[:-len(SCHEMA_SUFFIX)] for file_name in file_names
+        if file_name.endswith(SCHEMA_SUFFIX) and FeatureStore.exists(os.path.join(rid_dir, file_name[:-len(SCHEMA_SUFFIX)]))
+    }
+
+    bid_files = []
+    for file_name in file_names:
+        if file_name.endswith(SCHEMA_SUFFIX) and file_name[:-len(SCHEMA_SUFFIX)] in store_names:
+            bid_files.append(file_name)
+        elif file_name.endswith(".pkl") and file_name[:-len(".pkl")] not in store_names:
+            bid_files.append(file_name)
+    return bid_files
+
+def get_norm_keys(ENV):
+    """
+    Map each normalized feature key to the rank key it is computed from.
+    """
+    tcr = ENV["tcs_reduction"]
+    norm_keys = {f"{formula}_norm": f"{formula}_rank" for formula in SBFL_FORMULA}
+
+    mbfl_settings = [(lnc, mtc) for lnc in ENV["target_lines"] for mtc in ENV["mutation_cnt"]]
+    if 100 not in ENV["target_lines"] or 10 not in ENV["mutation_cnt"]:
+        mbfl_settings.insert(0, (100, 10))
+
+    for lnc, mtc in mbfl_settings:
+        for formula in MBFL_FORMULA:
+            for transition_type, transition_key in TRANSITION_TYPES.items():
+                mbfl_key = f"lineCnt{lnc}_mutCnt{mtc}_tcs{tcr}_{transition_key}_final_{formula}_score"
+                norm_keys[f"{mbfl_key}_norm"] = f"{mbfl_key}_rank"
+    return norm_keys
+
+def normalize_data(data_file, ENV):
     """
     For each SBFL formula, MR-mutationType of muse and metal,
     normalize the suspiciousness scores to be between 0 and 1
     using the rank value among the lines.
+    Feature stores are read column-wise (memory-mapped), only the
+    columns used by the dataset are materialized per line.
+    """
+    if data_file.endswith(".pkl"):
+        return normalize_pkl_data(data_file, ENV)
+
+    store = FeatureStore.load(data_file[:-len(SCHEMA_SUFFIX)])
+    line_length = store.num_lines
+
+    columns = {}
+    for norm_key, rank_key in get_norm_keys(ENV).items():
+        columns[norm_key] = (1 - (store.column(rank_key).astype(np.float64) / line_length)).tolist()
+    for column in ["st_relevance", "st_relevance_linear"]:
+        columns[column] = store.column(column).astype(np.float64).tolist()
+    for column in ["file", "lineno", "is_buggy_line"]:
+        columns[column] = store.metadata[column]
+
+    data = {}
+    for row_idx, line_idx in enumerate(store.line_idxs):
+        data[line_idx] = {column: values[row_idx] for column, values in columns.items()}
+    return data
+
+def normalize_pkl_data(pkl_file, ENV):
+    """
+    normalize_data for legacy lineIdx2lineData pickles.
     """
     tcr = ENV["tcs_reduction"]
 
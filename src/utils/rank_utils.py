@@ -1,4 +1,5 @@
 import logging
+import numpy as np
 
 LOGGER = logging.getLogger(__name__)
 
@@ -9,6 +10,26 @@ SBFL_FORMULA = [
 
 TRANSITION_TYPES = {"type1": "result_transition"}
 
+def calculate_rank_matrix(score_matrix):
+    """
+    Calculate upper-bound tie ranks for every column of a score matrix at once.
+    Higher score → Lower (better) rank, equal scores share the position of their last occurrence,
+    i.e., the rank of a score is the number of scores in its column that are greater or equal.
+
+    :param score_matrix: (num_items, num_columns) array of scores
+    :return: (num_items, num_columns) array of ranks
+    """
+    score_matrix = np.asarray(score_matrix, dtype=np.float64)
+    if score_matrix.ndim == 1:
+        score_matrix = score_matrix.reshape(-1, 1)
+    num_items = score_matrix.shape[0]
+
+    ranks = np.empty(score_matrix.shape, dtype=np.int64)
+    sorted_scores = np.sort(score_matrix, axis=0)
+    for col_idx in range(score_matrix.shape[1]):
+        ranks[:, col_idx] = num_items - np.searchsorted(sorted_scores[:, col_idx], score_matrix[:, col_idx], side="left")
+    return ranks
+
 def calculate_ranks(score_pairs):
     """
     Calculate ranks for a list of (identifier, score) pairs.
@@ -26,21 +47,30 @@ def calculate_ranks(score_pairs):
     :param score_pairs: List of (identifier, score) pairs
     :return: Dictionary mapping identifiers to their ranks
     """
-    # Sort by score in descending order (higher score -> better rank)
-    score_pairs.sort(key=lambda x: x[1], reverse=True)
-    
-    # First pass: Group scores and find the last position for each score
-    score_to_rank = {}
-    for idx, (_, score) in enumerate(score_pairs):
-        # For each score, store the position of its last occurrence
-        score_to_rank[score] = idx + 1
-    
-    # Second pass: Create mapping from identifier to rank
-    id_to_rank = {}
-    for item_id, score in score_pairs:
-        id_to_rank[item_id] = score_to_rank[score]
-    
-    return id_to_rank
+    ranks = calculate_rank_matrix([score for _, score in score_pairs])[:, 0].tolist()
+    return {item_id: rank for (item_id, _), rank in zip(score_pairs, ranks)}
+
+def add_rank_columns(lineIdx2lineData, score_keys, default=float('-inf')):
+    """
+    Rank several score keys of lineIdx2lineData in one call, adding "{key}_rank" to each line.
+
+    :param lineIdx2lineData: Mapping of line indices to line data
+    :param score_keys: Score keys to rank, lines without a key get the default score
+    """
+    if not score_keys:
+        return
+    line_idxs = list(lineIdx2lineData.keys())
+    score_matrix = np.array([
+        [lineIdx2lineData[line_idx].get(key, default) for key in score_keys]
+        for line_idx in line_idxs
+    ], dtype=np.float64)
+    ranks = calculate_rank_matrix(score_matrix).tolist()
+
+    rank_keys = [f"{key}_rank" for key in score_keys]
+    for line_idx, line_ranks in zip(line_idxs, ranks):
+        line_data = lineIdx2lineData[line_idx]
+        for rank_key, rank in zip(rank_keys, line_ranks):
+            line_data[rank_key] = rank
 
 def add_sbfl_ranks(lineIdx2lineData):
     """
@@ -59,16 +89,7 @@ def add_sbfl_ranks(lineIdx2lineData):
         LOGGER.debug("All SBFL formulas already ranked. Skipping.")
         return
 
-    for formula in unranked_forms:
-        # Extract (lineIdx, score) pairs for this SBFL formula
-        score_pairs = [(line_idx, data[formula]) for line_idx, data in lineIdx2lineData.items()]
-        
-        # Calculate ranks
-        ranks = calculate_ranks(score_pairs)
-        
-        # Add ranks to lineIdx2lineData
-        for line_idx, rank in ranks.items():
-            lineIdx2lineData[line_idx][f"{formula}_rank"] = rank
+    add_rank_columns(lineIdx2lineData, unranked_forms)
 
     LOGGER.info(f"Added ranks for SBFL formulas: {', '.join(unranked_forms)}")
 
@@ -81,46 +102,22 @@ def add_mbfl_ranks(lineIdx2lineData, EXP_CONFIG):
     """
     first_key = next(iter(lineIdx2lineData))
 
+    # keys present in at least one line's data, collected in a single pass
+    present_keys = set()
+    for data in lineIdx2lineData.values():
+        present_keys.update(data.keys())
+
     tcs_reduction = EXP_CONFIG["tcs_reduction"]
+    unranked_keys = []
     for line_cnt in EXP_CONFIG["target_lines"]:
         for mut_cnt in EXP_CONFIG["mutation_cnt"]:
             for transition_type, transition_key in TRANSITION_TYPES.items():
-                # For MUSE formula
-                muse_key = f"lineCnt{line_cnt}_mutCnt{mut_cnt}_tcs{tcs_reduction}_{transition_key}_final_muse_score"
-                
-                # Check if the key exists in at least one line's data
-                if any(muse_key in data for data in lineIdx2lineData.values()) \
-                    and f"{muse_key}_rank" not in lineIdx2lineData[first_key]:
-                    # Extract (lineIdx, score) pairs for this MUSE formula
-                    score_pairs = [(line_idx, data.get(muse_key, float('-inf'))) 
-                                for line_idx, data in lineIdx2lineData.items()]
-                    
-                    # Calculate ranks
-                    ranks = calculate_ranks(score_pairs)
-                    
-                    # Add ranks to lineIdx2lineData
-                    for line_idx, rank in ranks.items():
-                        lineIdx2lineData[line_idx][f"{muse_key}_rank"] = rank
-                    
-                    LOGGER.debug(f"Added ranks for MUSE formula with lineCnt={line_cnt}, mutCnt={mut_cnt}, transition={transition_type}")
-                
-                # For METAL formula
-                metal_key = f"lineCnt{line_cnt}_mutCnt{mut_cnt}_tcs{tcs_reduction}_{transition_key}_final_metal_score"
-                
-                # Check if the key exists in at least one line's data
-                if any(metal_key in data for data in lineIdx2lineData.values()) \
-                    and f"{metal_key}_rank" not in lineIdx2lineData[first_key]:
-                    # Extract (lineIdx, score) pairs for this METAL formula
-                    score_pairs = [(line_idx, data.get(metal_key, float('-inf'))) 
-                                for line_idx, data in lineIdx2lineData.items()]
-                    
-                    # Calculate ranks
-                    ranks = calculate_ranks(score_pairs)
-                    
-                    # Add ranks to lineIdx2lineData
-                    for line_idx, rank in ranks.items():
-                        lineIdx2lineData[line_idx][f"{metal_key}_rank"] = rank
-
-                    LOGGER.debug(f"Added ranks for METAL formula with lineCnt={line_cnt}, mutCnt={mut_cnt}, transition={transition_type}")
+                for formula in ["muse", "metal"]:
+                    score_key = f"lineCnt{line_cnt}_mutCnt{mut_cnt}_tcs{tcs_reduction}_{transition_key}_final_{formula}_score"
+                    if score_key in present_keys \
+                        and f"{score_key}_rank" not in lineIdx2lineData[first_key]:
+                        unranked_keys.append(score_key)
+
+    add_rank_columns(lineIdx2lineData, unranked_keys)
 
     LOGGER.info(f"Added ranks for MBFL formulas with target_lines={EXP_CONFIG['target_lines']} and mutation_cnt={EXP_CONFIG['mutation_cnt']} and tcs_reduction={tcs_reduction}")
@@ -1,5 +1,7 @@
-import math
 import logging
+import numpy as np
+
+from lib.coverage_matrix import CoverageMatrix
 
 LOGGER = logging.getLogger(__name__)
 
@@ -15,39 +17,93 @@ def get_sorted_lineIdx(lineIdx2lineData, std_formula):
     lineIdx_list.sort(key=lambda x: x[1], reverse=False)  # Sort by rank in ascending order
     return lineIdx_list
 
+def get_packed_coverage(tcInfo):
+    """Packed line coverage of a test case, the bit string of rows written before the packed coverage"""
+    if tcInfo is None:
+        return None
+    if tcInfo.get("line_coverage_bits") is not None:
+        return tcInfo["line_coverage_bits"]
+    return tcInfo["line_coverage_bit_sequence"]
+
+def get_relevant_coverage(tcIdx2tcInfo):
+    """
+    Build the coverage matrix of the relevant test cases once.
+    :param tcIdx2tcInfo: Mapping of test case indices to test case information.
+    :return: (relevant tc_idx list, CoverageMatrix with one row per relevant test case, failing vector)
+    """
+    relevant_tcIdxs = [
+        tcIdx for tcIdx, tcInfo in sorted(tcIdx2tcInfo.items())
+        if tcInfo["relevant_tcs"] != False
+    ]
+    # rows with no candidate line hold "0" as bit string in tables written before the packed coverage
+    num_lines = tcIdx2tcInfo[relevant_tcIdxs[0]]["bit_sequence_length"] if relevant_tcIdxs else 0
+
+    covMatrix = CoverageMatrix.from_rows(
+        [get_packed_coverage(tcIdx2tcInfo[tcIdx]) for tcIdx in relevant_tcIdxs], num_lines
+    )
+
+    failing = np.array(
+        [1 if tcIdx2tcInfo[tcIdx]["tc_result"] == "fail" else 0 for tcIdx in relevant_tcIdxs],
+        dtype=np.int64
+    )
+    return relevant_tcIdxs, covMatrix, failing
+
 def measure_spectrum(tcIdx2tcInfo, lineIdx2lineData):
     first_key = next(iter(lineIdx2lineData))
     if 'ep' in lineIdx2lineData[first_key]:
         LOGGER.debug("Skipping spectrum measurement")
         return
 
-    for tcIdx, tcInfo in tcIdx2tcInfo.items():
-        if tcInfo["relevant_tcs"] == False: continue
-        result = 1 if tcInfo['tc_result'] == 'fail' else 0  # 0: pass, 1: fail
-        line_coverage = tcInfo['line_coverage_bit_sequence']
-
-        for line_idx, coverage in enumerate(line_coverage):
-            if 'ep' not in lineIdx2lineData[line_idx].keys():
-                lineIdx2lineData[line_idx]['ep'] = 0
-            if 'ef' not in lineIdx2lineData[line_idx].keys():
-                lineIdx2lineData[line_idx]['ef'] = 0
-            if 'np' not in lineIdx2lineData[line_idx].keys():
-                lineIdx2lineData[line_idx]['np'] = 0
-            if 'nf' not in lineIdx2lineData[line_idx].keys():
-                lineIdx2lineData[line_idx]['nf'] = 0
-
-            if coverage == '1':
-                if result == 0:
-                    lineIdx2lineData[line_idx]['ep'] += 1
-                else:
-                    lineIdx2lineData[line_idx]['ef'] += 1
-            else:
-                if result == 0:
-                    lineIdx2lineData[line_idx]['np'] += 1
-                else:
-                    lineIdx2lineData[line_idx]['nf'] += 1
+    relevant_tcIdxs, covMatrix, failing = get_relevant_coverage(tcIdx2tcInfo)
+
+    # ef/ep: failing/passing test cases executing each line
+    ef = covMatrix.column_counts(failing)
+    ep = covMatrix.column_counts(1 - failing)
+    nf = int(failing.sum()) - ef
+    n_p = (len(failing) - int(failing.sum())) - ep
+
+    for line_idx in range(covMatrix.num_cols):
+        lineIdx2lineData[line_idx]['ep'] = int(ep[line_idx])
+        lineIdx2lineData[line_idx]['ef'] = int(ef[line_idx])
+        lineIdx2lineData[line_idx]['np'] = int(n_p[line_idx])
+        lineIdx2lineData[line_idx]['nf'] = int(nf[line_idx])
+
+def _safe_divide(numerator, denominator):
+    """numerator / denominator, 0.0 where the denominator is 0"""
+    result = np.zeros(np.broadcast(numerator, denominator).shape, dtype=np.float64)
+    np.divide(numerator, denominator, out=result, where=(denominator != 0))
+    return result
+
+def _checked_divide(numerator, denominator):
+    """numerator / denominator, raising like Python division when a denominator is 0"""
+    if np.any(denominator == 0):
+        raise ZeroDivisionError("float division by zero")
+    return numerator / denominator
+
+def calculate_sbfl_scores(formula, ep, ef, n_p, nf):
+    """
+    Evaluate a SBFL formula on spectrum arrays.
+    :return: numpy array of suspiciousness scores, one per line.
+    """
+    ep, ef, n_p, nf = [np.asarray(x, dtype=np.float64) for x in (ep, ef, n_p, nf)]
+
+    if formula == "tarantula":
+        numerator = _checked_divide(ef, ef + nf)
+        left = _safe_divide(numerator, ep + n_p)
+        right = _safe_divide(ef, ef + nf)
+        return _safe_divide(numerator, left + right)
+    elif formula == "ochiai":
+        return _safe_divide(ef, np.sqrt((ef + nf) * (ef + ep)))
+    elif formula == "dstar":
+        return _safe_divide(ef**2, ef + nf)
+    elif formula == "naish1":
+        return np.where(nf > 0, -1, n_p).astype(np.int64)
+    elif formula == "naish2":
+        return ef - (ep / (ep + n_p + 1))
+    elif formula == "gp13":
+        return ef * (1 + _checked_divide(1, 2*ep + ef))
+    raise ValueError(f"Unknown SBFL formula: {formula}")
 
-    
 def measure_sbfl_susp_scores(lineIdx2lineData):
     """
     Measure suspiciousness scores for each line based on the SBFL formulas.
@@ -64,58 +120,13 @@ def measure_sbfl_susp_scores(lineIdx2lineData):
         LOGGER.debug("All SBFL formulas already calculated. Skipping.")
         return
 
-    for line_idx, data in lineIdx2lineData.items():
-        ep = data['ep']
-        ef = data['ef']
-        np = data['np']
-        nf = data['nf']
-
-        for formula in uncalced_susp_formulas:
-            if formula == "tarantula":
-                numerator = ef / (ef + nf)
-                den_1 = (ep + np)
-                den_2 = (ef + nf)
-
-                if den_1 == 0:
-                    left = 0.0
-                else:
-                    left = numerator / den_1
-
-                if den_2 == 0:
-                    right = 0.0
-                else:
-                    right = ef / den_2
-
-                denominator = (left + right)
-                if denominator == 0:
-                    score = 0.0
-                else:
-                    score = numerator / denominator
-            elif formula == "ochiai":
-                numerator = ef
-                denominator = math.sqrt((ef + nf) * (ef + ep))
-                if denominator == 0:
-                    score = 0.0
-                else:
-                    score = numerator / denominator
-            elif formula == "dstar":
-                numerator = ef**2
-                denominator = ef + nf
-                if denominator == 0:
-                    score = 0.0
-                else:
-                    score = numerator / denominator
-            elif formula == "naish1":
-                if 0 < nf:
-                    score = -1
-                elif 0 == nf:
-                    score = np
-            elif formula == "naish2":
-                numerator = ep
-                denominator = ep + np + 1
-                score = ef - (numerator / denominator)
-            elif formula == "gp13":
-                denominator = 2*ep + ef
-                score = ef * (1 + (1 / denominator))
-
-            data[formula] = score if not isinstance(score, complex) else 0.0
+    line_idxs = list(lineIdx2lineData.keys())
+    ep = np.array([lineIdx2lineData[line_idx]['ep'] for line_idx in line_idxs])
+    ef = np.array([lineIdx2lineData[line_idx]['ef'] for line_idx in line_idxs])
+    n_p = np.array([lineIdx2lineData[line_idx]['np'] for line_idx in line_idxs])
+    nf = np.array([lineIdx2lineData[line_idx]['nf'] for line_idx in line_idxs])
+
+    for formula in uncalced_susp_formulas:
+        scores = calculate_sbfl_scores(formula, ep, ef, n_p, nf).tolist()
+        for line_idx, score in zip(line_idxs, scores):
+            lineIdx2lineData[line_idx][formula] = score